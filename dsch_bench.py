@@ -0,0 +1,238 @@
+"""
+Benchmarks of Dschictionary with generated (synthetic) dschictionaries.
+
+The generator is deterministic (the same seed and size give the same file),
+so the results of different runs (versions) can be compared. The results are
+written into a JSON file.
+
+Usage:
+    python dsch_bench.py [-s 10000 100000 ...] [-o bench_output.json]
+                         [-c previous.json]
+"""
+
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import dschictionary_class as dsch
+import dsch_out
+import dsch_pos
+
+
+"""Default sizes (number of entries) of the generated dschictionaries."""
+DEFAULT_SIZES = (10000, 100000)
+
+"""Default seed of the generator."""
+DEFAULT_SEED = 2017
+
+CONSONANTS = "ptkmnslwj"
+VOWELS = "aeiou"
+WORDS = ("good", "bad", "fire", "water", "to talk", "to say", "language",
+         "person", "big", "small", "to eat", "food", "house", "to see",
+         "eye", "hello", "tree", "plant", "sun", "day", "night", "cold",
+         "warm", "to cook", "fine", "easy", "true", "a bit", "thing")
+CLASSES = ("", "", "", "", "lili", "suli", "anim", "inan")
+CASES = ("", "", "", "", "", "nom", "acc", "dat")
+
+
+def _word(rnd: random.Random, idx: int, width: int) -> tuple:
+    """
+    It returns a unique word and its pronunciation.
+
+    The last syllables (width) encode the index, and every syllable has two
+    letters, so the random leading syllables can't make the same word.
+    """
+    syllables = []
+    n = idx
+    for _ in range(width):
+        syllables.append(CONSONANTS[n % len(CONSONANTS)] +
+                         VOWELS[(n // len(CONSONANTS)) % len(VOWELS)])
+        n //= len(CONSONANTS) * len(VOWELS)
+    for _ in range(rnd.randint(0, 2)):
+        syllables.insert(0, rnd.choice(CONSONANTS) + rnd.choice(VOWELS))
+    return "".join(syllables), "'" + "-".join(syllables)
+
+
+def _sentence(rnd: random.Random, low: int, high: int) -> str:
+    """It returns some random words."""
+    return " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(low, high)))
+
+
+def generate_dschictionary(filename: str, size: int, seed=DEFAULT_SEED):
+    """
+    It generates a realistic (but meaningless) dschictionary file.
+
+    The entries have 1-6 meanings (with levels, part of speeches, classes
+    and cases), and optionally description, origin, comment and see also.
+    The entries are not sorted.
+
+    Parameters:
+        filename -- The output file's name
+        size -- Number of entries
+        seed -- Seed of the random generator
+    """
+    rnd = random.Random(seed)
+    order = list(range(size))
+    rnd.shuffle(order)
+    words = [None] * size
+    pos = sorted(dsch_pos.DEFAULT)
+    width = 1  # the number of syllables of the indexes
+    while (len(CONSONANTS) * len(VOWELS)) ** width < size:
+        width += 1
+
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("bench language " + dsch.LANGUAGE_SEPARATOR + " English\n")
+        for idx in order:
+            word, pro = _word(rnd, idx, width)
+            words[idx] = word
+            lines = ["\n" + word + (" /" + pro + "/"
+                                    if rnd.random() < 0.8 else "")]
+            if rnd.random() < 0.5:
+                lines.append(_sentence(rnd, 3, 12))
+            level = 0
+            for _ in range(rnd.randint(1, 6)):
+                level = rnd.choice((0, 0, 0, level, level + 1))
+                class_ = rnd.choice(CLASSES)
+                case = rnd.choice(CASES)
+                lines.append("{0}({1}{2}{3}) {4}".format(
+                    " " * level, rnd.choice(pos),
+                    ":" + class_ if class_ else "",
+                    "+" + case if case else "",
+                    ", ".join(_sentence(rnd, 1, 3)
+                              for _ in range(rnd.randint(1, 4)))))
+            if rnd.random() < 0.3:
+                lines.append("< " + _sentence(rnd, 2, 6))
+            if rnd.random() < 0.2:
+                lines.append("| " + _sentence(rnd, 4, 15))
+            if rnd.random() < 0.4:  # it refers to the already written words
+                num = min(size, rnd.randint(1, 3))
+                see = [words[i] for i in rnd.sample(range(size), num)
+                       if words[i]]
+                if see:
+                    lines.append("> " + ", ".join(see))
+            f.write("\n".join(lines) + "\n")
+
+
+def _timed(func) -> float:
+    """It runs a function (without its prints) and returns the time."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+
+def bench_size(size: int, directory: str, seed=DEFAULT_SEED) -> list:
+    """
+    It runs the benchmarks with a single size.
+
+    Parameters:
+        size -- Number of entries
+        directory -- Directory of the temporary files
+        seed -- Seed of the generator
+
+    Return:
+        List of results: {'size', 'phase', 'seconds', 'entries_per_second'}
+    """
+    source = os.path.join(directory, "bench.txt")
+    generate_dschictionary(source, size, seed)
+    results = []
+
+    def add(phase, seconds):
+        results.append({'size': size,
+                        'phase': phase,
+                        'seconds': round(seconds, 6),
+                        'entries_per_second': round(size / seconds)
+                                              if seconds else None})
+        print("{0:>10} {1:<12} {2:10.3f} s".format(size, phase, seconds))
+
+    d = dsch.Dschictionary()
+    add('parse', _timed(lambda: d.read_dschictionary(source)))
+
+    random.Random(seed).shuffle(d._entries)
+    add('sort', _timed(d._sort_entries))
+
+    add('entry_dict', _timed(lambda: [e.get_entry_as_dict()
+                                      for e in d.entries()]))
+
+    for name, cls, ex in (('write_text', dsch_out.TextDschictionary, 'txt'),
+                          ('write_html', dsch_out.HTMLDschictionary, 'html'),
+                          ('write_jsonl', dsch_out.JsonlDschictionary,
+                           'jsonl')):
+        with contextlib.redirect_stdout(io.StringIO()):
+            writer = cls(source)
+        add(name, _timed(lambda: writer.write_dschictionary(
+            ex, os.path.join(directory, "out"))))
+
+    jsonl = os.path.join(directory, "out.dict" + dsch.JSONL_EXTENSION)
+    add('parse_jsonl', _timed(lambda: dsch.Dschictionary().read_jsonl(jsonl)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        writer = dsch_out.BaseDschictionary(source)
+    add('write_backup', _timed(writer.write_dschictionary))
+    return results
+
+
+def compare(results: list, previous: list):
+    """It prints the ratios of the times to a previous run's times."""
+    old = {(r['size'], r['phase']): r['seconds'] for r in previous}
+    print("\n{0:>10} {1:<12} {2:>10} {3:>10} {4:>7}".format(
+        "size", "phase", "previous", "current", "ratio"))
+    for r in results:
+        before = old.get((r['size'], r['phase']))
+        if before:
+            print("{0:>10} {1:<12} {2:10.3f} {3:10.3f} {4:7.2f}".format(
+                r['size'], r['phase'], before, r['seconds'],
+                r['seconds'] / before))
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of Dschictionary with generated data.")
+    parser.add_argument('-s', '--sizes', type=int, nargs='+',
+                        default=DEFAULT_SIZES,
+                        help="number of entries (e.g. 10000 1000000)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('-o', '--output', default="bench_output.json",
+                        help="JSON file of the results")
+    parser.add_argument('-c', '--compare', metavar='JSON',
+                        help="results of a previous run to compare with")
+    parser.add_argument('-g', '--generate', metavar='FILE',
+                        help="only generate a dschictionary (first size)")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        generate_dschictionary(args.generate, args.sizes[0], args.seed)
+        return
+
+    results = []
+    directory = tempfile.mkdtemp(prefix="dschbench")
+    try:
+        for size in args.sizes:
+            results += bench_size(size, directory, args.seed)
+    finally:
+        shutil.rmtree(directory)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+                   'python': sys.version.split()[0],
+                   'platform': platform.platform(),
+                   'seed': args.seed,
+                   'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Collations (custom alphabetic orders) of the entry languages.
+
+A collation turns a word into a sort key string, so the sort itself stays a
+simple (and fast) string sort. Every entry computes its key only once (see
+Entry.sort_key()).
+
+It's a kind of config file too: add your own languages to COLLATIONS.
+"""
+
+
+import hashlib
+import re
+import unicodedata
+
+
+"""Levels of comparison."""
+PRIMARY = 1  # only the letters (case and diacritics are folded)
+SECONDARY = 2  # letters, then diacritics (case is folded)
+TERTIARY = 3  # letters, then diacritics, then case (lowercase first)
+
+"""Separator of the levels within a sort key (lower than anything else)."""
+LEVEL_SEPARATOR = "\0"
+
+"""
+First code point of the letters of an alphabet within the sort keys.
+
+The letters are mapped into the 0x80-0xff range, so the keys of ASCII words
+can be computed by a (fast) bytes translation.
+"""
+ALPHABET_BASE = 0x80
+MAX_LETTERS = 0x80
+
+"""Ranges of the combining diacritical marks that are folded."""
+COMBINING_RANGES = ((0x0300, 0x0370), (0x1AB0, 0x1B00), (0x1DC0, 0x1E00),
+                    (0x20D0, 0x2100), (0xFE20, 0xFE30))
+
+"""First code point of the placeholders of the multi-character letters."""
+_PLACEHOLDER_BASE = 0xF0000
+
+_MARKS = None  # translation table that removes the combining marks
+_MARK_PATTERN = None  # regular expression of the combining marks
+_DIACRITICS = None  # translation table of the diacritics' level
+
+
+def _marks() -> dict:
+    """It returns (and builds on the first use) the mark removing table."""
+    global _MARKS
+    if _MARKS is None:
+        _MARKS = {c: None
+                  for start, end in COMBINING_RANGES
+                  for c in range(start, end)
+                  if unicodedata.combining(chr(c))}
+    return _MARKS
+
+
+def _mark_pattern():
+    """
+    It returns (and compiles on the first use) the pattern of the marks (it
+    removes them faster than the translation table).
+    """
+    global _MARK_PATTERN
+    if _MARK_PATTERN is None:
+        _MARK_PATTERN = re.compile("[{0}]".format("".join(
+            re.escape(chr(c)) for c in sorted(_marks()))))
+    return _MARK_PATTERN
+
+
+def _rank(code: int) -> str:
+    """
+    It returns the primary key of a character that is not in the alphabet.
+
+    The ASCII characters are kept, the others are shifted after the letters,
+    and after the surrogates too (a key with surrogates couldn't be encoded),
+    so the order of the code points is kept.
+    """
+    if code < ALPHABET_BASE:
+        return chr(code)
+    code += 0x100
+    if code >= 0xD800:
+        code += 0x800
+    return chr(min(code, 0x10FFFF))
+
+
+class _Table(dict):
+    """A translation table that is filled on the first use of a character."""
+
+    def __init__(self, default, items=()):
+        """
+        Initialize a table.
+
+        Parameters:
+            default -- Function of the missing code points (code -> string)
+            items -- The known items (code point -> string or None)
+        """
+        super().__init__(items)
+        self._default = default
+
+    def __missing__(self, code: int):
+        """It adds and returns the item of a new code point."""
+        value = self[code] = self._default(code)
+        return value
+
+
+def _diacritics() -> dict:
+    """
+    It returns (and builds on the first use) the table that keeps only the
+    marks of a decomposed word (the other characters are replaced by
+    '\\x01').
+    """
+    global _DIACRITICS
+    if _DIACRITICS is None:
+        _DIACRITICS = _Table(lambda code: "\x01",
+                             {c: chr(c) for c in _marks()})
+    return _DIACRITICS
+
+
+class Collation:
+    """
+    An alphabetic order of a language.
+
+    The letters of the alphabet are sorted in the given order. The characters
+    that are not in the alphabet are sorted by their code points: the ASCII
+    ones (digits, punctuation) before the letters, the others after them.
+    A letter can be a digraph (e.g. 'ch') or a letter with diacritic
+    (e.g. 'ñ'), these are matched before the single letters (longer first).
+    """
+
+    def __init__(self, alphabet="", level=TERTIARY):
+        """
+        Define a collation.
+
+        Parameters:
+            alphabet -- The letters in order, separated by spaces
+                        (e.g. "a b c ch d"), at most MAX_LETTERS. If it's
+                        empty, the letters are sorted by their code points.
+            level -- Level of comparison (PRIMARY, SECONDARY or TERTIARY)
+        """
+        if level not in (PRIMARY, SECONDARY, TERTIARY):
+            raise ValueError("Unknown collation level: " + str(level))
+        self.alphabet = alphabet.split()
+        if len(self.alphabet) > MAX_LETTERS:
+            raise ValueError("Too many letters (max. {0})".format(
+                MAX_LETTERS))
+        self.level = level
+        self.id = hashlib.sha1("{0}|{1}".format(
+            " ".join(self.alphabet), level).encode('utf-8')).hexdigest()[:16]
+
+        # the code points -> rank chars (the marks are removed)
+        self._ranks = _Table(_rank, _marks())
+        self._multi = []  # [(NFD letter, placeholder, rank char)]
+        table = bytearray(range(256))  # ASCII bytes -> rank bytes
+        for i, letter in enumerate(self.alphabet):
+            letter = unicodedata.normalize('NFD', letter.lower())
+            rank = chr(ALPHABET_BASE + i)
+            if len(letter) == 1:
+                self._ranks[ord(letter)] = rank
+                if letter.isascii():
+                    table[ord(letter)] = ALPHABET_BASE + i
+            else:
+                placeholder = chr(_PLACEHOLDER_BASE + i)
+                self._ranks[ord(placeholder)] = rank
+                self._multi.append((letter, placeholder, rank))
+        self._multi.sort(key=lambda lpr: -len(lpr[0]))
+        self._ascii_multi = [(l, r) for l, _, r in self._multi
+                             if l.isascii()]
+        self._table = bytes(table)
+
+    def _primary(self, word: str, nfd: str) -> str:
+        """It returns the letters' part of the key (level 1)."""
+        if word.isascii():
+            low = word.lower()
+            for letter, rank in self._ascii_multi:
+                low = low.replace(letter, rank)
+            return low.encode('latin-1').translate(self._table).decode(
+                'latin-1')
+        low = nfd.lower()
+        for letter, placeholder, _ in self._multi:
+            low = low.replace(letter, placeholder)
+        return low.translate(self._ranks)
+
+    def sort_key(self, word: str) -> str:
+        """
+        It returns the sort key of a word.
+
+        Parameters:
+            word -- The word
+
+        Return:
+            A string that can be compared with the other sort keys
+        """
+        ascii_ = word.isascii()
+        nfd = word if ascii_ else unicodedata.normalize('NFD', word)
+        primary = self._primary(word, nfd)
+        if self.level == PRIMARY:
+            return primary
+        base = word if ascii_ else _mark_pattern().sub("", nfd)
+        secondary = ("\x01" * len(base) if len(base) == len(nfd)
+                     else nfd.translate(_diacritics()))
+        if self.level == SECONDARY:
+            return primary + LEVEL_SEPARATOR + secondary
+        return (primary + LEVEL_SEPARATOR + secondary + LEVEL_SEPARATOR +
+                base.swapcase())
+
+
+"""
+Collations of the entry languages (the keys are the same as in the
+language definition line of the dschictionary files).
+
+The languages that are not listed here are sorted by the code points of
+their words.
+
+Example:
+    COLLATIONS = {
+        'Spanish': Collation("a b c d e f g h i j k l m n ñ o p q r s t u v "
+                             "w x y z", PRIMARY)
+    }
+"""
+COLLATIONS = {}
+
+
+def get_collation(language: str):
+    """It returns the collation of a language (or None if there's none)."""
+    return COLLATIONS.get(language)
@@ -0,0 +1,261 @@
+"""
+Structural diff of two versions of a dschictionary.
+
+The entries are matched by their words (through dictionaries, so the order
+of the entries doesn't matter and the diff is built in linear time). The
+changes are reported per field and per meaning.
+
+Usage:
+    python dschictionary.py diff [-f text|json|summary] old.txt new.txt
+"""
+
+
+import difflib
+import json
+import operator
+
+
+"""The compared fields of the entries (key -> name in the reports)."""
+FIELDS = {
+    'pro': 'pronunciation',
+    'dsc': 'description',
+    'ori': 'origin',
+    'com': 'comment',
+    'see': 'see also'
+}
+
+"""The possible formats of the reports."""
+FORMATS = ('text', 'json', 'summary')
+
+
+"""The compared fields of an entry (in the order of FIELDS) as a tuple."""
+_fields = operator.attrgetter('_pronunciation', '_description', '_origin',
+                              '_comment', '_see')
+
+"""The compared fields of a meaning as a tuple."""
+_meaning = operator.attrgetter('_part_of_speech', '_class', '_case',
+                               '_definition', '_level')
+
+
+def _meanings(e) -> list:
+    """It returns the meanings of an entry as comparable tuples."""
+    return list(map(_meaning, e._meanings))
+
+
+def _group(entries) -> dict:
+    """It returns the entries by word (word -> list of entries)."""
+    words = {}
+    for e in entries:
+        words.setdefault(e.word(), []).append(e)
+    return words
+
+
+class EntryChange:
+    """The changes of an entry (that exists in both versions)."""
+
+    def __init__(self, old, new):
+        """
+        Compare two versions of an entry.
+
+        Parameters:
+            old -- The old Entry instance
+            new -- The new Entry instance
+        """
+        self.old = old
+        self.new = new
+        self.fields = {}  # key -> (old value, new value)
+        self.meanings = []  # (op, old Meaning or None, new Meaning or None)
+
+        for key, a, b in zip(FIELDS, _fields(old), _fields(new)):
+            if a != b:
+                self.fields[key] = (a, b)
+
+        a, b = _meanings(old), _meanings(new)
+        if a != b:
+            matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+            for op, i1, i2, j1, j2 in matcher.get_opcodes():
+                olds, news = old._meanings[i1:i2], new._meanings[j1:j2]
+                if op == 'replace':
+                    for m, n in zip(olds, news):
+                        self.meanings.append(('changed', m, n))
+                    num = min(len(olds), len(news))
+                    olds, news = olds[num:], news[num:]
+                if op in ('replace', 'delete'):
+                    self.meanings.extend(('removed', m, None) for m in olds)
+                if op in ('replace', 'insert'):
+                    self.meanings.extend(('added', None, n) for n in news)
+
+    def word(self) -> str:
+        """It returns the word of the entry."""
+        return self.new.word()
+
+    def __bool__(self) -> bool:
+        """It returns True if the entry is changed."""
+        return bool(self.fields or self.meanings)
+
+    def changed_parts(self) -> list:
+        """It returns the names of the changed parts (fields and meanings)."""
+        return [FIELDS[key] for key in self.fields] + \
+            (['meanings'] if self.meanings else [])
+
+    def get_change_as_dict(self) -> dict:
+        """
+        It returns the changes as a dictionary.
+
+        Keys:
+            wrd -- the word
+            fields -- {key: {'old': value, 'new': value}}
+            mea -- list of {'op': added/removed/changed, 'old': meaning,
+                   'new': meaning} (see Meaning.get_meaning_as_dict())
+        """
+        return {'wrd': self.word(),
+                'fields': {key: {'old': a, 'new': b}
+                           for key, (a, b) in self.fields.items()},
+                'mea': [{'op': op,
+                         'old': m.get_meaning_as_dict(True) if m else None,
+                         'new': n.get_meaning_as_dict(True) if n else None}
+                        for op, m, n in self.meanings]}
+
+
+class DschictionaryDiff:
+    """
+    The differences between two versions of a dschictionary.
+
+    The entries with the same word are paired in their order (if a word has
+    more entries), the other ones are added or removed entries.
+    """
+
+    def __init__(self, old_entries, new_entries):
+        """
+        Compare two versions.
+
+        Parameters:
+            old_entries -- Iterable of the old Entry instances
+            new_entries -- Iterable of the new Entry instances (the order of
+                           the reports follows their order)
+        """
+        self._added = []
+        self._removed = []
+        self._changed = []
+        self._unchanged = 0
+
+        old_words = _group(old_entries)
+        for word, news in _group(new_entries).items():
+            olds = old_words.pop(word, ())
+            for old, new in zip(olds, news):
+                change = EntryChange(old, new)
+                if change:
+                    self._changed.append(change)
+                else:
+                    self._unchanged += 1
+            self._added.extend(news[len(olds):])
+            self._removed.extend(olds[len(news):])
+        for olds in old_words.values():
+            self._removed.extend(olds)
+
+    def added(self) -> list:
+        """It returns the new entries."""
+        return self._added
+
+    def removed(self) -> list:
+        """It returns the removed entries."""
+        return self._removed
+
+    def changed(self) -> list:
+        """It returns the changes of the changed entries (EntryChange)."""
+        return self._changed
+
+    def num_of_unchanged(self) -> int:
+        """It returns the number of unchanged entries."""
+        return self._unchanged
+
+    def __bool__(self) -> bool:
+        """It returns True if there are any differences."""
+        return bool(self._added or self._removed or self._changed)
+
+    def get_diff_as_dict(self) -> dict:
+        """
+        It returns the differences as a dictionary (JSON serializable).
+
+        Keys:
+            added, removed -- the entries (see Entry.get_entry_as_dict())
+            changed -- the changes (see EntryChange.get_change_as_dict())
+            unchanged -- number of unchanged entries
+        """
+        return {'added': [e.get_entry_as_dict(flat=True)
+                          for e in self._added],
+                'removed': [e.get_entry_as_dict(flat=True)
+                            for e in self._removed],
+                'changed': [c.get_change_as_dict() for c in self._changed],
+                'unchanged': self._unchanged}
+
+    def generate_diff(self):
+        """
+        It generates the differences as text line by line.
+
+        Format:
+            + word (added entry), - word (removed entry), ~ word (changed
+            entry) with its changed fields and meanings (in the input
+            format)
+        """
+        for e in self._added:
+            yield "+ " + e.word() + "\n"
+        for e in self._removed:
+            yield "- " + e.word() + "\n"
+        for c in self._changed:
+            yield "~ " + c.word() + "\n"
+            for key, (a, b) in c.fields.items():
+                yield "    {0}: {1!r} -> {2!r}\n".format(FIELDS[key], a, b)
+            for op, m, n in c.meanings:
+                if m:
+                    yield "    -" + m.get_meaning_as_source() + "\n"
+                if n:
+                    yield "    +" + n.get_meaning_as_source() + "\n"
+
+    def get_diff_as_string(self) -> str:
+        """It returns the differences as text (see generate_diff())."""
+        return "".join(self.generate_diff())
+
+    def get_summary_as_string(self) -> str:
+        """It returns a changelog-like summary of the differences."""
+        lines = []
+        if self._added:
+            lines.append("- Added ({0}): {1}".format(
+                len(self._added), ", ".join(e.word() for e in self._added)))
+        if self._removed:
+            lines.append("- Removed ({0}): {1}".format(
+                len(self._removed),
+                ", ".join(e.word() for e in self._removed)))
+        if self._changed:
+            lines.append("- Changed ({0}): {1}".format(
+                len(self._changed),
+                ", ".join("{0} ({1})".format(c.word(),
+                                             ", ".join(c.changed_parts()))
+                          for c in self._changed)))
+        return "\n".join(lines or ["- No changes"]) + "\n"
+
+    def generate_report(self, format_='text'):
+        """
+        It generates a report of the differences.
+
+        Parameters:
+            format_ -- text, json or summary (see FORMATS)
+        """
+        if format_ == 'text':
+            return self.generate_diff()
+        if format_ == 'json':
+            return iter((json.dumps(self.get_diff_as_dict(),
+                                    ensure_ascii=False, indent=1) + "\n",))
+        if format_ == 'summary':
+            return iter((self.get_summary_as_string(),))
+        raise ValueError("Unknown format: " + format_)
+
+
+def diff_dschictionaries(old, new) -> DschictionaryDiff:
+    """
+    It compares two (read) Dschictionary instances.
+
+    Return:
+        A DschictionaryDiff instance
+    """
+    return DschictionaryDiff(old.entries(), new.entries())
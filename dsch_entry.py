@@ -25,6 +25,11 @@ class Entry:
     _origin = ""  # <
     _comment = ""  # |
     _see = ""  # >
+    _sort_key = None  # cached sort key (see sort_key())
+    _sort_collation = None  # id of the collation of the cached sort key
+    _line = 0  # line number in the source file (0: unknown)
+    _homograph = 0  # number of the homograph (0: it's not a homograph)
+    _merged_values = None  # joined field values (see dsch_merge.py)
 
     ORIGIN_CHAR = "<"
     COMMENT_CHAR = "|"
@@ -64,7 +69,7 @@ class Entry:
         """It adds multiple meanings."""
         out = []
         for meaning_ in meanings:
-            if isinstance(meaning_, meaning_.Meaning):
+            if isinstance(meaning_, meaning.Meaning):
                 out.append(meaning_)
         return out
 
@@ -88,6 +93,7 @@ class Entry:
                 pro.strip().rstrip(self.PRONOUNCIATION_CHAR).strip()
         else:
             self._word = nu_word
+        self._sort_key = None
 
     def add_description(self, nu_description: str):
         """Add or modify description."""
@@ -147,6 +153,29 @@ class Entry:
         """Get word."""
         return self._word
 
+    def line(self) -> int:
+        """Get the line number in the source file (0 if unknown)."""
+        return self._line
+
+    def homograph(self) -> int:
+        """Get the number of the homograph (0 if it's not a homograph)."""
+        return self._homograph
+
+    def sort_key(self, collation=None):
+        """
+        Get the sort key of the word (it's computed only once).
+
+        Parameters:
+            collation -- A dsch_collation.Collation instance or None (to
+                         sort by the code points)
+        """
+        cid = collation.id if collation else None
+        if self._sort_key is None or self._sort_collation != cid:
+            self._sort_key = (collation.sort_key(self._word) if collation
+                              else self._word)
+            self._sort_collation = cid
+        return self._sort_key
+
     def description(self):
         """Get description."""
         return self._description
@@ -184,6 +213,10 @@ class Entry:
         """Get see."""
         return self._see
 
+    def see_list(self) -> list:
+        """Get the 'see also' words as a list."""
+        return [w.strip() for w in self._see.split(",") if w.strip()]
+
     def __add__(self, meaning_: meaning.Meaning):
         """
         It adds a new meaning.
@@ -241,10 +274,43 @@ class Entry:
             else:
                 self.add_description(text)
 
-    def get_entry_as_dict(self) -> dict:
+    def get_entry_as_source(self, indentchar=" ") -> str:
+        """
+        It returns the whole entry in the dschictionary input format.
+
+        The returned text can be read back by Dschictionary (it does not
+        contain the blank line that separates the entries).
+
+        Parameters:
+            indentchar -- the character of indentation of the meanings
+
+        Return:
+            Lines of the entry, each one is closed by a line break.
+        """
+        lines = [self.word() + (" {0}{1}{0}".format(self.PRONOUNCIATION_CHAR,
+                                                     self.pronunciation())
+                                if self.pronunciation() else "")]
+        if self.description():
+            lines.append(self.description())
+        lines.extend(m.get_meaning_as_source(indentchar)
+                     for m in self._meanings)
+        if self.origin():
+            lines.append(self.ORIGIN_CHAR + " " + self.origin())
+        if self.comment():
+            lines.append(self.COMMENT_CHAR + " " + self.comment())
+        if self.see():
+            lines.append(self.SEE_CHAR + " " + self.see())
+        return "\n".join(lines) + "\n"
+
+    def get_entry_as_dict(self, flat=False) -> dict:
         """
         It returns a whole entry (with its meanings) as a dictionary.
 
+        Parameters:
+            flat -- If True, the meanings are dictionaries too (see
+                    Meaning.get_meaning_as_dict(raw=True)), so the result
+                    contains only plain (e.g. JSON serializable) values.
+
         Keys:
             idx -- the id
             wrd -- the word itself (that is all for)
@@ -261,7 +327,8 @@ class Entry:
                 'wrd': self.word(),
                 'pro': self.pronunciation(),
                 'dsc': self.description(),
-                'mea': self.get_meanings_as_list(),
+                'mea': ([m.get_meaning_as_dict(True) for m in self._meanings]
+                        if flat else self.get_meanings_as_list()),
                 'ori': self.origin(),
                 'com': self.comment(),
                 'see': self.see()}
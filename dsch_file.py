@@ -0,0 +1,314 @@
+"""
+File handling helpers: atomic (crash-safe) writing, inter-process locks and
+transparent compression.
+
+A file is never written in place: the new content goes into a temporary file
+in the same directory, that is synced to the disk and then renamed over the
+original file. So a crash can't leave a truncated file behind, the readers
+see either the old or the new content.
+
+The gzip, bz2 and xz compressed files are read and written transparently
+(they are recognized by their extensions or by their first bytes). Like
+the compression modules, shutil and tempfile are imported only by the
+writers, so the readers (e.g. a lookup) don't pay for them.
+"""
+
+
+import contextlib
+import importlib
+import io
+import os
+
+try:  # POSIX
+    import fcntl
+except ImportError:
+    fcntl = None
+try:  # Windows
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+"""Extension of the lock files (they are next to the locked files)."""
+LOCK_EXTENSION = '.lock'
+
+"""Extension of the edit journals (see dsch_journal.py)."""
+JOURNAL_EXTENSION = '.journal'
+
+"""Extension of the manifests of the shards (see dsch_shard.py)."""
+MANIFEST_EXTENSION = '.shards.json'
+
+"""Buffer size of the copies (in bytes)."""
+COPY_BUFFER = 1024 * 1024
+
+"""
+Supported compressions: name -> (extension, magic bytes, module name).
+
+The modules are imported only when a compressed file is opened.
+"""
+COMPRESSIONS = {
+    'gzip': ('.gz', b'\x1f\x8b', 'gzip'),
+    'bz2': ('.bz2', b'BZh', 'bz2'),
+    'xz': ('.xz', b'\xfd7zXZ\x00', 'lzma')
+}
+
+
+def _module(compression: str):
+    """It returns (imports) the module of a compression."""
+    return importlib.import_module(COMPRESSIONS[compression][2])
+
+
+def compression_by_extension(filename: str):
+    """It returns the compression of a file by its extension (or None)."""
+    for name, (ext, _, _) in COMPRESSIONS.items():
+        if filename.endswith(ext):
+            return name
+    return None
+
+
+def detect_compression(filename: str):
+    """
+    It returns the compression of an existing file by its first bytes (or
+    by its extension if the file doesn't exist).
+    """
+    try:
+        with open(filename, 'rb') as f:
+            head = f.read(6)
+    except FileNotFoundError:
+        return compression_by_extension(filename)
+    for name, (_, magic, _) in COMPRESSIONS.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def compression_extension(filename: str) -> str:
+    """It returns the compression's extension of a file name (e.g. '.gz')."""
+    name = compression_by_extension(filename)
+    return COMPRESSIONS[name][0] if name else ''
+
+
+def strip_compression(filename: str) -> str:
+    """It returns the file name without the compression's extension."""
+    ext = compression_extension(filename)
+    return filename[:-len(ext)] if ext else filename
+
+
+def root_filename(filename: str) -> str:
+    """
+    It returns the file name without its compression's and format's
+    extensions, the directory is kept (e.g. 'dir/example.txt.gz' ->
+    'dir/example').
+    """
+    return os.path.splitext(strip_compression(filename))[0]
+
+
+def open_file(filename: str, mode='r', encoding='utf-8'):
+    """
+    Open a (maybe compressed) file for reading.
+
+    The compression is recognized by the first bytes of the file.
+
+    Parameters:
+        filename -- The file's name
+        mode -- 'r' (text) or 'rb' (binary, decompressed)
+        encoding -- Encoding of the text mode
+
+    Return:
+        A file object (it raises FileNotFoundError like open())
+    """
+    name = detect_compression(filename)
+    if name is None:
+        if 'b' in mode:
+            return open(filename, 'rb')
+        return open(filename, 'r', encoding=encoding)
+    module = _module(name)
+    if 'b' in mode:
+        return module.open(filename, 'rb')
+    return module.open(filename, 'rt', encoding=encoding)
+
+
+def _compressor(raw, compression):
+    """It returns a compressing file object over raw (or None)."""
+    if compression is None:
+        return None
+    if compression == 'gzip':  # without file name and time in the header
+        return _module(compression).GzipFile(filename='', mode='wb',
+                                             fileobj=raw, mtime=0)
+    return _module(compression).open(raw, 'wb')
+
+
+def _fsync_directory(directory: str):
+    """It syncs a directory (the rename) to the disk, where it's possible."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _umask() -> int:
+    """It returns the current umask."""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+@contextlib.contextmanager
+def atomic_open(filename: str, mode='w', encoding='utf-8',
+                compression='auto'):
+    """
+    Open a file for an atomic rewrite.
+
+    The content is written into a temporary file that replaces the original
+    file (keeping its permissions) only if the with block succeeds.
+
+    Parameters:
+        filename -- The file's name
+        mode -- 'w' (text) or 'wb' (binary)
+        encoding -- Encoding of the text mode
+        compression -- 'gzip', 'bz2', 'xz', None (no compression) or 'auto'
+                       (by the file's extension)
+
+    Example:
+        with atomic_open('example.txt') as f:
+            f.write(content)
+    """
+    import shutil
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmpname = tempfile.mkstemp(prefix='.' + os.path.basename(filename),
+                                   suffix='.tmp', dir=directory)
+    if compression == 'auto':
+        compression = compression_by_extension(filename)
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            comp = _compressor(raw, compression)
+            layer = comp or raw
+            if 'b' in mode:
+                f = layer
+            else:
+                f = io.TextIOWrapper(layer, encoding=encoding, newline='')
+            yield f
+            if f is not layer:
+                f.flush()
+                f.detach()
+            if comp:
+                comp.close()  # it doesn't close raw
+            raw.flush()
+            os.fsync(raw.fileno())
+        if os.path.exists(filename):
+            shutil.copymode(filename, tmpname)
+        else:
+            os.chmod(tmpname, 0o666 & ~_umask())
+        os.replace(tmpname, filename)
+    except BaseException:
+        try:
+            os.remove(tmpname)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def _copy(src, dst):
+    """It copies an opened file into another (by sendfile if it's possible)."""
+    if hasattr(os, 'sendfile'):
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        dst.flush()
+        try:
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset,
+                                   size - offset)
+                if not sent:
+                    break
+                offset += sent
+            return
+        except OSError:
+            if offset:  # it can't be continued by copyfileobj
+                raise
+    import shutil
+
+    shutil.copyfileobj(src, dst, COPY_BUFFER)
+
+
+def atomic_copy(filename: str, copyname: str):
+    """
+    It copies a file (streaming, without reading it into the memory).
+
+    The bytes are copied as they are (a compressed file stays compressed).
+
+    Parameters:
+        filename -- The source file's name
+        copyname -- The copy's name (it's replaced atomically)
+    """
+    with open(filename, 'rb') as src, \
+            atomic_open(copyname, 'wb', compression=None) as dst:
+        _copy(src, dst)
+
+
+def has_journal(filename: str) -> bool:
+    """It returns True if a dschictionary file has an edit journal."""
+    return os.path.exists(filename + JOURNAL_EXTENSION)
+
+
+def is_manifest(filename: str) -> bool:
+    """It returns True if the file is a manifest of shards."""
+    return filename.endswith(MANIFEST_EXTENSION)
+
+
+def file_stamp(filename: str):
+    """
+    It returns a stamp of a file that changes when the file is replaced or
+    modified (its inode, size and modification time).
+
+    Return:
+        The stamp (a tuple), None if the file doesn't exist
+    """
+    try:
+        st = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+@contextlib.contextmanager
+def file_lock(filename: str):
+    """
+    Lock a file (advisory lock) against the other processes.
+
+    It waits until the lock is released by the other process. The lock is
+    held on a separate lock file (filename + LOCK_EXTENSION), because the
+    locked file itself is replaced while it's locked.
+
+    Parameters:
+        filename -- The file's name
+    """
+    with open(filename + LOCK_EXTENSION, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,115 @@
+"""Resolved 'see also' cross-references of a dschictionary."""
+
+
+class SeeGraph:
+    """
+    The graph of the 'see also' (>) references between the entries.
+
+    The references are resolved once (in a single pass over the entries),
+    every query works on the built graph.
+    """
+
+    def __init__(self, entries, index: dict):
+        """
+        Resolve the references of the entries.
+
+        Parameters:
+            entries -- Iterable of Entry instances
+            index -- Every existing word (word -> Entry, see
+                     Dschictionary.index())
+        """
+        self._links = {}  # word -> existing target words
+        self._backlinks = {}  # word -> words that refer to it
+        self._broken = []  # (word, missing target word)
+        self._components = None  # word -> its component (built on demand)
+
+        for e in entries:
+            word = e.word()
+            links = self._links.setdefault(word, [])
+            for target in e.see_list():
+                if target in index:
+                    if target not in links:
+                        links.append(target)
+                        self._backlinks.setdefault(target, []).append(word)
+                else:
+                    self._broken.append((word, target))
+
+    def links(self, word: str) -> list:
+        """It returns the (existing) words that the word refers to."""
+        return self._links.get(word, [])
+
+    def backlinks(self, word: str) -> list:
+        """It returns the words that refer to the word ("what points here")."""
+        return self._backlinks.get(word, [])
+
+    def broken(self) -> list:
+        """It returns the references to missing words as (word, target)."""
+        return self._broken
+
+    def related(self, word: str, depth=1, backlinks=True) -> dict:
+        """
+        It returns the related words within a distance (breadth-first).
+
+        Parameters:
+            word -- The starting word
+            depth -- Maximum distance (number of references)
+            backlinks -- Follow the references backwards too
+
+        Return:
+            {related word: distance} (without the starting word)
+        """
+        found = {word: 0}
+        level = [word]
+        for distance in range(1, depth + 1):
+            nxt = []
+            for w in level:
+                neighbours = self.links(w)
+                if backlinks:
+                    neighbours = neighbours + self.backlinks(w)
+                for n in neighbours:
+                    if n not in found:
+                        found[n] = distance
+                        nxt.append(n)
+            if not nxt:
+                break
+            level = nxt
+        del found[word]
+        return found
+
+    def _build_components(self):
+        """It finds the connected components (union-find)."""
+        parent = {}
+
+        def find(w):
+            root = w
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while w != root:  # path compression
+                parent[w], w = root, parent[w]
+            return root
+
+        for word, links in self._links.items():
+            for target in links:
+                a, b = find(word), find(target)
+                if a != b:
+                    parent[b] = a
+        groups = {}
+        self._components = {}  # word -> the list of its component
+        for w in self._links:
+            self._components[w] = groups.setdefault(find(w), [])
+            self._components[w].append(w)
+
+    def component(self, word: str) -> list:
+        """It returns the words of the word's connected component."""
+        if self._components is None:
+            self._build_components()
+        return self._components.get(word, [])
+
+    def components(self) -> list:
+        """It returns every connected component as a list of words."""
+        if self._components is None:
+            self._build_components()
+        out = {}
+        for c in self._components.values():
+            out[id(c)] = c
+        return list(out.values())
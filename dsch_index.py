@@ -0,0 +1,156 @@
+"""
+Pronunciation index of a dschictionary (rhyme, suffix and syllable search).
+
+The pronunciations are split into syllables (on '-', the stress marks are
+ignored), e.g. "'po-na" -> ['po', 'na']. The index contains the reversed
+pronunciations in sorted order, so the words with a given ending (and the
+rhymes) are found by binary search, and the words by syllable count are
+grouped in advance.
+"""
+
+
+import bisect
+import fnmatch
+
+
+"""The syllable separator of the pronunciations."""
+SYLLABLE_SEPARATOR = "-"
+
+"""The stress marks (they're ignored by the index)."""
+STRESS_MARKS = "'ˈˌ"
+
+_STRIP_STRESS = str.maketrans("", "", STRESS_MARKS)
+_DOUBLE_SEPARATOR = SYLLABLE_SEPARATOR * 2
+_MAX_CHAR = chr(0x10FFFF)  # it's after every character
+
+
+def syllables(pronunciation: str) -> list:
+    """
+    It returns the syllables of a pronunciation.
+
+    Example:
+        syllables("'po-na") -> ['po', 'na']
+    """
+    return [s.strip() for s in pronunciation.translate(_STRIP_STRESS).split(
+        SYLLABLE_SEPARATOR) if s.strip()]
+
+
+def normalize(pronunciation: str) -> str:
+    """
+    It returns the syllables of a pronunciation joined by the separator.
+
+    Example:
+        normalize("'po-na") -> "po-na"
+    """
+    pro = pronunciation.translate(_STRIP_STRESS)
+    if (" " in pro or _DOUBLE_SEPARATOR in pro or
+            pro[:1] == SYLLABLE_SEPARATOR or pro[-1:] == SYLLABLE_SEPARATOR):
+        return SYLLABLE_SEPARATOR.join(syllables(pro))
+    return pro
+
+
+class PronunciationIndex:
+    """The index of the pronunciations of the entries."""
+
+    def __init__(self, entries):
+        """
+        Build the index (the entries without pronunciation are skipped).
+
+        Parameters:
+            entries -- Iterable of Entry instances
+        """
+        self._pronunciations = {}  # word -> normalized pronunciation
+        self._by_count = {}  # number of syllables -> words
+        suffixes = []  # (reversed pronunciation without separators, word)
+
+        pronunciations = self._pronunciations
+        by_count = self._by_count
+        for e in entries:
+            word = e.word()
+            pro = normalize(e.pronunciation())
+            if not pro or word in pronunciations:
+                continue
+            pronunciations[word] = pro
+            count = pro.count(SYLLABLE_SEPARATOR) + 1
+            if count in by_count:
+                by_count[count].append(word)
+            else:
+                by_count[count] = [word]
+            suffixes.append((pro.replace(SYLLABLE_SEPARATOR, "")[::-1], word))
+        suffixes.sort()
+        self._reversed = [s for s, _ in suffixes]
+        self._words = [w for _, w in suffixes]
+
+    def __len__(self) -> int:
+        """It returns the number of the indexed words."""
+        return len(self._words)
+
+    def syllables(self, word: str) -> list:
+        """It returns the syllables of a word's pronunciation (or [])."""
+        pro = self._pronunciations.get(word)
+        return pro.split(SYLLABLE_SEPARATOR) if pro else []
+
+    def syllable_count(self, word: str) -> int:
+        """It returns the number of syllables of a word (0 if unknown)."""
+        pro = self._pronunciations.get(word)
+        return pro.count(SYLLABLE_SEPARATOR) + 1 if pro else 0
+
+    def with_syllables(self, count: int) -> list:
+        """It returns the words with a given number of syllables."""
+        return self._by_count.get(count, [])
+
+    def _range(self, ending: str) -> tuple:
+        """It returns the slice of the words that end with ending."""
+        key = ending.translate(_STRIP_STRESS).replace(SYLLABLE_SEPARATOR,
+                                                      "")[::-1]
+        return (bisect.bisect_left(self._reversed, key),
+                bisect.bisect_right(self._reversed, key + _MAX_CHAR))
+
+    def ending(self, ending: str) -> list:
+        """
+        It returns the words whose pronunciation ends with ending.
+
+        Example:
+            index.ending("na") -> ['pona', ...]
+        """
+        start, stop = self._range(ending)
+        return self._words[start:stop]
+
+    def rhymes(self, word: str, num=1) -> list:
+        """
+        It returns the words that rhyme with a word.
+
+        Two words rhyme if the last num syllables of their pronunciations
+        are the same.
+
+        Parameters:
+            word -- An indexed word
+            num -- Number of the compared syllables
+
+        Return:
+            The rhyming words (without the word itself)
+        """
+        parts = self.syllables(word)
+        if not parts:
+            return []
+        tail = parts[-num:]
+        return [w for w in self.ending("".join(tail))
+                if w != word and self.syllables(w)[-len(tail):] == tail]
+
+    def matching(self, pattern: str) -> list:
+        """
+        It returns the words whose pronunciation matches a pattern.
+
+        The pattern is matched against the syllables joined by '-' (e.g.
+        "'po-na" -> "po-na") with the shell-style wildcards (*, ?, [...]).
+        If the pattern ends with literal characters, only the words with
+        that ending are checked (by binary search).
+
+        Example:
+            index.matching("p?-*na")
+        """
+        pattern = pattern.translate(_STRIP_STRESS)
+        literal = pattern[max(pattern.rfind(c) for c in "*?[]") + 1:]
+        start, stop = self._range(literal)
+        return [w for w in self._words[start:stop]
+                if fnmatch.fnmatchcase(self._pronunciations[w], pattern)]
@@ -0,0 +1,233 @@
+"""
+Instrumentation: phase timings, counters and throttled progress reports.
+
+An Instrument instance can be given to Dschictionary.read_dschictionary()
+and to the output classes (see dsch_out.py). It measures the wall time and
+the number of calls of every phase (open, languages, entries, sort, render,
+write, ...), and reports the progress at most once per interval instead of
+printing a message for every entry.
+
+The memory accounting is opt-in (memory=True): the allocations are traced by
+tracemalloc (it slows down the allocations), and the peak and the retained
+memory of every phase are recorded. The tracing lasts until the Instrument
+is closed (see close()), so the consecutive phases are measured together.
+"""
+
+
+import contextlib
+import json
+import time
+import tracemalloc
+
+
+class Instrument:
+    """Collects the timings and counters of the phases."""
+
+    def __init__(self, interval=1.0, report=None, memory=False):
+        """
+        Initialize an Instrument.
+
+        Parameters:
+            interval -- Minimum time between two progress reports (seconds);
+                        None turns off the progress reports
+            report -- Function of the progress reports, it gets a message
+                      and a category (default: print)
+            memory -- If True, the memory of the phases is measured too (see
+                      memory_phase())
+        """
+        self.interval = interval
+        self.report = report or (lambda message, category='': print(message))
+        self.memory = memory
+        self._phases = {}  # name -> [seconds, count]
+        self._counters = {}  # name -> number
+        self._memory = {}  # name -> [peak bytes, retained bytes]
+        self._peaks = []  # peaks of the running (nested) phases
+        self._base = None  # traced memory at the start of the first phase
+        self._peak = 0  # peak of the traced memory above self._base
+        self._tracing = False  # tracemalloc is started by this instance
+        self._hooks = []
+        self._last_report = 0.0
+
+    def add_hook(self, hook):
+        """
+        Add a hook that is called on every event.
+
+        The hook gets the event's kind ('phase', 'count' or 'progress'), name
+        and value (seconds, number or message).
+        """
+        self._hooks.append(hook)
+
+    def _emit(self, kind, name, value):
+        """It calls the hooks."""
+        for hook in self._hooks:
+            hook(kind, name, value)
+
+    def add_time(self, name: str, seconds: float, count=1):
+        """It adds a measured time to a phase."""
+        phase = self._phases.setdefault(name, [0.0, 0])
+        phase[0] += seconds
+        phase[1] += count
+        if self._hooks:
+            self._emit('phase', name, seconds)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Measure the time (and the memory, see memory_phase()) of a phase.
+
+        Example:
+            with instrument.phase('sort'):
+                entries.sort()
+        """
+        with self.memory_phase(name):
+            start = time.perf_counter()
+            try:
+                yield self
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def memory_phase(self, name: str):
+        """
+        Measure the memory of a phase (if self.memory is True).
+
+        The peak is the highest traced memory during the phase above the
+        traced memory at its start, the retained memory is the difference
+        of the traced memory at its end and at its start. The phases can be
+        nested (the peak of the inner phase counts in the outer one too).
+
+        Example:
+            with instrument.memory_phase('render'):
+                out.writelines(chunks)
+        """
+        if not self.memory:
+            yield self
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        start, peak = tracemalloc.get_traced_memory()
+        if self._base is None:
+            self._base = start
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+        try:
+            yield self
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._peaks.pop())
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            self._peak = max(self._peak, peak - self._base)
+            memory = self._memory.setdefault(name, [0, 0])
+            memory[0] = max(memory[0], peak - start)
+            memory[1] += current - start
+
+    def close(self):
+        """
+        It stops tracing the memory allocations if this instance started it
+        (see memory_phase()). The measured values are kept.
+        """
+        if self._tracing:
+            self._tracing = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def __enter__(self):
+        """Use it in a with statement."""
+        return self
+
+    def __exit__(self, *exc):
+        """Close it at the end of the with statement."""
+        self.close()
+
+    def count(self, name: str, num=1):
+        """It increases a counter."""
+        self._counters[name] = self._counters.get(name, 0) + num
+        if self._hooks:
+            self._emit('count', name, num)
+
+    def progress(self, message: str, category=''):
+        """It reports the progress (at most once per interval)."""
+        if self.interval is None:
+            return
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report(message, category)
+            if self._hooks:
+                self._emit('progress', category, message)
+
+    def peak_memory(self) -> int:
+        """
+        It returns the peak of the traced memory (bytes, 0 if unknown).
+
+        It's measured from the start of the first measured phase, so the
+        memory that was used before doesn't count.
+        """
+        return self._peak
+
+    def memory_summary(self) -> dict:
+        """
+        It returns the measured memory as a dictionary.
+
+        Keys:
+            peak -- the peak of the traced memory (bytes)
+            phases -- {name: {'peak': bytes, 'retained': bytes}}
+            per_entry, per_meaning -- the peak divided by the 'entries' and
+                                      'meanings' counters (or None)
+        """
+        return {'peak': self._peak,
+                'phases': {name: {'peak': m[0], 'retained': m[1]}
+                           for name, m in self._memory.items()},
+                'per_entry': self._per('entries'),
+                'per_meaning': self._per('meanings')}
+
+    def _per(self, counter: str):
+        """It returns the peak memory per a counter (or None)."""
+        num = self._counters.get(counter)
+        return round(self._peak / num, 1) if num and self._peak else None
+
+    def summary(self) -> dict:
+        """It returns the timings and the counters as a dictionary."""
+        summary = {'phases': {name: {'seconds': round(p[0], 6),
+                                     'count': p[1]}
+                              for name, p in self._phases.items()},
+                   'counters': dict(self._counters)}
+        if self.memory:
+            summary['memory'] = self.memory_summary()
+        return summary
+
+    def get_summary_as_string(self) -> str:
+        """It returns the timings and the counters as a formatted table."""
+        if not self.memory:
+            lines = ["{0:<14} {1:>10} {2:>8}".format("phase", "seconds",
+                                                     "count")]
+            for name, p in self._phases.items():
+                lines.append("{0:<14} {1:10.3f} {2:8}".format(name, p[0],
+                                                              p[1]))
+            for name, num in self._counters.items():
+                lines.append("{0:<14} {1:>10} {2:8}".format(name, "", num))
+            return "\n".join(lines)
+
+        lines = ["{0:<14} {1:>10} {2:>8} {3:>12} {4:>12}".format(
+            "phase", "seconds", "count", "peak KiB", "retained KiB")]
+        for name in dict.fromkeys(list(self._phases) + list(self._memory)):
+            p = self._phases.get(name)
+            m = self._memory.get(name)
+            lines.append("{0:<14} {1:>10} {2:>8} {3:>12} {4:>12}".format(
+                name, "{0:.3f}".format(p[0]) if p else "", p[1] if p else "",
+                m[0] // 1024 if m else "", m[1] // 1024 if m else ""))
+        for name, num in self._counters.items():
+            lines.append("{0:<14} {1:>10} {2:8}".format(name, "", num))
+        lines.append("peak memory: {0} KiB ({1} B/entry, {2} B/meaning)"
+                     .format(self._peak // 1024, self._per('entries'),
+                             self._per('meanings')))
+        return "\n".join(lines)
+
+    def write_json(self, filename: str):
+        """It writes the summary into a JSON file."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
@@ -0,0 +1,287 @@
+"""
+Append-only edit journal of a dschictionary file.
+
+The changes of an editing session are appended to a journal next to the
+dschictionary file (filename + dsch_file.JOURNAL_EXTENSION), so saving a
+change is a single append instead of a rewrite of the file. The records are
+the operations of dsch_patch.py (one JSON object per line). Loading applies
+the journal on top of the file in a single pass, and compacting folds it
+into the file (sorted, with a backup) and removes it.
+
+The first record of a journal is a header with the content hash of the
+file that it belongs to. If the file is changed after that (e.g. it's
+edited by hand, or the journal was left there by an interrupted
+compaction), the journal can't be loaded or extended until it's moved away
+(e.g. to the journal's name + STALE_EXTENSION) or removed, so the edits are
+never dropped silently. A truncated last record (e.g. after a crash) is
+dropped when the journal is read.
+
+Example:
+    journal = Journal("example.txt")
+    d = journal.load()
+    journal.append({"op": "set", "wrd": "toki", "com": "new comment"})
+    journal.compact()
+
+Usage:
+    python dschictionary.py patch --journal example.txt changes.jsonl
+    python dschictionary.py compact example.txt
+"""
+
+
+import hashlib
+import json
+import os
+import dschictionary_class as dsch
+import dsch_file
+import dsch_patch
+
+
+"""The suggested extension of a journal whose file is changed."""
+STALE_EXTENSION = ".stale"
+
+
+class JournalError(Exception):
+    """
+    Simple Error class for journal errors.
+
+    It's raised when a record of the journal is damaged (not the last one),
+    when the file of the journal is changed (see the module's description)
+    or when the operations can't be applied.
+    """
+
+    def __init__(self, message):
+        """
+        Just initialize it.
+
+        :param message: The message for the user
+        """
+        Exception.__init__(self, message)
+        self.message = message
+
+
+def journal_filename(filename: str) -> str:
+    """It returns the journal's name of a dschictionary file."""
+    return filename + dsch_file.JOURNAL_EXTENSION
+
+
+def _stamp(filename: str) -> list:
+    """It returns the size and the modification time of a file."""
+    st = os.stat(filename)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def content_hash(filename: str) -> str:
+    """It returns the content hash (SHA-256 in hexadecimal) of a file."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_journal(journalname: str) -> tuple:
+    """
+    It reads the records of a journal.
+
+    The bytes after the last line break (a truncated record) are ignored.
+
+    Return:
+        (header or None, list of operations, size of the complete records)
+
+    Raises:
+        JournalError if a complete record is not valid
+    """
+    try:
+        with open(journalname, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None, [], 0
+    size = data.rfind(b"\n") + 1
+    header = None
+    operations = []
+    for num, line in enumerate(data[:size].splitlines(), 1):
+        try:
+            record = json.loads(line)
+            if num == 1:
+                if type(record) is not dict or 'base' not in record:
+                    raise ValueError("the first record should be a header")
+                header = record
+            else:
+                dsch_patch.check_operation(record)
+                operations.append(record)
+        except ValueError as exc:
+            raise JournalError("{0}:{1}: invalid record: {2}".format(
+                journalname, num, exc))
+        except dsch_patch.PatchError as exc:
+            raise JournalError("{0}:{1}: {2}".format(journalname, num,
+                                                     exc.message))
+    return header, operations, size
+
+
+class Journal:
+    """The journal of a dschictionary file."""
+
+    def __init__(self, filename: str):
+        """
+        Initialize the journal of a dschictionary file (nothing is read).
+
+        Parameters:
+            filename -- The dschictionary file's name
+        """
+        self.filename = filename
+        self.journalname = journal_filename(filename)
+        self.recovered = False  # a truncated record was dropped
+        self._index = None  # word -> current Entry (see load())
+        self._idx = 0  # the highest id of the entries
+        self._size = 0  # size of the journal (when it was read or written)
+        self._stamp = None  # stamp of the dschictionary file (see _stamp())
+        self._base = None  # content hash of the dschictionary file
+
+    def _read(self) -> list:
+        """
+        It reads the journal (the file should be locked).
+
+        Raises:
+            JournalError if the journal is damaged or its file is changed
+        """
+        header, operations, size = read_journal(self.journalname)
+        self._stamp = _stamp(self.filename)
+        self._base = content_hash(self.filename)
+        if header is not None and header['base'] != self._base:
+            raise JournalError(
+                "{0} is changed since its journal was started, the journal "
+                "isn't applied. Check the edits of {1}, then move it away "
+                "(e.g. to {2}) or remove it.".format(
+                    self.filename, self.journalname,
+                    self.journalname + STALE_EXTENSION))
+        if os.path.exists(self.journalname) and \
+                os.path.getsize(self.journalname) > size:
+            os.truncate(self.journalname, size)  # drop the truncated record
+            self.recovered = True
+        self._size = size
+        return operations
+
+    def _load(self):
+        """It loads the dschictionary (the file should be locked)."""
+        operations = self._read()
+        try:
+            d = dsch_patch.read_patched(self.filename,
+                                        dsch_patch.Patch(operations))
+        except dsch_patch.PatchError as exc:
+            raise JournalError(exc.message)
+        self._index = dict(d.index())
+        self._idx = max((e.id() for e in d.entries()), default=0)
+        return d, operations
+
+    def load(self):
+        """
+        It reads the dschictionary file and applies the journal on it (in a
+        single pass).
+
+        Return:
+            The current (sorted) Dschictionary instance
+
+        Raises:
+            JournalError if the journal is damaged, its file is changed or
+            it can't be applied
+        """
+        with dsch_file.file_lock(self.filename):
+            return self._load()[0]
+
+    def _is_changed(self) -> bool:
+        """It returns True if the files are changed since they were read."""
+        size = (os.path.getsize(self.journalname)
+                if os.path.exists(self.journalname) else 0)
+        return size != self._size or _stamp(self.filename) != self._stamp
+
+    def extend(self, operations):
+        """
+        It appends operations to the journal (all or none of them).
+
+        The operations are validated against the current entries (e.g. a
+        deleted word must have an entry), then they're written by a single
+        append (and fsync).
+
+        Parameters:
+            operations -- Iterable of operations (see dsch_patch.OPERATIONS)
+
+        Raises:
+            dsch_patch.PatchError if an operation is not valid
+            JournalError if the journal is damaged or its file is changed
+        """
+        with dsch_file.file_lock(self.filename):
+            if self._index is None or self._is_changed():
+                self._load()
+            changed = {}  # word -> new Entry or None
+            idx = self._idx
+            source = not dsch_file.strip_compression(self.filename).endswith(
+                dsch.JSONL_EXTENSION)
+            data = []
+            for operation in operations:
+                word = dsch_patch.check_operation(operation)
+                entry_ = (changed[word] if word in changed else
+                          self._index.get(word))
+                try:
+                    changed[word] = dsch_patch.apply_operation(
+                        entry_, operation, idx + 1, source)
+                except dsch.RecordError as recerror:
+                    raise dsch_patch.PatchError("{0}: {1}: {2}".format(
+                        word, operation['op'], recerror.message))
+                except dsch_patch.PatchError as exc:
+                    raise dsch_patch.PatchError("{0}: {1}: {2}".format(
+                        word, operation['op'], exc.message))
+                if operation['op'] == 'add':
+                    idx += 1
+                data.append(json.dumps(operation, ensure_ascii=False))
+            if not data:
+                return
+
+            if not self._size:  # a new journal (or without any record)
+                data.insert(0, json.dumps({'base': self._base}))
+                mode = 'wb'
+            else:
+                mode = 'ab'
+            with open(self.journalname, mode) as f:
+                f.write(("\n".join(data) + "\n").encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            self._size = os.path.getsize(self.journalname)
+        for word, entry_ in changed.items():
+            if entry_ is None:
+                self._index.pop(word, None)
+            else:
+                self._index[word] = entry_
+        self._idx = idx
+
+    def append(self, operation: dict):
+        """It appends an operation to the journal (see extend())."""
+        self.extend((operation,))
+
+    def compact(self, backup=True) -> int:
+        """
+        It folds the journal into the dschictionary file.
+
+        The file is rewritten (sorted, atomically, after a backup, see
+        dsch_patch.rewrite_file()), then the journal is removed.
+
+        Parameters:
+            backup -- If True, the original file is copied (see
+                      dsch_patch.backup_filename())
+
+        Return:
+            Number of the folded operations
+
+        Raises:
+            JournalError if the journal is damaged, its file is changed or
+            it can't be applied
+        """
+        with dsch_file.file_lock(self.filename):
+            d, operations = self._load()
+            if operations:
+                dsch_patch.rewrite_file(self.filename, d, backup)
+            if os.path.exists(self.journalname):
+                os.remove(self.journalname)
+            self._stamp = _stamp(self.filename)
+            self._base = content_hash(self.filename)
+            self._size = 0
+        return len(operations)
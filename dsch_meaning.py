@@ -12,6 +12,9 @@ Modify it as you want (but it's recommended to keep the original version).
 """
 PART_OF_SPEECH = pos.DEFAULT
 
+"""The pattern of a definition (the rest of a meaning line is ignored)."""
+DEFINITION_PATTERN = r"[\w'\" ,\.]*"
+
 
 class Meaning:
     """It a definition / meaning of a word."""
@@ -83,14 +86,39 @@ class Meaning:
         """Get level."""
         return self._level
 
-    def get_meaning_as_dict(self) -> dict:
-        """It returns a meaning as dict (keys: pos, cas, cls, def, lvl)."""
+    def get_meaning_as_dict(self, raw=False) -> dict:
+        """
+        It returns a meaning as dict (keys: pos, cas, cls, def, lvl).
+
+        Parameters:
+            raw -- If True, the missing definition is "" instead of "n/a"
+        """
         return {'pos': self.part_of_speech(),
                 'cas': self.case(),
                 'cls': self.class_(),
-                'def': self.definition(),
+                'def': self._definition if raw else self.definition(),
                 'lvl': self.level()}
 
+    def get_meaning_as_source(self, indentchar=" ") -> str:
+        """
+        It returns the meaning in the dschictionary input format.
+
+        Parameters:
+            indentchar -- the character of indentation
+
+        Return:
+            A single line (without line break), e.g.: " (adj:lili) good"
+        """
+        return "{ind}({pos}{clsc}{cls}{casc}{cas}){sp}{def_}".format(
+            ind=indentchar * self.level(),
+            pos=self.part_of_speech(),
+            clsc=":" if self.class_() else "",
+            cls=self.class_(),
+            casc="+" if self.case() else "",
+            cas=self.case(),
+            sp=" " if self._definition else "",
+            def_=self._definition)
+
     def __str__(self):
         """Return a wannabe well-formated string."""
         return ("pos: {pos}, "
@@ -126,7 +154,8 @@ class Meaning:
         if match:
             all_ = re.search((r"(?P<lvl>[" + indentchar + r"]*)"
                               r"\((?P<pos>[\w]*):?(?P<cls>[\w]*)"
-                              r"\+?(?P<case>[\w]*)\)(?P<def>[\w'\" ,\.]*)"),
+                              r"\+?(?P<case>[\w]*)\)(?P<def>" +
+                              DEFINITION_PATTERN + ")"),
                              text)
             all_ = all_.groupdict() if all_ else None
         else:
@@ -0,0 +1,259 @@
+"""
+Streaming merge of multiple (already sorted) dschictionary files.
+
+The inputs are read entry by entry and merged through a heap (k-way merge),
+so only one entry per input file (and the entries of the currently merged
+word) are held in memory.
+"""
+
+
+import heapq
+import itertools
+import os
+import dschictionary_class as dsch
+import dsch_file
+import dsch_collation
+
+
+"""
+The possible policies for entries that have the same word:
+    union -- merge the meanings and join the different fields
+    first -- keep the entry of the first given file
+    newest -- keep the entry of the most recently modified file
+"""
+POLICIES = ('union', 'first', 'newest')
+
+"""The separator of the joined descriptions, origins and comments."""
+FIELD_SEPARATOR = "; "
+
+"""The text fields that are joined by the union (Entry's getters)."""
+JOINED_FIELDS = ('description', 'origin', 'comment')
+
+
+class MergeError(Exception):
+    """
+    Simple Error class for merge errors.
+
+    It's raised when the input files cannot be merged (different languages,
+    unsorted input, unknown policy).
+    """
+
+    def __init__(self, message):
+        """
+        Just initialize it.
+
+        :param message: The message for the user
+        """
+        Exception.__init__(self, message)
+        self.message = message
+
+
+class _Source:
+    """A single input file of the merge."""
+
+    def __init__(self, filename, rank):
+        """
+        Open a dschictionary file and read its language definition.
+
+        Parameters:
+            filename -- The dschictionary file's name
+            rank -- Position of the file within the inputs
+        """
+        self.filename = filename
+        self.rank = rank
+        self.mtime = os.path.getmtime(filename)
+        self.file = dsch_file.open_file(filename)
+        try:
+            self.languages = dsch.parse_languages(self.file.readline())
+        except dsch.LanguageError as langerror:
+            self.file.close()
+            raise MergeError("{0}: {1}".format(filename, langerror.message))
+
+    def entries(self, collation=None):
+        """Yield (source, entry) pairs and check the order of the input."""
+        last = None
+        for e in dsch.iter_entries(self.file):
+            key = dsch.entry_sort_key(e, collation)
+            if last is not None and key < last:
+                raise MergeError("{0}: the file is not sorted ('{1}' is after "
+                                 "'{2}')".format(self.filename, e.word(),
+                                                 last))
+            last = key
+            yield self, e
+
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+
+def _field_values(e, name: str) -> list:
+    """
+    It returns the values of a text field of an entry (the joined values of
+    an already merged entry).
+    """
+    if e._merged_values:
+        return e._merged_values[name]
+    return [getattr(e, name)()]
+
+
+def _merge_fields(values) -> str:
+    """
+    It returns the different (non-empty) values of a text field joined by
+    FIELD_SEPARATOR. The values are compared as a whole, so a value that
+    contains the separator is never split.
+    """
+    unique = []
+    for value in values:
+        if value and value not in unique:
+            unique.append(value)
+    return FIELD_SEPARATOR.join(unique)
+
+
+def _merge_see(first, second):
+    """It returns the union of two comma separated 'see also' fields."""
+    words = []
+    for w in (first + "," + second).split(","):
+        w = w.strip()
+        if w and w not in words:
+            words.append(w)
+    return ", ".join(words)
+
+
+def union_entries(entries: list):
+    """
+    It merges entries of the same word into the first one.
+
+    The meanings and the 'see also' words are united (without duplicates),
+    the different descriptions, origins and comments are joined (see
+    FIELD_SEPARATOR), the empty pronunciation is filled from the later
+    entries.
+
+    Parameters:
+        entries -- Entry instances with the same word
+
+    Return:
+        The merged Entry instance
+    """
+    out = entries[0]
+    seen = [m.get_meaning_as_dict() for m in out._meanings]
+    values = {name: [v for e in entries for v in _field_values(e, name)]
+              for name in JOINED_FIELDS}
+    for e in entries[1:]:
+        for m in e._meanings:
+            md = m.get_meaning_as_dict()
+            if md not in seen:
+                seen.append(md)
+                out.add_meaning(m)
+        if not out.pronunciation():
+            out.add_pronunciation(e.pronunciation())
+        out.add_see(_merge_see(out.see(), e.see()))
+    out.add_description(_merge_fields(values['description']))
+    out.add_origin(_merge_fields(values['origin']))
+    out.add_comment(_merge_fields(values['comment']))
+    out._merged_values = values  # for the later merges of the word
+    return out
+
+
+def _resolve(group: list, policy: str):
+    """
+    It resolves a group of (source, entry) pairs with the same word.
+
+    Parameters:
+        group -- (source, entry) pairs in the order of the inputs
+        policy -- One of the POLICIES
+
+    Return:
+        A single Entry instance
+    """
+    if len(group) == 1:
+        return group[0][1]
+    if policy == 'union':
+        return union_entries([e for _, e in group])
+    if policy == 'first':
+        return group[0][1]
+    # newest: the latest modified file wins, the later file in a tie
+    newest = max(group, key=lambda se: (se[0].mtime, se[0].rank))[0]
+    return next(e for s, e in group if s is newest)
+
+
+def _group_words(group):
+    """
+    It splits a group of (source, entry) pairs with the same sort key by
+    their words (a collation can fold e.g. the case of the words).
+    """
+    words = {}
+    for se in group:
+        words.setdefault(se[1].word(), []).append(se)
+    return words.values()
+
+
+def merge_dschictionaries(filenames: list, outfilename: str,
+                          policy='union', collation=None):
+    """
+    It merges sorted dschictionary files into a single sorted file.
+
+    The output is written incrementally in the input format.
+
+    Parameters:
+        filenames -- Names of the input files (their order matters for the
+                     'first' and 'union' policies)
+        outfilename -- Name of the output file
+        policy -- How to resolve entries with the same word (see POLICIES)
+        collation -- A dsch_collation.Collation instance. If None, the
+                     collation of the entry language is used.
+
+    Return:
+        Number of written entries
+    """
+    if policy not in POLICIES:
+        raise MergeError("Unknown policy: {0} (possible policies: {1})".format(
+            policy, ", ".join(POLICIES)))
+    if not filenames:
+        raise MergeError("There's nothing to merge.")
+
+    sources = []
+    try:
+        for rank, filename in enumerate(filenames):
+            sources.append(_Source(filename, rank))
+        languages = sources[0].languages
+        for s in sources[1:]:
+            if s.languages != languages:
+                raise MergeError(
+                    "{0}: the languages ({1[0]} {3} {1[1]}) differ from "
+                    "{2}'s languages ({4[0]} {3} {4[1]})".format(
+                        s.filename, s.languages, sources[0].filename,
+                        dsch.LANGUAGE_SEPARATOR, languages))
+
+        if collation is None:
+            collation = dsch_collation.get_collation(languages[0])
+        merged = heapq.merge(*[s.entries(collation) for s in sources],
+                             key=lambda se: se[1].sort_key(collation))
+        num = 0
+        with dsch_file.atomic_open(outfilename) as out:
+            out.write("{0} {1} {2}\n".format(languages[0],
+                                             dsch.LANGUAGE_SEPARATOR,
+                                             languages[1]))
+            for _, group in itertools.groupby(
+                    merged, key=lambda se: se[1].sort_key(collation)):
+                for word in _group_words(group):
+                    out.write("\n" + dsch.check_source(
+                        _resolve(word, policy)).get_entry_as_source())
+                    num += 1
+    finally:
+        for s in sources:
+            s.close()
+    return num
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Merge sorted dschictionary files.")
+    parser.add_argument('output', help="output file")
+    parser.add_argument('inputs', nargs='+', help="sorted input files")
+    parser.add_argument('-p', '--policy', choices=POLICIES, default='union',
+                        help="how to resolve the same words")
+    args = parser.parse_args()
+    print(merge_dschictionaries(args.inputs, args.output, args.policy),
+          "entries are written.")
@@ -6,10 +6,37 @@ For developers: please write your own output-classes here!
 
 
 import dschictionary_class as dsch
-import codecs
+import dsch_instrument
+import dsch_stats
+import dsch_file
+import csv
+import io
+import json
+import os
+import time
 
 
-POS = dsch.entry.meaning.PART_OF_SPEECH
+"""The directory of the resources (e.g. dschict.css), next to the modules."""
+RESOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+"""The style sheet of the HTML output (in the RESOURCE_DIR)."""
+STYLE_FILE = 'dschict.css'
+
+_resources = {}  # name -> content (see resource())
+
+
+def resource(name: str) -> str:
+    """
+    It returns the content of a resource file (it's read only once).
+
+    Parameters:
+        name -- The resource's file name (relative to RESOURCE_DIR)
+    """
+    if name not in _resources:
+        with open(os.path.join(RESOURCE_DIR, name), 'r',
+                  encoding='utf-8') as f:
+            _resources[name] = f.read()
+    return _resources[name]
 
 
 class BaseDschictionary():
@@ -28,18 +55,67 @@ class BaseDschictionary():
 
     _dschict = None  # Dschictionary instance
     _fname = ''  # filename
-    _pos = {}  # used PoSs
+    _statistics = None  # statistics of the streamed entries
+    _max_memory = None  # memory limit of the external sort
+    _stamp = None  # stamp of the file when it was read (see file_stamp())
+    instrument = None  # dsch_instrument.Instrument instance
 
-    def __init__(self, filename):
+    def __init__(self, filename, max_memory=None, instrument=None,
+                 dschict=None, memory_budget=None):
         """
         It reads and processes a file.
 
         Parameters:
-            filename -- name of the dschictionary file
-        """
+            filename -- name of the dschictionary file (or a manifest of
+                        shards, they're streamed, see dsch_shard.py)
+            max_memory -- If it's given (in bytes), the entries are not
+                          loaded, but sorted by the external sort
+                          (see dsch_sort.py) while writing.
+            instrument -- A dsch_instrument.Instrument instance to measure
+                          the phases of reading and writing. By default the
+                          progress is reported by self.status() once per
+                          second.
+            dschict -- An already read Dschictionary instance (of the
+                       file), so the file is not read again (e.g. for
+                       writing more formats)
+            memory_budget -- If it's given (in bytes) and the loaded file
+                             would exceed it (see
+                             dsch_sort.estimate_memory()), the external sort
+                             is used with the half of it (see max_memory,
+                             the other half is left for the merge and the
+                             output).
+        """
+        self.instrument = instrument or dsch_instrument.Instrument(
+                                                        report=self.status)
         if filename:
+            if dschict is None and max_memory is None and \
+                    dsch_file.is_manifest(filename):
+                import dsch_sort
+
+                # the shards are streamed one by one (see dsch_shard.py)
+                max_memory = (dsch_sort.DEFAULT_MAX_MEMORY
+                              if memory_budget is None else
+                              memory_budget // 2)
+            elif (memory_budget is not None and max_memory is None and
+                    dschict is None and os.path.isfile(filename)):
+                import dsch_sort
+
+                if not dsch_sort.fits_in_memory(filename, memory_budget):
+                    max_memory = memory_budget // 2
+                    self.status("The dschictionary exceeds the memory "
+                                "budget, it's streamed.", 'mem')
             self._fname = filename
-            self._dschict = dsch.Dschictionary.create_dschictionary(filename)
+            self._max_memory = max_memory
+            self._stamp = dsch_file.file_stamp(filename)
+            if dschict is not None:
+                self._dschict = dschict
+            elif max_memory is None:
+                self._dschict = dsch.Dschictionary.create_dschictionary(
+                                                    filename, self.instrument)
+            else:
+                self._dschict = dsch.Dschictionary().read_dschictionary(
+                                                filename, load_entries=False,
+                                                instrument_=self.instrument)
         else:
             self.error("Filename is not given or not valid!")
 
@@ -47,6 +123,26 @@ class BaseDschictionary():
         """Returns the used dschictionary instance."""
         return self._dschict
 
+    def _reread_if_changed(self):
+        """
+        It reads the file again if it's changed since it was read (e.g. it
+        was patched meanwhile). The file should be locked.
+        """
+        stamp = dsch_file.file_stamp(self._fname)
+        if self._max_memory is None and stamp != self._stamp:
+            self.status("The file is changed since it was read, it's read "
+                        "again.", 'read')
+            self._dschict = dsch.Dschictionary.create_dschictionary(
+                                                self._fname, self.instrument)
+            self._stamp = stamp
+
+    def max_memory(self):
+        """
+        Returns the memory limit of the external sort (None if the entries
+        are loaded).
+        """
+        return self._max_memory
+
     def status(self, message, category=''):
         """
         It writes the status messages.
@@ -69,20 +165,58 @@ class BaseDschictionary():
         """
         print("ERROR --", message)
 
-    def _add_pos(self, pos):
+    def _iter_entries(self):
         """
-        Adds a pos to the pos list.
+        Returns the sorted entries of the dschictionary.
 
-        Parameters:
-            pos -- PoS to be added
+        With external sort, the input file is completely read before this
+        method returns. The shards of a manifest are sorted one by one while
+        they're written.
         """
-        if pos in POS:
-            self._pos[pos] = POS[pos]
+        if self._max_memory is None:
+            return self._dschict.entries()
+        if dsch_file.is_manifest(self._fname):
+            import dsch_shard  # the shards are sorted one by one
+
+            entries = dsch_shard.ShardedDschictionary(
+                self._fname).iter_entries(self._max_memory)
         else:
-            self._pos[pos] = 'Unknown part of speech'
+            import dsch_sort  # only the external sort needs it
+
+            with self.instrument.phase('sort'):
+                entries = dsch_sort.iter_sorted_entries(
+                    self._fname, self._max_memory,
+                    collation=self._dschict.collation)
+        self._statistics = dsch_stats.Statistics()
+        return self._counted(entries)
+
+    def _counted(self, entries):
+        """It yields the streamed entries and counts them."""
+        stats = self._statistics
+        for e in entries:
+            stats.add_entry(e)
+            yield e
+        self.instrument.count('entries', stats.num_of_entries())
+        self.instrument.count('meanings', stats.num_of_meanings())
+
+    def generate_output(self):
+        """
+        Generates the output of the dschictionary piece by piece (see
+        generate_dschictionary()).
+        """
+        return self.generate_dschictionary(self._iter_entries())
+
+    def statistics(self) -> dsch_stats.Statistics:
+        """
+        Returns the statistics of the written entries.
+
+        With external sort, they're counted while the entries are written,
+        otherwise they're the dschictionary's ones.
+        """
+        return self._statistics or self._dschict.statistics()
 
     def _get_filename(self, filename):
-        return filename or self._fname.split('.')[0]
+        return dsch_file.root_filename(filename or self._fname)
 
     def _filename(self, filename, ex='txt', add='dict'):
         """
@@ -96,36 +230,69 @@ class BaseDschictionary():
         Returns:
             Filename of output file (filename.add.ext)
         """
-        filename = filename.split('.')[0]
-
         filename += ('.' + add if add else '') + ('.' + ex if ex else '')
         return filename
 
-    def _filewrite(self, filename, out):
+    def _filewrite(self, filename, out, compression='auto'):
         """
         It is a simple file writer function (for utf-8 encoded files).
 
+        The file is replaced atomically (see dsch_file.atomic_open()), so it
+        is never left half-written. If the filename ends with .gz, .bz2 or
+        .xz, the output is compressed (e.g. ex='html.gz').
+
         Parameters:
             filename -- Output file's name (with extension) (string)
-            out -- Processed data (string)
-        """
-        codecs.open(filename, 'w', 'utf-8').write(out)
-
+            out -- Processed data (string or iterable of strings)
+            compression -- 'gzip', 'bz2', 'xz', None or 'auto' (by the
+                           extension)
+        """
+        ins = self.instrument
+        clock = time.perf_counter
+        if isinstance(out, str):
+            out = (out,)
+        render = write = 0.0
+        with ins.memory_phase('render'), dsch_file.atomic_open(
+                filename, compression=compression) as f:
+            chunks = iter(out)
+            while True:
+                start = clock()
+                chunk = next(chunks, None)
+                rendered = clock()
+                render += rendered - start
+                if chunk is None:
+                    break
+                f.write(chunk)
+                write += clock() - rendered
+            synced = clock()
+        ins.add_time('render', render)
+        ins.add_time('write', write)
+        ins.add_time('sync', clock() - synced)
 
     def _fileswap(self, filename, backupfilename, out):
         """
         It is a file swapper function that makes a backup of the original
         input file and then generates a new one (input format and sorted).
 
+        The file is locked during the swap (so parallel processes can't
+        clobber each other's output), and both the backup and the new file
+        are written atomically.
+
         Parameters:
             filename -- Input file's name (with extension) (string)
             backupfilename -- Backup file's name (with extension) (string)
-            out -- Processed data (string)
-        """
-        f = open(filename, 'r')
-        codecs.open(backupfilename, 'w', 'utf-8').write(f.read())
-        codecs.open(filename, 'w', 'utf-8').write(out)
-
+            out -- Processed data (string or iterable of strings), or a
+                   function that returns it (it's called while the file is
+                   locked, so it can read the file)
+        """
+        with dsch_file.file_lock(filename):
+            if callable(out):
+                out = out()
+            with self.instrument.phase('backup'):
+                dsch_file.atomic_copy(filename, backupfilename)
+            # the new file is compressed like the original one
+            self._filewrite(filename, out,
+                            dsch_file.detect_compression(filename))
 
     def _initialize(self, filename, ex='txt'):
         """
@@ -139,7 +306,7 @@ class BaseDschictionary():
             (dschictionary instance, filename, title, entry_lang and def_lang)
         """
         d = self._dschict
-        return (d, self._filename(filename, ex),
+        return (d, self._filename(self._get_filename(filename), ex),
                 d.title(), d.entry_language, d.definition_language)
 
     def _write_dschict_info(self, title, el, dl,
@@ -171,12 +338,15 @@ class BaseDschictionary():
     def _write_entry_header(self, word, pro, desc,
                             proc=dsch.entry.Entry.PRONOUNCIATION_CHAR,
                             id_prefix='dsch', line='-',
-                            _format="\n{word} /{pro}/\n{desc}\n"):
+                            _format="\n{word} /{pro}/\n{desc}\n",
+                            homograph=0, hom_format=" ({n})"):
         """
         Returns a formatted string of an entry's header.
         The formatted input can contain the following flags:
-            {id} -- entry id (id_prefix-word, for HTML),
+            {id} -- entry id (id_prefix-word, for HTML; id_prefix-word-n for
+                    the homographs after the first one),
             {word} -- word,
+            {hom} -- number of the homograph (formatted by hom_format),
             {pro} -- pronunciation,
             {proc} -- pronunciation char,
             {desc} -- description,
@@ -190,12 +360,17 @@ class BaseDschictionary():
             id_prefix -- Id prefix
             line -- Line
             _format -- Format string for output
+            homograph -- Number of the homograph (0 if it's not a homograph)
+            hom_format -- Format string of the homograph's number ({n})
 
         Return:
             Formatted string
         """
-        return _format.format(id=id_prefix+'-'+word,
+        return _format.format(id=id_prefix+'-'+word+(
+                                  '-'+str(homograph) if homograph > 1 else ''),
                               word=word,
+                              hom=hom_format.format(n=homograph)
+                              if homograph else '',
                               pro=pro,
                               proc=proc,
                               desc=desc,
@@ -254,7 +429,7 @@ class BaseDschictionary():
                             _format=("{op}{orig}"
                                      "{cp}{comm}"
                                      "{sp}{see}"),
-                            see_format_=''):
+                            see_format_='', words=None, broken_format_=''):
         """
         Returns a formatted string of an entry's footer.
         The formatted input can contain the following flags:
@@ -264,9 +439,10 @@ class BaseDschictionary():
             {comm} -- comment about the word
             {sp} -- see also's prefix character
             {see} -- see also words
-        The _see_format can contain the following flags:
+        The _see_format (and _broken_format) can contain the following flags:
             {id} -- the 'see also' word's id
             {w} -- the 'see also' word
+            {page} -- the page of the 'see also' word (see _page_link())
 
         Parameters:
             orig -- Word's origin,
@@ -276,18 +452,27 @@ class BaseDschictionary():
             comm_prefix -- Comment's prefix character,
             see_prefix -- See also's prefix character,
             _format -- Format string for output,
-            _see_format -- See also word's format string
+            _see_format -- See also word's format string,
+            words -- Existing words (e.g. Dschictionary.index()); if it's
+                     given, the missing words are formatted by
+                     _broken_format,
+            _broken_format -- Missing see also word's format string
 
         Return:
             Formatted string
         """
         if not see_format_:
             see_format_ = "{w}"
+        if not broken_format_:
+            broken_format_ = see_format_
         tmp = see.split(',')
         see = ''
         for t in tmp:
-            see += see_format_.format(id='dsch-'+t.strip(),
-                                        w=t.strip())
+            t = t.strip()
+            if not t:
+                continue
+            f = see_format_ if words is None or t in words else broken_format_
+            see += f.format(id='dsch-'+t, w=t, page=self._page_link(t))
 
         return _format.format(op=(orig_prefix + ' ') if orig else '',
                               orig=orig + ('\n' if orig else ''),
@@ -296,13 +481,20 @@ class BaseDschictionary():
                               sp=(see_prefix + ' ') if see else '',
                               see=see + ('\n' if see else ''))
 
+    def _page_link(self, word):
+        """
+        Returns the link of the page of a word ('' if it's on the same page,
+        the outputs are single pages).
+        """
+        return ''
+
     def _write_POS_cycle(self, before, after, prefix, _format):
         """
         This is the inner cycle of the self._write_POS function.
         This also adds the 'before' and 'after' to the output.
         Parameters are the same.
         """
-        keys = self._pos
+        keys = self.statistics().pos_table()
         out = before
         for k in sorted(keys):
             out += _format.format(k=k, v=keys[k], id=prefix+'-'+k)
@@ -314,8 +506,8 @@ class BaseDschictionary():
         Return a formatted string of a table of used Part of Speeches.
         The _format string is for a single entry!
         The formatted input can contain the following flags:
-            {k} -- key of a PoS (from self._pos)
-            {v} -- name of a PoS (from POS constant)
+            {k} -- key of a PoS (see self.statistics())
+            {v} -- name of a PoS (from dsch_pos.DEFAULT)
             {id} -- id of an entry
 
         Parameters:
@@ -352,68 +544,71 @@ class BaseDschictionary():
                                     "Dschictionary"),
                               name='Dschictionary')
 
-    def write_dschictionary(self, ex='txt', filename=None):
+    def generate_dschictionary(self, entries):
         """
-        TODO: docstring
+        Generates the output in the input format (sorted) piece by piece.
 
         Parameters:
-            ex -- Output file's extension
-            filename -- This is the output file's filename. If None, then
-                        the filename will be used that was used to read the
-                        input.
+            entries -- Sorted Entry instances (see self._iter_entries())
 
-        Return:
-            Formatted string
+        Yield:
+            Formatted strings
         """
-        # Initialize the writing
-        self.status('Start writing.', 'start')
-        d, filename, ttl, el, dl = self._initialize(
-                                                self._get_filename(filename),
-                                                ex)
+        d = self._dschict
         idx = 0
-        self.status('Initializing is done.', 'init')
 
         # Add dschictionary info
-        out += self._write_dschict_info(ttl, el, dl)
+        yield self._write_dschict_info(d.title(), d.entry_language,
+                                       d.definition_language)
         self.status('Basic informations', 'write')
 
         # Add entries
-        for e in d.entries():
+        for e in entries:
             idx += 1
-            ed = e.get_entry_as_dict()
-
-            # Add entry header
-            out += self._write_entry_header(ed['wrd'], ed['pro'], ed['dsc'])
-
-            # Add meanings
-            for m in ed['mea']:
-                if not m:
-                    break
-                md = m.get_meaning_as_dict()
-
-                pos = md['pos']
-                if pos not in self._pos:
-                    self._add_pos(pos)
-
-                out += self._write_meaning(md['lvl'], pos, md['cls'], md['cas'],
-                                           md['def'])
-
-            # Add entry footer
-            out += self._write_entry_footer(ed['ori'], ed['com'], ed['see'])
-            self.status('Entry #' + str(idx), 'write')
+            yield "\n" + e.get_entry_as_source()
+            self.instrument.progress('Entry #' + str(idx), 'write')
         self.status('Entries done', 'write')
 
         # Add Part of Speeches' table
-        out += self._write_POS()
+        yield self._write_POS()
         self.status('PoS table', 'write')
 
         # Add sign
-        out += self._write_sign()
+        yield self._write_sign()
         self.status('Sign', 'write')
 
+    def write_dschictionary(self, ex='txt', filename=None):
+        """
+        It reorders the input file and makes a backup of the original one.
+
+        Parameters:
+            ex -- Output file's extension
+            filename -- This is the output file's filename. If None, then
+                        the filename will be used that was used to read the
+                        input.
+        """
+        if dsch_file.is_manifest(self._fname):
+            self.error("A manifest can't be reordered (see dsch_shard.py).")
+            return
+
+        def generate():
+            # the entries are read while the file is locked, so the changes
+            # since the file was read (e.g. a patch) aren't lost
+            self._reread_if_changed()
+            entries = self._iter_entries()
+            self.status('Initializing is done.', 'init')
+            return self.generate_dschictionary(entries)
+
+        # Initialize the writing
+        self.status('Start writing.', 'start')
+
         # Write (usually it's by the self._filewrite function)
-        self._fileswap(self._fname, self._filename('', ex, 'backup'),
-                       out)
+        self._fileswap(self._fname,
+                       self._filename(self._get_filename(None),
+                                      ex + dsch_file.compression_extension(
+                                                                self._fname),
+                                      'backup'),
+                       generate)
         self.status('File writing is done', 'file')
         self.status('Everything is done!', 'end')
 
@@ -423,89 +618,95 @@ class TextDschictionary(BaseDschictionary):
     Dschictionary output class for plain text output.
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, max_memory=None, instrument=None,
+                 dschict=None, memory_budget=None):
         """Only a filename all you need."""
-        super().__init__(filename)
+        super().__init__(filename, max_memory, instrument, dschict,
+                         memory_budget)
 
-    def write_dschictionary(self, ex='txt', filename=None):
-        """Return a simple txt file"""
-        d, filename, ttl, el, dl = self._initialize(
-                                                self._get_filename(filename),
-                                                ex)
-        idx = 0
+    def generate_dschictionary(self, entries):
+        """Generates a simple txt file piece by piece."""
+        d = self._dschict
+        ttl, el, dl = d.title(), d.entry_language, d.definition_language
 
-        out = self._write_dschict_info(ttl, el, dl,
+        yield self._write_dschict_info(ttl, el, dl,
                                        _format=("{title} "
                                                 "({fromlang} - {tolang})\n\n"))
 
-        entry_head_format = '{word}  {proc}{pro}{proc}\n{line}\n"{desc}"\n'
+        entry_head_format = ('{word}{hom}  {proc}{pro}{proc}\n{line}\n'
+                             '"{desc}"\n')
         meaning_format = "{indc}({pos}{clsc}{cls}{casc}{cas}) {def_}\n"
         entry_foot_format = "{op}{orig}{cp}{comm}{sp}{see}\n\n"
         pos_table_format = ""
 
-        for e in d.entries():
+        idx = 0
+        for e in entries:
+            idx += 1
+            self.instrument.progress('Entry #' + str(idx), 'write')
             ed = e.get_entry_as_dict()
-            out += self._write_entry_header(ed['wrd'], ed['pro'], ed['dsc'],
-                                            line='-'*len(ed['wrd']),
-                                            _format=entry_head_format)
+            yield self._write_entry_header(ed['wrd'], ed['pro'], ed['dsc'],
+                                           line='-'*len(ed['wrd']),
+                                           _format=entry_head_format,
+                                           homograph=e.homograph())
 
             for m in ed['mea']:
                 if not m:
                     break
                 md = m.get_meaning_as_dict()
 
-                pos = md['pos']
-                if pos not in self._pos:
-                    self._add_pos(pos)
-
-                out += self._write_meaning(md['lvl'], md['pos'], md['cls'],
-                                           md['cas'], md['def'],
-                                           _format=meaning_format)
+                yield self._write_meaning(md['lvl'], md['pos'], md['cls'],
+                                          md['cas'], md['def'],
+                                          _format=meaning_format)
 
-            out += self._write_entry_footer(ed['ori'], ed['com'], ed['see'],
-                                            'origin: ', 'comment: ',
-                                            'see also: ',
-                                            _format=entry_foot_format)
+            yield self._write_entry_footer(ed['ori'], ed['com'], ed['see'],
+                                           'origin: ', 'comment: ',
+                                           'see also: ',
+                                           _format=entry_foot_format)
 
         line = '-' * 40 + "\n"
-        out += self._write_POS(line, line, _format="{k:>4}: {v}\n")
-        out += self._write_sign("\n{pre} {name}\n\n")
-        self._filewrite(self._filename(filename, ex), out)
+        yield self._write_POS(line, line, _format="{k:>4}: {v}\n")
+        yield self._write_sign("\n{pre} {name}\n\n")
+
+    def write_dschictionary(self, ex='txt', filename=None):
+        """Return a simple txt file"""
+        self._filewrite(self._filename(self._get_filename(filename), ex),
+                        self.generate_output())
+
 
 class HTMLDschictionary(BaseDschictionary):
     """
     Dschictionary output class for HTML output.
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, max_memory=None, instrument=None,
+                 dschict=None, memory_budget=None):
         """Only a filename all you need."""
-        super().__init__(filename)
+        super().__init__(filename, max_memory, instrument, dschict,
+                         memory_budget)
 
     def _add_style(self):
         """Returns the CSS styles to the output HTML file."""
-        with open('dschict.css', 'r') as f:
-            style = f.read()
-        return "<style>\n" + style + "</style>"
+        return "<style>\n" + resource(STYLE_FILE) + "</style>"
 
-    def write_dschictionary(self, ex='html', filename=None):
-        """Writer function."""
-        d, filename, ttl, el, dl = self._initialize(
-                                                self._get_filename(filename),
-                                                ex)
+    def generate_dschictionary(self, entries):
+        """Generates the HTML output piece by piece."""
+        d = self._dschict
+        ttl, el, dl = d.title(), d.entry_language, d.definition_language
         idx = 0
 
-        out = self._add_style()
+        yield self._add_style()
 
-        out += "<article class='dsch'>"
+        yield "<article class='dsch'>"
 
-        out += self._write_dschict_info(ttl, el, dl, _format=("<h1>{title}</h1>"
-                                                              "<h3>{fromlang}"
-                                                              "&nbsp;-&nbsp;"
-                                                              "{tolang}</h3>"))
+        yield self._write_dschict_info(ttl, el, dl, _format=("<h1>{title}</h1>"
+                                                             "<h3>{fromlang}"
+                                                             "&nbsp;-&nbsp;"
+                                                             "{tolang}</h3>"))
 
         entry_head_format = ("\n<a class='word' id='{id}' href='#{id}'>"
-                             "{word}</a>&nbsp;<span class='pro'>{proc}{pro}"
-                             "{proc}</span><br>\n<i class='desc'>{desc}</i>\n")
+                             "{word}{hom}</a>&nbsp;<span class='pro'>"
+                             "{proc}{pro}{proc}</span><br>\n"
+                             "<i class='desc'>{desc}</i>\n")
 
         meaning_format = ("<tr class='mean' style='padding-left: {ind}ch;'>"
                           "<td class='type'>(<span class='pos'><a href='#{pid}"
@@ -516,51 +717,143 @@ class HTMLDschictionary(BaseDschictionary):
         entry_foot_format = ("<span class='orig'>{op}{orig}</span>"
                              "<span class='comm'>{cp}{comm}</span>"
                              "<span class='see'>{sp}{see}</span>")
-        entry_see_format = "<a href='#{id}'>{w}</a> "
+        entry_see_format = "<a href='{page}#{id}'>{w}</a> "
+        entry_broken_format = "<a class='broken'>{w}</a> "
+        words = d.index() if self._max_memory is None else None
         pos_table_format = ("<tr><td id='{id}' style='text-align: right; "
                             "padding-right: 1ch;'>{k}</td><td style='"
                             "padding-left: 1ch;'>{v}</td></tr>\n")
-        for e in d.entries():
+        for e in entries:
             idx += 1
+            self.instrument.progress('Entry #' + str(idx), 'write')
             ed = e.get_entry_as_dict()
-            out += "<div class='entry'>\n"
-            out += self._write_entry_header(ed['wrd'], ed['pro'], ed['dsc'],
-                                            _format=entry_head_format)
+            yield "<div class='entry'>\n"
+            yield self._write_entry_header(ed['wrd'], ed['pro'], ed['dsc'],
+                                           _format=entry_head_format,
+                                           homograph=e.homograph(),
+                                           hom_format="<sup>{n}</sup>")
 
-            out += "<table class='meaning'>"
+            yield "<table class='meaning'>"
             for m in ed['mea']:
                 if not m:
                     break
                 md = m.get_meaning_as_dict()
 
-                pos = md['pos']
-                if pos not in self._pos:
-                    self._add_pos(pos)
+                yield self._write_meaning(md['lvl'], md['pos'], md['cls'],
+                                          md['cas'], md['def'],
+                                          _format=meaning_format)
+            yield "</table>\n<div class='add'>"
+
+            yield self._write_entry_footer(ed['ori'], ed['com'], ed['see'],
+                                           'origin: ', 'comment: ',
+                                           'see also: ',
+                                           _format=entry_foot_format,
+                                           see_format_=entry_see_format,
+                                           words=words,
+                                           broken_format_=entry_broken_format)
 
-                out += self._write_meaning(md['lvl'], md['pos'], md['cls'],
-                                           md['cas'], md['def'],
-                                           _format=meaning_format)
-            out += "</table>\n<div class='add'>"
+            yield "</div></div>"
 
-            out += self._write_entry_footer(ed['ori'], ed['com'], ed['see'],
-                                            'origin: ', 'comment: ',
-                                            'see also: ',
-                                            _format=entry_foot_format,
-                                            see_format_=entry_see_format)
+        yield self._write_POS(("<table class='postab' style='border: "
+                               "1px solid black;'>\n"), "</table>\n",
+                               _format=pos_table_format)
 
-            out += "</div></div>"
+        yield self._write_sign("<div class='via'><hr><span class='via'>"
+                               "{pre} <a href='{link}'>{name}</a>"
+                               "</span></div>\n")
 
-        out += self._write_POS(("<table class='postab' style='border: "
-                                "1px solid black;'>\n"), "</table>\n",
-                                _format=pos_table_format)
+        yield "</articles>"
 
-        out += self._write_sign("<div class='via'><hr><span class='via'>"
-                                "{pre} <a href='{link}'>{name}</a>"
-                                "</span></div>\n")
+    def write_dschictionary(self, ex='html', filename=None):
+        """Writer function."""
+        self._filewrite(self._filename(self._get_filename(filename), ex),
+                        self.generate_output())
+
+
+class JsonlDschictionary(BaseDschictionary):
+    """
+    Dschictionary output class for JSON Lines output.
+
+    The first line contains the basic informations (title, entry_language,
+    definition_language), then every line is an entry (see
+    Entry.get_entry_as_dict(flat=True)).
+    """
+
+    def __init__(self, filename, max_memory=None, instrument=None,
+                 dschict=None, memory_budget=None):
+        """Only a filename all you need."""
+        super().__init__(filename, max_memory, instrument, dschict,
+                         memory_budget)
+
+    def generate_dschictionary(self, entries):
+        """Generates the JSON Lines output line by line."""
+        d = self._dschict
+        encode = json.JSONEncoder(ensure_ascii=False,
+                                  separators=(',', ':')).encode
+        yield encode({'title': d.title(),
+                      'entry_language': d.entry_language,
+                      'definition_language': d.definition_language}) + "\n"
+        idx = 0
+        for e in entries:
+            idx += 1
+            self.instrument.progress('Entry #' + str(idx), 'write')
+            yield encode(e.get_entry_as_dict(flat=True)) + "\n"
+
+    def write_dschictionary(self, ex='jsonl', filename=None):
+        """Writer function."""
+        self._filewrite(self._filename(self._get_filename(filename), ex),
+                        self.generate_output())
+
+
+class CsvDschictionary(BaseDschictionary):
+    """
+    Dschictionary output class for CSV output.
+
+    Every row is a meaning with the fields of its entry (an entry without
+    meanings has a single row with empty meaning fields).
+    """
+
+    """Columns of the CSV output (the keys of Entry.get_entry_as_dict())."""
+    COLUMNS = ('idx', 'wrd', 'pro', 'dsc', 'pos', 'cls', 'cas', 'def', 'lvl',
+               'ori', 'com', 'see')
 
-        out += "</articles>"
+    def __init__(self, filename, max_memory=None, instrument=None,
+                 dschict=None, memory_budget=None):
+        """Only a filename all you need."""
+        super().__init__(filename, max_memory, instrument, dschict,
+                         memory_budget)
+
+    def generate_dschictionary(self, entries):
+        """Generates the CSV output entry by entry."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.COLUMNS)
+        empty = {'pos': '', 'cls': '', 'cas': '', 'def': '', 'lvl': ''}
+        idx = 0
+        for e in entries:
+            idx += 1
+            self.instrument.progress('Entry #' + str(idx), 'write')
+            ed = e.get_entry_as_dict(flat=True)
+            for md in ed.pop('mea') or [empty]:
+                md.update(ed)
+                writer.writerow([md[c] for c in self.COLUMNS])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def write_dschictionary(self, ex='csv', filename=None):
+        """Writer function."""
+        self._filewrite(self._filename(self._get_filename(filename), ex),
+                        self.generate_output())
 
-        self._filewrite(self._filename(filename, ex), out)
+
+"""The output classes by format (the extension of the output files)."""
+OUTPUTS = {
+    'txt': TextDschictionary,
+    'html': HTMLDschictionary,
+    'jsonl': JsonlDschictionary,
+    'csv': CsvDschictionary
+}
 
 
 # 4 tests only
@@ -575,3 +868,9 @@ if __name__ == '__main__':
     test = HTMLDschictionary(fn)
     test.write_dschictionary()
     print('html write is done')
+    test = JsonlDschictionary(fn)
+    test.write_dschictionary()
+    print('jsonl write is done')
+    test = CsvDschictionary(fn)
+    test.write_dschictionary()
+    print('csv write is done')
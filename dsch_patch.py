@@ -0,0 +1,418 @@
+"""
+Batch editing of dschictionary files.
+
+A patch is a batch of operations keyed by word. The file is read once, the
+operations of a word are applied when its entry is read (they're found
+through a dictionary), the new words are added at the end, and the file is
+rewritten once (sorted, with a backup). So the cost of a batch is a single
+pass over the file, however many operations it contains.
+
+The operations are records like the JSON Lines entries (see
+Entry.get_entry_as_dict(flat=True)) with an 'op' key, e.g.:
+    {"op": "add", "wrd": "telo", "mea": [{"pos": "n", "def": "water"}]}
+    {"op": "delete", "wrd": "ike"}
+    {"op": "set", "wrd": "toki", "see": "pona, telo"}
+    {"op": "add_meaning", "wrd": "toki", "pos": "vi", "def": "to talk"}
+    {"op": "set_meaning", "wrd": "toki", "num": 1, "def": "language"}
+    {"op": "delete_meaning", "wrd": "toki", "num": 2}
+
+The numbers of the meanings (num) start from 1. The operations are applied
+to the first entry of a word, in the given order.
+
+Usage:
+    python dschictionary.py patch example.txt changes.jsonl
+"""
+
+
+import json
+import os
+import dschictionary_class as dsch
+import dsch_file
+
+
+"""
+The possible operations (op -> the other allowed keys besides 'op' and
+'wrd'):
+    add -- add a new entry (the keys of an entry record)
+    delete -- delete the entry
+    set -- change the fields of the entry (not the word and the meanings)
+    add_meaning -- add a meaning (at the end, or before the num-th one)
+    set_meaning -- change the fields of the num-th meaning
+    delete_meaning -- delete the num-th meaning
+"""
+OPERATIONS = {
+    'add': frozenset(dsch.RECORD_FIELDS) | {'idx', 'mea'},
+    'delete': frozenset(),
+    'set': frozenset(dsch.RECORD_FIELDS) - {'wrd'},
+    'add_meaning': frozenset(dsch.MEANING_FIELDS) | {'num'},
+    'set_meaning': frozenset(dsch.MEANING_FIELDS) | {'num'},
+    'delete_meaning': frozenset({'num'})
+}
+
+
+class PatchError(Exception):
+    """
+    Simple Error class for patch errors.
+
+    It's raised when an operation is invalid or it can't be applied (e.g.
+    the word doesn't exist). The file is not changed then.
+    """
+
+    def __init__(self, message):
+        """
+        Just initialize it.
+
+        :param message: The message for the user
+        """
+        Exception.__init__(self, message)
+        self.message = message
+
+
+def _fields(operation: dict, *skip) -> dict:
+    """It returns the fields of an operation (without op, num, ...)."""
+    return {k: v for k, v in operation.items()
+            if k != 'op' and k not in skip}
+
+
+def _meaning_index(operation: dict, meanings: list, insert=False) -> int:
+    """It returns the index of the num-th meaning (it checks the range)."""
+    num = operation['num']
+    if not 1 <= num <= len(meanings) + insert:
+        raise PatchError("there's no meaning #{0}".format(num))
+    return num - 1
+
+
+def check_operation(operation: dict) -> str:
+    """
+    It checks the keys and the types of an operation (see OPERATIONS).
+
+    Return:
+        The word of the operation
+
+    Raises:
+        PatchError if the operation is not valid
+    """
+    if type(operation) is not dict:
+        raise PatchError("An operation should be an object")
+    op, word = operation.get('op'), operation.get('wrd')
+    if op not in OPERATIONS:
+        raise PatchError("Unknown operation: {0} (possible operations: "
+                         "{1})".format(op, ", ".join(OPERATIONS)))
+    if type(word) is not str or not word.strip():
+        raise PatchError("'wrd' should be a non-empty string")
+    unknown = operation.keys() - OPERATIONS[op] - {'op', 'wrd'}
+    if unknown:
+        raise PatchError("Unknown key of {0}: {1}".format(
+            op, ", ".join(sorted(unknown))))
+    if (op in ('set_meaning', 'delete_meaning') or 'num' in operation) \
+            and type(operation.get('num')) is not int:
+        raise PatchError("'num' of {0} should be an integer".format(op))
+    return word.strip()
+
+
+def apply_operation(entry_, operation: dict, idx=dsch.entry.ENTRY_NO_ID,
+                    source=False):
+    """
+    It applies an operation to the entry of its word.
+
+    The changed entry is a new Entry instance (it's built from a record, so
+    it's validated like the entries of the JSON Lines files).
+
+    Parameters:
+        entry_ -- The current Entry instance of the word (None if the word
+                  doesn't have an entry)
+        operation -- The operation (see OPERATIONS)
+        idx -- The id of an added entry
+        source -- If True, the new entry has to be written in the text
+                  format too (see dschictionary_class.check_source())
+
+    Return:
+        The new Entry instance (None if it's deleted)
+
+    Raises:
+        PatchError or dschictionary_class.RecordError
+    """
+    op = operation['op']
+    if op == 'add':
+        if entry_ is not None:
+            raise PatchError("the word already has an entry")
+        new = dsch.entry_from_record(_fields(operation), idx)
+        return dsch.check_source(new) if source else new
+    if entry_ is None:
+        raise PatchError("the word doesn't have an entry")
+    if op == 'delete':
+        return None
+
+    record = entry_.get_entry_as_dict(flat=True)
+    meanings = record['mea']
+    if op == 'set':
+        record.update(_fields(operation))
+    elif op == 'add_meaning':
+        meaning_ = _fields(operation, 'wrd', 'num')
+        if 'num' in operation:
+            meanings.insert(_meaning_index(operation, meanings, True),
+                            meaning_)
+        else:
+            meanings.append(meaning_)
+    elif op == 'set_meaning':
+        meanings[_meaning_index(operation, meanings)].update(
+            _fields(operation, 'wrd', 'num'))
+    elif op == 'delete_meaning':
+        del meanings[_meaning_index(operation, meanings)]
+    new = dsch.entry_from_record(record, entry_.id())
+    return dsch.check_source(new) if source else new
+
+
+class Patch:
+    """A batch of operations keyed by word."""
+
+    def __init__(self, operations=()):
+        """
+        Initialize a patch.
+
+        Parameters:
+            operations -- Iterable of operations (see add_operation())
+        """
+        self._operations = {}  # word -> operations in the given order
+        self._num = 0
+        for operation in operations:
+            self.add_operation(operation)
+
+    def add_operation(self, operation: dict):
+        """
+        It adds an operation (a record with an 'op' and a 'wrd' key).
+
+        Raises:
+            PatchError if the operation is not valid (see check_operation())
+        """
+        word = check_operation(operation)
+        self._operations.setdefault(word, []).append(operation)
+        self._num += 1
+
+    def add(self, record: dict):
+        """It adds an entry (see dschictionary_class.entry_from_record())."""
+        self.add_operation(dict(record, op='add'))
+
+    def delete(self, word: str):
+        """It deletes the entry of a word."""
+        self.add_operation({'op': 'delete', 'wrd': word})
+
+    def set(self, word: str, **fields):
+        """It changes fields of an entry (pro, dsc, ori, com, see)."""
+        self.add_operation(dict(fields, op='set', wrd=word))
+
+    def add_meaning(self, word: str, num=None, **fields):
+        """It adds a meaning (pos, cls, cas, def, lvl) to an entry."""
+        operation = dict(fields, op='add_meaning', wrd=word)
+        if num is not None:
+            operation['num'] = num
+        self.add_operation(operation)
+
+    def set_meaning(self, word: str, num: int, **fields):
+        """It changes fields of the num-th meaning of an entry."""
+        self.add_operation(dict(fields, op='set_meaning', wrd=word, num=num))
+
+    def delete_meaning(self, word: str, num: int):
+        """It deletes the num-th meaning of an entry."""
+        self.add_operation({'op': 'delete_meaning', 'wrd': word, 'num': num})
+
+    def __len__(self) -> int:
+        """It returns the number of operations."""
+        return self._num
+
+    def words(self) -> list:
+        """It returns the words of the operations."""
+        return list(self._operations)
+
+    def select(self, words):
+        """It returns a new patch with the operations of the given words."""
+        return Patch(operation for word in words
+                     for operation in self._operations.get(word, ()))
+
+    def _apply(self, word: str, entry_, errors: list,
+               idx=dsch.entry.ENTRY_NO_ID, source=False):
+        """It applies the operations of a word (the errors are collected)."""
+        for operation in self._operations[word]:
+            try:
+                entry_ = apply_operation(entry_, operation, idx, source)
+            except PatchError as exc:
+                errors.append("{0}: {1}: {2}".format(word, operation['op'],
+                                                      exc.message))
+            except dsch.RecordError as recerror:
+                errors.append("{0}: {1}: {2}".format(
+                    word, operation['op'], recerror.message.replace(
+                        "Error -- ", "")))
+        return entry_
+
+    def apply(self, entries, source=False):
+        """
+        It applies the operations to the entries in a single pass.
+
+        The operations of a word are applied to its first entry, the words
+        without entries are added after the other entries.
+
+        Parameters:
+            entries -- Iterable of Entry instances
+            source -- If True, the changed entries have to be written in the
+                      text format too (see apply_operation())
+
+        Yield:
+            The (changed) Entry instances
+
+        Raises:
+            PatchError with every error after the last entry
+        """
+        operations = self._operations
+        patched = set()
+        errors = []
+        idx = 0
+        for e in entries:
+            idx = max(idx, e.id())
+            word = e.word()
+            if word in operations and word not in patched:
+                patched.add(word)
+                e = self._apply(word, e, errors, source=source)
+                if e is None:
+                    continue
+            yield e
+        for word in operations:
+            if word not in patched:
+                idx += 1
+                e = self._apply(word, None, errors, idx, source)
+                if e is not None:
+                    yield e
+        if errors:
+            raise PatchError("The patch can't be applied:\n" +
+                             "\n".join(errors))
+
+
+def read_operations(filename: str) -> list:
+    """
+    It reads the operations of a JSON Lines file (one operation per line).
+
+    Raises:
+        PatchError if an operation is not valid (with its line number)
+    """
+    operations = []
+    with dsch_file.open_file(filename) as file:
+        for num, line in enumerate(file, 1):
+            if line.isspace() or not line:
+                continue
+            try:
+                operation = json.loads(line)
+                check_operation(operation)
+            except ValueError as exc:
+                raise PatchError("Invalid JSON (line {0}): {1}".format(
+                    num, exc))
+            except PatchError as exc:
+                raise PatchError("{0} (line {1})".format(exc.message, num))
+            operations.append(operation)
+    return operations
+
+
+def read_patch(filename: str) -> Patch:
+    """
+    It reads a patch from a JSON Lines file (see read_operations()).
+
+    Raises:
+        PatchError if an operation is not valid (with its line number)
+    """
+    return Patch(read_operations(filename))
+
+
+def backup_filename(filename: str) -> str:
+    """
+    It returns the name of the backup of a file.
+
+    Example:
+        backup_filename("example.txt.gz") -> "example.backup.txt.gz"
+    """
+    root, ext = os.path.splitext(dsch_file.strip_compression(filename))
+    return root + ".backup" + ext + dsch_file.compression_extension(filename)
+
+
+def read_patched(filename: str, patch: Patch) -> dsch.Dschictionary:
+    """
+    It reads a dschictionary file (input format or JSON Lines) and applies
+    a patch to its entries in the same pass.
+
+    Return:
+        The patched (sorted) Dschictionary instance
+
+    Raises:
+        PatchError if the patch can't be applied or the file can't be read
+    """
+    jsonl = dsch_file.strip_compression(filename).endswith(
+        dsch.JSONL_EXTENSION)
+    d = dsch.Dschictionary().read_dschictionary(filename, load_entries=False)
+    if d.error:
+        raise PatchError(d.error)
+    try:
+        with dsch_file.open_file(filename) as file:
+            file.readline()  # the languages or the header
+            entries = (dsch.iter_jsonl_entries(file) if jsonl else
+                       dsch.iter_entries(file))
+            for e in patch.apply(entries, source=not jsonl):
+                d += e
+    except dsch.RecordError as recerror:
+        raise PatchError(recerror.message)
+    d._sort_entries()
+    return d
+
+
+def rewrite_file(filename: str, dschict: dsch.Dschictionary, backup=True):
+    """
+    It rewrites a dschictionary file in its format (input format or JSON
+    Lines) atomically.
+
+    Parameters:
+        filename -- The dschictionary file's name
+        dschict -- The new content (a sorted Dschictionary instance)
+        backup -- If True, the original file is copied (see
+                  backup_filename())
+    """
+    d = dschict
+    if dsch_file.strip_compression(filename).endswith(dsch.JSONL_EXTENSION):
+        import dsch_instrument
+        import dsch_out
+
+        chunks = dsch_out.JsonlDschictionary(
+            filename, instrument=dsch_instrument.Instrument(interval=None),
+            dschict=d).generate_dschictionary(d.entries())
+    else:
+        chunks = dsch.generate_source(d.entries(), d.entry_language,
+                                      d.definition_language)
+    if backup:
+        dsch_file.atomic_copy(filename, backup_filename(filename))
+    with dsch_file.atomic_open(
+            filename, compression=dsch_file.detect_compression(filename)) as f:
+        f.writelines(chunks)
+
+
+def patch_file(filename: str, patch: Patch, backup=True) -> int:
+    """
+    It applies a patch to a dschictionary file (input format or JSON Lines).
+
+    The file is read once, then it's rewritten once (sorted, atomically)
+    after a backup is made. If any operation fails, the file is not changed.
+    The file is locked meanwhile (see dsch_file.file_lock()).
+
+    Parameters:
+        filename -- The dschictionary file's name
+        patch -- A Patch instance
+        backup -- If True, the original file is copied (see
+                  backup_filename())
+
+    Return:
+        Number of entries of the new file
+
+    Raises:
+        PatchError if the patch can't be applied or the file can't be read
+        FileNotFoundError if the file doesn't exist
+    """
+    if not os.path.isfile(filename):
+        raise FileNotFoundError(2, "No such file or directory", filename)
+    with dsch_file.file_lock(filename):
+        d = read_patched(filename, patch)
+        rewrite_file(filename, d, backup)
+    return d.num_of_entries()
@@ -0,0 +1,186 @@
+"""
+Pivot translation: a draft dschictionary A -> C from A -> B and B -> C.
+
+The definitions of the first dschictionary are split into glosses (see
+dsch_reverse.glosses()), and the glosses are joined with the words of the
+second dschictionary by a hash table (the words are indexed once, then every
+gloss is looked up once), so the draft is built in linear time (plus its
+sorting). The meanings of the draft keep the part of speech, class, case
+and level of the source meanings, and their definitions are the glosses of
+the joined entries (of their meanings with the same part of speech, if
+there are any). The comment of an entry shows the glosses that it was
+translated through (provenance). The new meanings are checked like the
+meanings of the JSON Lines files (see dsch_reverse.new_meaning()).
+
+Example:
+    draft = pivot_dschictionaries(tokipona_english, english_esperanto)
+"""
+
+
+import dschictionary_class as dsch
+import dsch_collation
+import dsch_reverse
+
+
+"""
+The leading words that are dropped from the glosses and the words of the
+pivot (B) language before they're joined (the keys are the same as in the
+language definition line of the dschictionary files).
+
+Example:
+    PARTICLES = {'German': ('zu', 'der', 'die', 'das')}
+"""
+PARTICLES = {
+    'English': ('to', 'a', 'an', 'the')
+}
+
+"""The format of the provenance comment ({lang}: pivot, {via}: glosses)."""
+PROVENANCE_FORMAT = "Pivot ({lang}): {via}"
+
+
+class PivotError(Exception):
+    """
+    Simple Error class for pivot errors.
+
+    It's raised when the languages of the dschictionaries don't chain (the
+    definition language of the first isn't the entry language of the
+    second).
+    """
+
+    def __init__(self, message):
+        """
+        Just initialize it.
+
+        :param message: The message for the user
+        """
+        Exception.__init__(self, message)
+        self.message = message
+
+
+def join_key(text: str, particles=()) -> str:
+    """
+    It returns the key of a gloss or a word for the join (case folded,
+    single spaces, without a leading particle).
+
+    Example:
+        join_key("To  Eat", ('to',)) -> 'eat'
+    """
+    words = text.casefold().split()
+    if len(words) > 1 and words[0] in particles:
+        del words[0]
+    return " ".join(words)
+
+
+def index_words(entries, particles=()) -> dict:
+    """
+    It indexes the entries by their join keys (see join_key()).
+
+    Return:
+        {key: [Entry instances]} (homographs and folded words share a key)
+    """
+    index = {}
+    for e in entries:
+        index.setdefault(join_key(e.word(), particles), []).append(e)
+    return index
+
+
+def pivot_meanings(entry_, index: dict, particles=(), report=None) -> tuple:
+    """
+    It translates the meanings of an entry through an index of the second
+    dschictionary (see index_words()).
+
+    Parameters:
+        entry_ -- An Entry instance of the first dschictionary
+        index -- The index of the second dschictionary
+        particles -- The particles of the pivot language (see PARTICLES)
+        report -- Function of the left out meanings (it gets a line) or None
+
+    Return:
+        (list of new Meaning instances, list of the joined glosses), the
+        meanings without any joined gloss and the invalid ones (see
+        dsch_reverse.new_meaning()) are left out
+    """
+    meanings = []
+    via = {}  # the joined glosses (an ordered set)
+    for m in entry_._meanings:
+        targets = {}  # the glosses of the joined meanings (an ordered set)
+        for gloss in dsch_reverse.glosses(m._definition):
+            joined = index.get(join_key(gloss, particles))
+            if not joined:
+                continue
+            via[gloss] = None
+            for e in joined:
+                # the meanings of the same part of speech (if there are any)
+                for n in [n for n in e._meanings
+                          if n._part_of_speech == m._part_of_speech] or \
+                        e._meanings:
+                    targets.update(dict.fromkeys(
+                        dsch_reverse.glosses(n._definition)))
+        if targets:
+            meaning = dsch_reverse.new_meaning(
+                entry_.word(), m._part_of_speech, m._class, m._case,
+                (dsch_reverse.GLOSS_SEPARATOR + " ").join(targets),
+                m._level, report)
+            if meaning is not None:
+                meanings.append(meaning)
+    return meanings, list(via)
+
+
+def pivot_dschictionaries(first: dsch.Dschictionary,
+                          second: dsch.Dschictionary,
+                          provenance=True,
+                          report=None) -> dsch.Dschictionary:
+    """
+    It generates a draft dschictionary from two chained ones (A -> B and
+    B -> C gives A -> C).
+
+    The entries keep their words, pronunciations and origins, the entries
+    without any translated meaning are left out. The 'see also' references
+    are kept only to the words of the draft.
+
+    Parameters:
+        first -- The A -> B Dschictionary instance
+        second -- The B -> C Dschictionary instance
+        provenance -- If True, the comments of the entries contain the
+                      glosses that they were translated through (see
+                      PROVENANCE_FORMAT)
+        report -- Function of the left out meanings (it gets a line) or None
+
+    Return:
+        A new (sorted) Dschictionary instance
+
+    Raises:
+        PivotError if the languages don't chain
+    """
+    if first.definition_language != second.entry_language:
+        raise PivotError(
+            "The languages don't chain: {0} {2} {1} and {3} {2} {4}".format(
+                first.entry_language, first.definition_language,
+                dsch.LANGUAGE_SEPARATOR, second.entry_language,
+                second.definition_language))
+    pivot = first.definition_language
+    particles = PARTICLES.get(pivot, ())
+    draft = dsch.Dschictionary(first._title, first.entry_language,
+                               second.definition_language)
+    draft.collation = dsch_collation.get_collation(draft.entry_language)
+    index = index_words(second.entries(), particles)
+    translated = []  # (entry, meanings, glosses)
+    for e in first.entries():
+        meanings, via = pivot_meanings(e, index, particles, report)
+        if meanings:
+            translated.append((e, meanings, via))
+    words = {e.word() for e, _, _ in translated}
+
+    for idx, (e, meanings, via) in enumerate(translated, 1):
+        tmpe = dsch.entry.Entry(idx, e.word())
+        tmpe._pronunciation = e.pronunciation()
+        tmpe._origin = e.origin()
+        tmpe._see = ", ".join(w for w in e.see_list() if w in words)
+        tmpe._homograph = e.homograph()
+        tmpe._meanings = meanings
+        if provenance:
+            tmpe._comment = PROVENANCE_FORMAT.format(
+                lang=pivot, via=", ".join(via))
+        draft += tmpe
+    draft._sort_entries()
+    return draft
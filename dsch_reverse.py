@@ -0,0 +1,116 @@
+"""
+Reverse dschictionary generation (definition language -> entry language).
+
+Every definition is split into its glosses (by commas), and the glosses
+become the words of the new dschictionary. The meanings of a gloss are the
+source words (with the part of speech, class and case of the source
+meaning). The meanings are walked only once and grouped by a dictionary,
+so the new dschictionary is built in linear time (plus its sorting). The
+source words that can't be definitions (e.g. 'kama-sona', see
+DEFINITION_PATTERN of dsch_meaning) are left out.
+"""
+
+
+import dschictionary_class as dsch
+import dsch_collation
+
+
+"""The separator of the glosses within a definition."""
+GLOSS_SEPARATOR = ","
+
+
+def glosses(definition: str) -> list:
+    """
+    It returns the glosses of a definition.
+
+    Example:
+        glosses("to heat, to warm up") -> ['to heat', 'to warm up']
+    """
+    return [g.strip() for g in definition.split(GLOSS_SEPARATOR) if g.strip()]
+
+
+def new_meaning(word: str, pos="", class_="", case="", definition="",
+                level=0, report=None):
+    """
+    It returns a new meaning of a generated entry, it's checked like the
+    meanings of the JSON Lines files (see
+    dschictionary_class.meaning_from_record()).
+
+    Parameters:
+        word -- The word of the generated entry (for the report)
+        pos, class_, case, definition, level -- The fields of the meaning
+        report -- Function of the reports (it gets a line) or None
+
+    Return:
+        A Meaning instance or None if it's not valid (it's reported)
+    """
+    try:
+        return dsch.meaning_from_record({'pos': pos, 'cls': class_,
+                                         'cas': case, 'def': definition,
+                                         'lvl': level})
+    except dsch.RecordError as recerror:
+        if report is not None:
+            report("{0}: {1!r} is left out ({2})".format(
+                word, definition, recerror.message.replace("Error -- ", "")))
+        return None
+
+
+def reverse_entries(entries) -> dict:
+    """
+    It groups the source words by the glosses of their definitions.
+
+    Parameters:
+        entries -- Iterable of Entry instances
+
+    Return:
+        {gloss: [(pos, class, case, source word)]} in the order of the first
+        occurrences (without duplicates)
+    """
+    groups = {}  # gloss -> {sense: None} (an ordered set)
+    for e in entries:
+        word = e.word()
+        for m in e._meanings:
+            sense = (m.part_of_speech(), m.class_(), m.case(), word)
+            for gloss in glosses(m._definition):
+                senses = groups.get(gloss)
+                if senses is None:
+                    groups[gloss] = {sense: None}
+                else:
+                    senses[sense] = None
+    return {gloss: list(senses) for gloss, senses in groups.items()}
+
+
+def reverse_dschictionary(dschict: dsch.Dschictionary,
+                          report=None) -> dsch.Dschictionary:
+    """
+    It generates the reverse of a dschictionary.
+
+    The entry and definition languages are swapped, every gloss of the
+    definitions is an entry, and its meanings are the source words. The
+    source words that can't be definitions are left out (see new_meaning()),
+    and so are the glosses without any other meaning.
+
+    Parameters:
+        dschict -- A (read) Dschictionary instance
+        report -- Function of the left out words (it gets a line) or None
+
+    Return:
+        A new (sorted) Dschictionary instance
+    """
+    reverse = dsch.Dschictionary(dschict._title, dschict.definition_language,
+                                 dschict.entry_language)
+    reverse.collation = dsch_collation.get_collation(reverse.entry_language)
+    idx = 1
+    for gloss, senses in reverse_entries(dschict.entries()).items():
+        meanings = [new_meaning(gloss, pos, class_, case, word,
+                                report=report)
+                    for pos, class_, case, word in senses]
+        meanings = [m for m in meanings if m is not None]
+        if not meanings:
+            continue
+        tmpe = dsch.entry.Entry(idx, gloss)
+        tmpe._meanings = meanings
+        reverse += tmpe
+        idx += 1
+    reverse._sort_entries()
+    return reverse
@@ -0,0 +1,426 @@
+"""
+Sharded dschictionaries: a manifest and the shard files that it lists.
+
+A huge dschictionary can be split into shard files (e.g. one per initial
+letter), every shard contains the words of a range: from its start word up
+to the next shard's start word (by the collation of the entry language).
+The manifest is a JSON file (its name ends with dsch_file.MANIFEST_EXTENSION)
+with the common language definition and the shards in order:
+
+    {"title": "Example", "entry_language": "toki pona",
+     "definition_language": "English",
+     "shards": [{"file": "example.001.txt", "start": ""},
+                {"file": "example.002.txt", "start": "k"}]}
+
+The shard files are ordinary dschictionary files (input format or JSON
+Lines, with the same languages), their names are relative to the manifest.
+A shard is loaded only when a word of its range is looked up, the whole
+dschictionary is read shard by shard in parallel processes (see
+Dschictionary.read_dschictionary()), the writers get the shards as one
+sorted stream (see iter_entries()), and a patch rewrites only the shards of
+its words.
+
+Example:
+    sharded = ShardedDschictionary("example.shards.json")
+    entry = sharded.lookup("toki")  # it reads only a single shard
+    d = dsch.Dschictionary.create_dschictionary("example.shards.json")
+
+Usage:
+    python dschictionary.py shard example.txt example.shards.json
+"""
+
+
+import bisect
+import contextlib
+import json
+import os
+import dschictionary_class as dsch
+import dsch_collation
+import dsch_file
+import dsch_sort
+
+
+class ShardError(Exception):
+    """
+    Simple Error class for sharded dschictionary errors.
+
+    It's raised when the manifest is not valid, a shard can't be read (or it
+    has other languages) or an entry is not in the range of its shard.
+    """
+
+    def __init__(self, message):
+        """
+        Just initialize it.
+
+        :param message: The message for the user
+        """
+        Exception.__init__(self, message)
+        self.message = message
+
+
+def read_shard(filename: str) -> tuple:
+    """
+    It reads the entries of a shard file (it's called in the processes of
+    the parallel reading too).
+
+    Return:
+        (entry language, definition language, entries in the order of the
+        file)
+
+    Raises:
+        ShardError if the file can't be read
+    """
+    d = dsch.Dschictionary().read_dschictionary(filename, load_entries=False)
+    if d.error:
+        raise ShardError("{0}: {1}".format(filename, d.error))
+    jsonl = dsch_file.strip_compression(filename).endswith(
+        dsch.JSONL_EXTENSION)
+    try:
+        with dsch_file.open_file(filename) as file:
+            file.readline()  # the languages or the header
+            entries = list(dsch.iter_jsonl_entries(file) if jsonl else
+                           dsch.iter_entries(file))
+    except dsch.RecordError as recerror:
+        raise ShardError("{0}: {1}".format(filename, recerror.message))
+    return d.entry_language, d.definition_language, entries
+
+
+class Shard:
+    """A shard file of a sharded dschictionary (a range of words)."""
+
+    def __init__(self, filename: str, start: str, key, num: int):
+        """
+        Initialize a shard (nothing is read).
+
+        Parameters:
+            filename -- The shard file's name
+            start -- The first word of its range ("" for the first shard)
+            key -- The sort key of start
+            num -- The position of the shard (0, 1, ...)
+        """
+        self.filename = filename
+        self.start = start
+        self.key = key
+        self.num = num
+        self._dschict = None  # see dschictionary()
+
+    def is_loaded(self) -> bool:
+        """It returns True if the shard is loaded (see dschictionary())."""
+        return self._dschict is not None
+
+    def unload(self):
+        """It drops the loaded entries."""
+        self._dschict = None
+
+
+def _write_manifest(manifestname: str, title: str, entrylang: str,
+                    defilang: str, shards: list):
+    """It writes a manifest ((file name, start) pairs) atomically."""
+    directory = os.path.dirname(os.path.abspath(manifestname))
+    header = json.dumps({'title': title, 'entry_language': entrylang,
+                         'definition_language': defilang},
+                        ensure_ascii=False)
+    records = [json.dumps({'file': os.path.relpath(os.path.abspath(f),
+                                                   directory),
+                           'start': start}, ensure_ascii=False)
+               for f, start in shards]  # a shard per line (for the diffs)
+    with dsch_file.atomic_open(manifestname) as f:
+        f.write(header[:-1] + ',\n "shards": [\n  ' +
+                ",\n  ".join(records) + "\n ]}\n")
+
+
+class ShardedDschictionary:
+    """The manifest and the (lazily loaded) shards of a dschictionary."""
+
+    def __init__(self, manifestname: str):
+        """
+        Read a manifest (the shards are not read).
+
+        Parameters:
+            manifestname -- The manifest's file name
+
+        Raises:
+            ShardError if the manifest is not valid
+            FileNotFoundError if the manifest doesn't exist
+        """
+        self.manifestname = manifestname
+        with open(manifestname, 'r', encoding='utf-8') as f:
+            try:
+                manifest = json.load(f)
+            except ValueError as exc:
+                raise ShardError("{0}: invalid manifest: {1}".format(
+                    manifestname, exc))
+        if type(manifest) is not dict or \
+                type(manifest.get('shards')) is not list or \
+                not manifest['shards']:
+            raise ShardError("{0}: the manifest should be an object with "
+                             "a non-empty 'shards' array".format(
+                                 manifestname))
+        self._title = manifest.get('title') or os.path.basename(
+            manifestname)[:-len(dsch_file.MANIFEST_EXTENSION)]
+        self.entry_language = manifest.get('entry_language', "")
+        self.definition_language = manifest.get('definition_language', "")
+        self.collation = dsch_collation.get_collation(self.entry_language)
+
+        directory = os.path.dirname(manifestname)
+        self._shards = []
+        for num, record in enumerate(manifest['shards']):
+            if type(record) is not dict or \
+                    type(record.get('file')) is not str or \
+                    type(record.get('start', "")) is not str:
+                raise ShardError("{0}: shard #{1} should have a 'file' and "
+                                 "a 'start' string".format(manifestname,
+                                                           num + 1))
+            start = record.get('start', "")
+            key = self._key(start)
+            if num == 0 and start:
+                raise ShardError("{0}: the first shard should start with "
+                                 "\"\"".format(manifestname))
+            if num and key <= self._shards[-1].key:
+                raise ShardError("{0}: the shards are not sorted ('{1}' is "
+                                 "after '{2}')".format(
+                                     manifestname, start,
+                                     self._shards[-1].start))
+            self._shards.append(Shard(os.path.join(directory,
+                                                   record['file']),
+                                      start, key, num))
+        self._keys = [s.key for s in self._shards]
+
+    def _key(self, word: str):
+        """It returns the sort key of a word (see Entry.sort_key())."""
+        return self.collation.sort_key(word) if self.collation else word
+
+    def title(self) -> str:
+        """It returns the dschictionary's title."""
+        return self._title
+
+    def shards(self) -> list:
+        """It returns the shards (Shard instances) in order."""
+        return self._shards
+
+    def filenames(self) -> list:
+        """It returns the manifest's and the shards' file names."""
+        return [self.manifestname] + [s.filename for s in self._shards]
+
+    def shard_of(self, word: str) -> Shard:
+        """It returns the shard of a word (by binary search)."""
+        return self._shards[bisect.bisect_right(self._keys,
+                                                self._key(word)) - 1]
+
+    def _check(self, shard: Shard, languages: tuple, entries):
+        """
+        Yield the entries of a shard and check its languages and the range
+        of the entries.
+        """
+        if languages != (self.entry_language, self.definition_language):
+            raise ShardError(
+                "{0}: the languages ({1[0]} {2} {1[1]}) differ from the "
+                "manifest's languages ({3} {2} {4})".format(
+                    shard.filename, languages, dsch.LANGUAGE_SEPARATOR,
+                    self.entry_language, self.definition_language))
+        end = (self._shards[shard.num + 1]
+               if shard.num + 1 < len(self._shards) else None)
+        collation = self.collation
+        for e in entries:
+            key = e.sort_key(collation)
+            if key < shard.key or (end is not None and key >= end.key):
+                raise ShardError("{0}: '{1}' is not in the range of the "
+                                 "shard".format(shard.filename, e.word()))
+            yield e
+
+    def dschictionary(self, shard: Shard) -> dsch.Dschictionary:
+        """
+        It returns the entries of a shard as a Dschictionary instance (the
+        shard is read at the first call).
+
+        Raises:
+            ShardError if the shard can't be read
+        """
+        if shard._dschict is None:
+            entrylang, defilang, entries = read_shard(shard.filename)
+            d = dsch.Dschictionary(self._title, entrylang, defilang)
+            d.collation = self.collation
+            for e in self._check(shard, (entrylang, defilang), entries):
+                d += e
+            d._sort_entries()
+            shard._dschict = d
+        return shard._dschict
+
+    def lookup(self, word: str):
+        """
+        It returns the entry of a word (or None), only the shard of the
+        word is read (see dschictionary()).
+        """
+        return self.dschictionary(self.shard_of(word)).lookup(word)
+
+    def iter_read_entries(self, workers=None):
+        """
+        It reads every shard (in parallel processes).
+
+        Parameters:
+            workers -- Number of processes (default: number of CPUs), with
+                       1 the shards are read in this process
+
+        Yield:
+            Entry instances (shard by shard, in the order of the files,
+            numbered from 1)
+
+        Raises:
+            ShardError if a shard can't be read or it's not valid
+        """
+        filenames = [s.filename for s in self._shards]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        idx = 0
+        with contextlib.ExitStack() as stack:
+            if workers == 1 or len(filenames) < 2:
+                results = map(read_shard, filenames)
+            else:
+                import concurrent.futures
+
+                pool = stack.enter_context(
+                    concurrent.futures.ProcessPoolExecutor(workers))
+                results = pool.map(read_shard, filenames)
+            for shard, (entrylang, defilang, entries) in zip(self._shards,
+                                                             results):
+                for e in self._check(shard, (entrylang, defilang),
+                                     entries):
+                    idx += 1
+                    e._id = idx
+                    yield e
+
+    def iter_entries(self, max_memory=dsch_sort.DEFAULT_MAX_MEMORY):
+        """
+        It sorts the shards one by one (see dsch_sort.iter_sorted_entries())
+        and yields their entries as one sorted stream.
+
+        Parameters:
+            max_memory -- Peak memory of the held entries of a shard (in
+                          bytes)
+
+        Yield:
+            The sorted Entry instances (numbered like the entries of a
+            single file)
+
+        Raises:
+            ShardError if a shard is not valid
+        """
+        offset = 0
+        for shard in self._shards:
+            d = dsch.Dschictionary().read_dschictionary(shard.filename,
+                                                        load_entries=False)
+            if d.error:
+                raise ShardError("{0}: {1}".format(shard.filename, d.error))
+            num = 0
+            for e in self._check(shard, (d.entry_language,
+                                         d.definition_language),
+                                 dsch_sort.iter_sorted_entries(
+                                     shard.filename, max_memory,
+                                     collation=self.collation)):
+                num += 1
+                e._id += offset
+                yield e
+            offset += num
+
+    def patch(self, patch, backup=True) -> list:
+        """
+        It applies a patch (see dsch_patch.py) to the shards of its words.
+
+        Only those shards are rewritten (sorted, atomically, after a backup),
+        and only if every operation can be applied. They're locked meanwhile.
+
+        Parameters:
+            patch -- A dsch_patch.Patch instance
+            backup -- If True, the original shards are copied (see
+                      dsch_patch.backup_filename())
+
+        Return:
+            The file names of the rewritten shards
+
+        Raises:
+            dsch_patch.PatchError if the patch can't be applied
+        """
+        import dsch_patch
+
+        words = {}  # shard -> words of its operations
+        for word in patch.words():
+            words.setdefault(self.shard_of(word), []).append(word)
+        patched = []
+        with contextlib.ExitStack() as stack:
+            for shard in sorted(words, key=lambda s: s.num):
+                stack.enter_context(dsch_file.file_lock(shard.filename))
+                patched.append((shard, dsch_patch.read_patched(
+                    shard.filename, patch.select(words[shard]))))
+            for shard, d in patched:
+                dsch_patch.rewrite_file(shard.filename, d, backup)
+                shard.unload()
+        return [shard.filename for shard, _ in patched]
+
+
+def split_dschictionary(filename: str, manifestname: str, starts=None,
+                        max_memory=dsch_sort.DEFAULT_MAX_MEMORY) -> list:
+    """
+    It splits a dschictionary file into shards and writes their manifest.
+
+    The entries are sorted by the external sort (see dsch_sort.py), the
+    shards are written in the input format next to the manifest
+    (e.g. example.001.txt). The starts without entries are left out.
+
+    Parameters:
+        filename -- The dschictionary file's name
+        manifestname -- The manifest's file name (see
+                        dsch_file.MANIFEST_EXTENSION)
+        starts -- The first words of the shards (default: a shard per
+                  initial letter)
+        max_memory -- Peak memory of the held entries (in bytes)
+
+    Return:
+        The file names of the written shards
+
+    Raises:
+        ShardError if the file can't be read
+    """
+    import itertools
+
+    if not dsch_file.is_manifest(manifestname):
+        raise ShardError("{0}: the manifest's name should end with "
+                         "{1}".format(manifestname,
+                                      dsch_file.MANIFEST_EXTENSION))
+    d = dsch.Dschictionary().read_dschictionary(filename, load_entries=False)
+    if d.error:
+        raise ShardError("{0}: {1}".format(filename, d.error))
+    collation = d.collation
+
+    def key(word):
+        return collation.sort_key(word) if collation else word
+
+    names = [""] + sorted((s for s in starts or () if s), key=key)
+    keys = [key(s) for s in names]
+    current = [""]  # the start of the current shard
+
+    def start_of(e):
+        if starts is not None:
+            return names[bisect.bisect_right(keys, e.sort_key(collation)) - 1]
+        initial = e.word()[:1]
+        # a new shard per initial letter (if it's in order)
+        if key(current[0]) < key(initial) <= e.sort_key(collation):
+            current[0] = initial
+        return current[0]
+
+    base = manifestname[:-len(dsch_file.MANIFEST_EXTENSION)]
+    shards = []
+    for start, entries in itertools.groupby(
+            dsch_sort.iter_sorted_entries(filename, max_memory,
+                                          collation=collation), start_of):
+        shardname = "{0}.{1:03d}.txt".format(base, len(shards) + 1)
+        with dsch_file.atomic_open(shardname) as f:
+            f.writelines(dsch.generate_source(entries, d.entry_language,
+                                              d.definition_language))
+        shards.append((shardname, start if shards else ""))
+    if not shards:
+        raise ShardError("{0}: the dschictionary doesn't contain any "
+                         "entries".format(filename))
+    _write_manifest(manifestname,
+                    os.path.basename(dsch_file.root_filename(filename)),
+                    d.entry_language, d.definition_language, shards)
+    return [shardname for shardname, _ in shards]
@@ -0,0 +1,263 @@
+"""
+Static site export of a dschictionary (HTML pages for a static server).
+
+The entries are split into pages by their initial letters (see page_name()),
+and every page is written by SitePage (an HTMLDschictionary that links the
+style sheet instead of inlining it). The 'see also' links point to the pages
+of the words. The style sheet is a separate asset with the hash of its
+content in its name (dschict.<hash>.css), so it can be cached forever.
+
+Every file gets a precompressed sibling (page.html.gz), so the server
+doesn't compress at request time, and the manifest (see MANIFEST_NAME)
+contains the content hashes of the files and of their compressed siblings
+to be used as ETags (the two representations need different ETags). A page
+is rewritten (and recompressed) only if its content hash is changed since
+the previous export, the files of the removed pages are deleted. The
+changed files are written and compressed in parallel threads (the
+compression releases the GIL).
+
+Example:
+    export_site(dsch.Dschictionary.create_dschictionary("example.txt"),
+                "site")
+
+Usage:
+    python dschictionary.py site example.txt site
+"""
+
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import dsch_file
+import dsch_instrument
+import dsch_out
+
+
+"""The name of the manifest of the content hashes (in the site directory)."""
+MANIFEST_NAME = "manifest.json"
+
+"""The name of the index page (the list of the pages)."""
+INDEX_PAGE = "index.html"
+
+"""The extension of the precompressed siblings."""
+GZIP_EXTENSION = ".gz"
+
+"""The number of hexadecimal digits of the hash in the asset names."""
+ASSET_HASH_LENGTH = 12
+
+
+def content_hash(data: bytes) -> str:
+    """It returns the content hash (SHA-256 in hexadecimal) of a file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def etag(digest: str) -> str:
+    """It returns the (strong) ETag of a content hash."""
+    return '"' + digest + '"'
+
+
+def page_name(word: str) -> str:
+    """
+    It returns the file name of the page of a word (by its case folded
+    initial letter).
+
+    Example:
+        page_name("Toki") -> 't.html', page_name("ĉu") -> 'u0109.html'
+    """
+    initial = word[:1].casefold()
+    if initial.isascii() and initial.isalnum():
+        return initial + ".html"
+    return "u{0:04x}.html".format(ord(initial[:1] or "_"))
+
+
+def asset_name(name: str, data: bytes) -> str:
+    """
+    It returns the name of an asset with its content hash.
+
+    Example:
+        asset_name("dschict.css", data) -> 'dschict.0123456789ab.css'
+    """
+    root, ext = os.path.splitext(name)
+    return "{0}.{1}{2}".format(root, content_hash(data)[:ASSET_HASH_LENGTH],
+                               ext)
+
+
+def read_manifest(directory: str) -> dict:
+    """
+    It reads the manifest of a site.
+
+    Return:
+        {file name: {'etag': ETag, 'size': bytes, 'gzip_etag': ETag,
+        'gzip_size': bytes}} (empty if there's no valid manifest)
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r',
+                  encoding='utf-8') as f:
+            files = json.load(f).get('files')
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return files if type(files) is dict else {}
+
+
+def _write_file(filename: str, data: bytes) -> dict:
+    """
+    It writes a file and its precompressed sibling atomically (in a thread
+    of the pool).
+
+    Return:
+        {'gzip_etag': ETag, 'gzip_size': bytes} of the compressed file
+    """
+    with dsch_file.atomic_open(filename, 'wb', compression=None) as f:
+        f.write(data)
+    with dsch_file.atomic_open(filename + GZIP_EXTENSION, 'wb',
+                               compression='gzip') as f:
+        f.write(data)
+    with open(filename + GZIP_EXTENSION, 'rb') as f:
+        compressed = f.read()
+    return {'gzip_etag': etag(content_hash(compressed)),
+            'gzip_size': len(compressed)}
+
+
+class SitePage(dsch_out.HTMLDschictionary):
+    """
+    A page of the static site: an HTML document with a linked style sheet
+    and 'see also' links to the other pages.
+    """
+
+    def __init__(self, dschict, page, stylesheet, instrument=None):
+        """
+        Initialize a page.
+
+        Parameters:
+            dschict -- The (read) Dschictionary instance
+            page -- The page's file name (see page_name())
+            stylesheet -- The file name of the style sheet asset
+            instrument -- A dsch_instrument.Instrument instance
+        """
+        super().__init__(dschict.title(), instrument=instrument,
+                         dschict=dschict)
+        self.page = page
+        self.stylesheet = stylesheet
+
+    def _add_style(self):
+        """Returns the head of the page with the linked style sheet."""
+        return ("<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+                "<title>{0}</title><link rel='stylesheet' href='{1}'>"
+                "</head><body>\n<a href='{2}'>{0}</a>\n").format(
+                    self._dschict.title(), self.stylesheet, INDEX_PAGE)
+
+    def _page_link(self, word):
+        """Returns the link of the page of a word ('' on this page)."""
+        page = page_name(word)
+        return '' if page == self.page else page
+
+    def generate_page(self, entries):
+        """Generates the page of the entries piece by piece."""
+        yield from self.generate_dschictionary(entries)
+        yield "\n</body></html>\n"
+
+
+def generate_index(dschict, pages: dict, stylesheet: str):
+    """
+    Generates the index page (the list of the pages) piece by piece.
+
+    Parameters:
+        dschict -- The Dschictionary instance
+        pages -- {page's file name: its entries} in order
+        stylesheet -- The file name of the style sheet asset
+    """
+    yield ("<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+           "<title>{0}</title><link rel='stylesheet' href='{1}'></head>"
+           "<body>\n<article class='dsch'><h1>{0}</h1><h3>{2}&nbsp;-&nbsp;"
+           "{3}</h3>\n<ul class='pages'>\n").format(
+               dschict.title(), stylesheet, dschict.entry_language,
+               dschict.definition_language)
+    for page, entries in pages.items():
+        yield "<li><a href='{0}'>{1}&nbsp;&ndash;&nbsp;{2}</a> ({3})</li>\n" \
+            .format(page, entries[0].word(), entries[-1].word(), len(entries))
+    yield "</ul></article>\n</body></html>\n"
+
+
+def export_site(dschict, directory: str, workers=None,
+                instrument=None) -> dict:
+    """
+    It exports a dschictionary as a static site (see the module's
+    description).
+
+    Parameters:
+        dschict -- A (read) Dschictionary instance
+        directory -- The site's directory (it's created if it's needed)
+        workers -- Number of threads of the writing and the compression
+                   (default: number of CPUs)
+        instrument -- A dsch_instrument.Instrument instance to measure the
+                      phases (render, write)
+
+    Return:
+        {'written': file names, 'unchanged': file names, 'removed': file
+        names}
+    """
+    ins = instrument or dsch_instrument.Instrument(interval=None)
+    os.makedirs(directory, exist_ok=True)
+    old = read_manifest(directory)
+    files = {}
+    result = {'written': [], 'unchanged': [], 'removed': []}
+
+    css = dsch_out.resource(dsch_out.STYLE_FILE).encode('utf-8')
+    stylesheet = asset_name(dsch_out.STYLE_FILE, css)
+    pages = {}  # page's file name -> entries (in sorted order)
+    for e in dschict.entries():
+        pages.setdefault(page_name(e.word()), []).append(e)
+
+    def contents():
+        yield stylesheet, css
+        yield INDEX_PAGE, "".join(generate_index(dschict, pages,
+                                                 stylesheet)).encode('utf-8')
+        for page, entries in pages.items():
+            writer = SitePage(dschict, page, stylesheet, ins)
+            yield page, "".join(writer.generate_page(entries)).encode(
+                'utf-8')
+
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+        pending = {}  # future -> (file name, record)
+        with ins.phase('render'):
+            for name, data in contents():
+                digest = content_hash(data)
+                filename = os.path.join(directory, name)
+                record = old.get(name)
+                if type(record) is dict and \
+                        record.get('etag') == etag(digest) and \
+                        record.get('gzip_etag') and \
+                        os.path.isfile(filename) and \
+                        os.path.isfile(filename + GZIP_EXTENSION):
+                    files[name] = record
+                    result['unchanged'].append(name)
+                    continue
+                record = {'etag': etag(digest), 'size': len(data)}
+                pending[pool.submit(_write_file, filename, data)] = (name,
+                                                                    record)
+                # only a few rendered pages wait for the threads
+                running = [f for f in pending if not f.done()]
+                if len(running) > 2 * workers:
+                    concurrent.futures.wait(running, return_when=(
+                        concurrent.futures.FIRST_COMPLETED))
+        with ins.phase('write'):
+            for future, (name, record) in pending.items():
+                record.update(future.result())
+                files[name] = record
+                result['written'].append(name)
+
+    for name in old:
+        if name not in files and os.path.basename(name) == name:
+            for filename in (name, name + GZIP_EXTENSION):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    pass
+            result['removed'].append(name)
+
+    with dsch_file.atomic_open(os.path.join(directory, MANIFEST_NAME)) as f:
+        json.dump({'files': dict(sorted(files.items()))}, f, indent=1)
+        f.write("\n")
+    return result
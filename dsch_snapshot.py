@@ -0,0 +1,224 @@
+"""
+Hot reload of dschictionaries for long-lived (multi-threaded) processes.
+
+A LiveDschictionary publishes snapshots: a snapshot is a completely read
+dschictionary (with its indexes) that is never modified after it's
+published. A reload reads the file into a new snapshot (in the background,
+if it's wanted), and then replaces the published one by a single
+assignment. The readers don't need any lock: they get the current snapshot
+and use it until they finish, even if a newer one is published meanwhile.
+
+Example:
+    live = LiveDschictionary("example.txt")
+    live.watch(5.0)  # reload in the background if the file is changed
+    entry = live.lookup("toki")  # from the current snapshot
+    with live.snapshot() as snap:  # a consistent view for more queries
+        words = [e.word() for e in snap.entries()]
+"""
+
+
+import os
+import threading
+import time
+import dschictionary_class as dsch
+
+
+class ReloadError(Exception):
+    """
+    Simple Error class for failed reloads.
+
+    It's raised when the new version of the dschictionary can't be read (the
+    previous snapshot stays published).
+    """
+
+    def __init__(self, message):
+        """
+        Just initialize it.
+
+        :param message: The message for the user
+        """
+        Exception.__init__(self, message)
+        self.message = message
+
+
+class Snapshot:
+    """
+    An immutable version of a dschictionary.
+
+    The entries are stored in a tuple, so the snapshot can't be extended
+    (Dschictionary.__add__() fails on it), and its indexes (word index, see
+    also graph, pronunciation index) are built before it's published.
+    """
+
+    def __init__(self, dschict: dsch.Dschictionary, version: int,
+                 mtime=None):
+        """
+        Freeze a (read) dschictionary.
+
+        Parameters:
+            dschict -- The Dschictionary instance (it shouldn't be used
+                       elsewhere)
+            version -- The number of the snapshot (1, 2, ...)
+            mtime -- The modification time of the file
+        """
+        dschict._entries = tuple(dschict._entries)
+        dschict.see_graph()
+        dschict.pronunciation_index()
+        self._dschict = dschict
+        self.version = version
+        self.mtime = mtime
+        self.created = time.time()
+
+    def dschictionary(self) -> dsch.Dschictionary:
+        """It returns the (frozen) Dschictionary instance."""
+        return self._dschict
+
+    def entries(self) -> tuple:
+        """It returns the entries (sorted)."""
+        return self._dschict._entries
+
+    def lookup(self, word: str):
+        """It returns the entry of a word (or None)."""
+        return self._dschict._index.get(word)
+
+    def __enter__(self):
+        """Use it in a with statement (it only makes the scope visible)."""
+        return self
+
+    def __exit__(self, *exc):
+        """Nothing to release: the snapshot is just not used anymore."""
+        return False
+
+
+class LiveDschictionary:
+    """A dschictionary file that can be reloaded while it's used."""
+
+    def __init__(self, filename: str, load=True):
+        """
+        Read the first snapshot of a dschictionary file.
+
+        Parameters:
+            filename -- The dschictionary file's name
+            load -- If False, the first snapshot is read by reload()
+
+        Raises:
+            ReloadError if the file can't be read
+        """
+        self.filename = filename
+        self.error = ""  # error of the last failed reload
+        self._snapshot = None
+        self._version = 0
+        self._reload_lock = threading.Lock()  # only for the writers
+        self._watcher = None
+        self._stop = threading.Event()
+        if load:
+            self.reload()
+
+    def snapshot(self) -> Snapshot:
+        """
+        It returns the current snapshot (without locking).
+
+        The returned snapshot doesn't change, use it for more queries that
+        should see the same version.
+        """
+        return self._snapshot
+
+    def lookup(self, word: str):
+        """It returns the entry of a word from the current snapshot."""
+        return self._snapshot.lookup(word)
+
+    def version(self) -> int:
+        """It returns the version of the current snapshot (0: no snapshot)."""
+        snap = self._snapshot
+        return snap.version if snap else 0
+
+    def _mtime(self):
+        """It returns the modification time of the file (or None)."""
+        try:
+            return os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_changed(self) -> bool:
+        """It returns True if the file is changed since the last snapshot."""
+        snap = self._snapshot
+        return snap is None or self._mtime() != snap.mtime
+
+    def reload(self, force=True) -> bool:
+        """
+        It reads the file into a new snapshot and publishes it.
+
+        The current snapshot is used by the readers until the new one is
+        completely built. Concurrent reloads are serialized.
+
+        Parameters:
+            force -- If False, the file is read only if it's changed
+
+        Return:
+            True if a new snapshot is published
+
+        Raises:
+            ReloadError if the file can't be read (the current snapshot stays)
+        """
+        with self._reload_lock:
+            if not force and not self.is_changed():
+                return False
+            mtime = self._mtime()
+            d = dsch.Dschictionary().read_dschictionary(self.filename)
+            if d.error and not d.entries():
+                self.error = d.error
+                raise ReloadError(d.error)
+            self._version += 1
+            snap = Snapshot(d, self._version, mtime)
+            self._snapshot = snap  # the publication is a single assignment
+            self.error = ""
+            return True
+
+    def reload_in_background(self, force=True) -> threading.Thread:
+        """
+        It reloads the file in a background thread (see reload()).
+
+        A failed reload is recorded in self.error.
+
+        Return:
+            The started thread
+        """
+        def run():
+            try:
+                self.reload(force)
+            except ReloadError:
+                pass
+
+        thread = threading.Thread(target=run, daemon=True,
+                                  name="dschictionary-reload")
+        thread.start()
+        return thread
+
+    def watch(self, interval=5.0):
+        """
+        It starts a background thread that reloads the changed file.
+
+        Parameters:
+            interval -- Time between two checks (seconds)
+        """
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload(force=False)
+                except ReloadError:
+                    pass
+
+        self._watcher = threading.Thread(target=run, daemon=True,
+                                         name="dschictionary-watch")
+        self._watcher.start()
+
+    def stop(self):
+        """It stops the watcher thread (see watch())."""
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
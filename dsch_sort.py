@@ -0,0 +1,203 @@
+"""
+External-memory sort for dschictionaries that do not fit in the memory.
+
+The entries are read block by block, and every block (run) is sorted in the
+memory then spilled into a temporary file. Finally the runs are merged
+through a heap (k-way merge). Because the runs follow the order of the input
+file and the merge is stable, the result is exactly the same as the result of
+Dschictionary's in-memory sort.
+"""
+
+
+import heapq
+import json
+import os
+import pickle
+import tempfile
+import dschictionary_class as dsch
+import dsch_collation
+import dsch_file
+
+
+"""Default peak memory (in bytes) of the entries held in the memory."""
+DEFAULT_MAX_MEMORY = 256 * 1024 * 1024
+
+"""
+Estimated memory usage of the built Entry objects per character of the input.
+
+It is measured on the example dschictionaries (it was about 7).
+"""
+ENTRY_MEMORY_FACTOR = 8
+
+"""
+Estimated peak memory of a loaded dschictionary (the entries with the word,
+see also and pronunciation indexes) per character of the input format.
+
+It is measured by tracemalloc (see dsch_instrument.py) on generated
+dschictionaries (it was about 9, and about 4.5 for JSON Lines files).
+"""
+LOAD_MEMORY_FACTOR = 10
+
+"""The same as LOAD_MEMORY_FACTOR for JSON Lines files."""
+JSONL_MEMORY_FACTOR = 5
+
+"""Estimated compression ratio of the compressed dschictionary files."""
+COMPRESSION_RATIO = 5
+
+"""Maximum number of runs that are merged at once."""
+MAX_FANIN = 64
+
+"""
+Possible formats of the temporary run files:
+    pickle -- compact binary format (keeps every field, even the ids)
+    text -- the dschictionary input format (the ids are renumbered)
+"""
+RUN_FORMATS = ('pickle', 'text')
+
+
+class _LineCounter:
+    """Iterates over the lines of a file and counts the read characters."""
+
+    def __init__(self, file):
+        """Wrap an opened file."""
+        self.file = file
+        self.chars = 0
+
+    def __iter__(self):
+        """Yield the lines of the file."""
+        for line in self.file:
+            self.chars += len(line)
+            yield line
+
+
+def _write_run(entries: list, run_format: str):
+    """
+    It writes a sorted run into an anonymous temporary file.
+
+    Parameters:
+        entries -- Sorted Entry instances
+        run_format -- One of the RUN_FORMATS
+
+    Return:
+        The temporary file (it's deleted when it's closed)
+    """
+    if run_format == 'pickle':
+        run = tempfile.TemporaryFile('w+b')
+        for e in entries:  # independent pickles (a shared memo would grow)
+            pickle.dump(e, run, pickle.HIGHEST_PROTOCOL)
+    else:
+        run = tempfile.TemporaryFile('w+', encoding='utf-8')
+        for e in entries:
+            run.write(dsch.check_source(e).get_entry_as_source() + "\n")
+    run.seek(0)
+    return run
+
+
+def _read_run(run, run_format: str):
+    """Yield the entries of a run file and close it at the end."""
+    try:
+        if run_format == 'pickle':
+            while True:
+                try:
+                    yield pickle.load(run)
+                except EOFError:
+                    break
+        else:
+            yield from dsch.iter_entries(run)
+    finally:
+        run.close()
+
+
+def _merge_runs(runs: list, run_format: str, key):
+    """Yield the entries of the sorted runs in order."""
+    return heapq.merge(*[_read_run(r, run_format) for r in runs], key=key)
+
+
+def estimate_memory(filename: str) -> int:
+    """
+    It estimates the peak memory of loading a dschictionary file.
+
+    The estimate is based on the size of the file (see LOAD_MEMORY_FACTOR),
+    the file is not read.
+
+    Return:
+        Estimated peak memory (in bytes)
+    """
+    size = os.path.getsize(filename)
+    if dsch_file.compression_by_extension(filename):
+        size *= COMPRESSION_RATIO
+    if dsch_file.strip_compression(filename).endswith(dsch.JSONL_EXTENSION):
+        return size * JSONL_MEMORY_FACTOR
+    return size * LOAD_MEMORY_FACTOR
+
+
+def fits_in_memory(filename: str, budget: int) -> bool:
+    """
+    It returns True if a dschictionary file can be loaded within a memory
+    budget (in bytes, see estimate_memory()).
+    """
+    return estimate_memory(filename) <= budget
+
+
+def iter_sorted_entries(filename: str, max_memory=DEFAULT_MAX_MEMORY,
+                        run_format='pickle', collation=None):
+    """
+    It sorts the entries of a dschictionary file with bounded memory.
+
+    The input file is read completely before this function returns (so the
+    input file can be overwritten while the returned iterator is used). It
+    can be a JSON Lines file too (see Dschictionary.read_jsonl()).
+
+    Parameters:
+        filename -- The dschictionary file's name
+        max_memory -- Peak memory of the held entries (in bytes)
+        run_format -- Format of the temporary files (see RUN_FORMATS)
+        collation -- A dsch_collation.Collation instance. If None, the
+                     collation of the entry language is used.
+
+    Return:
+        An iterator of the sorted Entry instances
+    """
+    if run_format not in RUN_FORMATS:
+        raise ValueError("Unknown run format: " + str(run_format))
+    limit = max(1, max_memory // ENTRY_MEMORY_FACTOR)
+
+    runs = []
+    block = []
+    jsonl = dsch_file.strip_compression(filename).endswith(
+        dsch.JSONL_EXTENSION)
+    with dsch_file.open_file(filename) as file:
+        if jsonl:
+            entry_language = json.loads(file.readline() or "{}").get(
+                'entry_language', "")
+        else:
+            entry_language = dsch.parse_languages(file.readline())[0]
+        if collation is None:
+            collation = dsch_collation.get_collation(entry_language)
+
+        def key(e):
+            return dsch.entry_sort_key(e, collation)
+
+        lines = _LineCounter(file)
+        for e in (dsch.iter_jsonl_entries(lines) if jsonl else
+                  dsch.iter_entries(lines)):
+            block.append(e)
+            if lines.chars >= limit:
+                block.sort(key=key)
+                runs.append(_write_run(block, run_format))
+                block = []
+                lines.chars = 0
+    block.sort(key=key)
+
+    if not runs:  # everything fits in the memory
+        return iter(block)
+    if block:
+        runs.append(_write_run(block, run_format))
+    block = None
+
+    # Merging the runs in more passes if there are too many of them
+    while len(runs) > MAX_FANIN:
+        runs = [_write_run(_merge_runs(runs[i:i + MAX_FANIN], run_format,
+                                       key), run_format)
+                for i in range(0, len(runs), MAX_FANIN)]
+    return _merge_runs(runs, run_format, key)
@@ -0,0 +1,327 @@
+"""
+SQLite storage of dschictionaries (optional backend).
+
+A dschictionary is mirrored into normalized tables (entries and their
+meanings), so the tools can query big dschictionaries with SQL instead of
+loading every entry into the memory. The descriptions, comments and
+definitions are full-text searchable (if the SQLite has FTS5).
+
+Tables:
+    info -- key/value pairs: title, entry_language, definition_language
+    entry -- id, word, sort_key, pronunciation, description, origin,
+             comment, see
+    meaning -- entry_id, position, pos, class, "case", definition, level
+    entry_fts -- FTS5 index (rowid = entry id): word, description, comment,
+                 definitions
+
+Only the entry classes are imported at startup (a lookup doesn't need the
+parser, the collations and the file handling).
+"""
+
+
+import os
+import sqlite3
+import dsch_entry as entry
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entry (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL,
+    sort_key BLOB NOT NULL,
+    pronunciation TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    origin TEXT NOT NULL DEFAULT '',
+    comment TEXT NOT NULL DEFAULT '',
+    see TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS meaning (
+    entry_id INTEGER NOT NULL REFERENCES entry(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    pos TEXT NOT NULL DEFAULT '',
+    class TEXT NOT NULL DEFAULT '',
+    "case" TEXT NOT NULL DEFAULT '',
+    definition TEXT NOT NULL DEFAULT '',
+    level INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (entry_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entry_word ON entry(word);
+CREATE INDEX IF NOT EXISTS entry_sort_key ON entry(sort_key);
+CREATE INDEX IF NOT EXISTS meaning_pos ON meaning(pos);
+CREATE INDEX IF NOT EXISTS meaning_class ON meaning(class);
+CREATE INDEX IF NOT EXISTS meaning_case ON meaning("case");
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entry_fts USING fts5(
+    word, description, comment, definitions
+);
+"""
+
+
+class SQLiteDschictionary:
+    """A dschictionary stored in an SQLite database."""
+
+    def __init__(self, dbname: str):
+        """
+        Open (or create) a dschictionary database.
+
+        Parameters:
+            dbname -- The database file's name (or ':memory:')
+        """
+        self.dbname = dbname
+        self.connection = sqlite3.connect(dbname)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        try:
+            self.connection.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:  # SQLite is built without FTS5
+            self.fts = False
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    def __enter__(self):
+        """Use it in a with statement."""
+        return self
+
+    def __exit__(self, *exc):
+        """Close the database at the end of the with statement."""
+        self.close()
+
+    def info(self, key: str) -> str:
+        """
+        Get a basic information of the dschictionary.
+
+        Parameters:
+            key -- title, entry_language or definition_language
+        """
+        row = self.connection.execute("SELECT value FROM info WHERE key = ?",
+                                      (key,)).fetchone()
+        return row[0] if row else ""
+
+    def collation(self):
+        """It returns the collation of the entry language (or None)."""
+        import dsch_collation
+        return dsch_collation.get_collation(self.info('entry_language'))
+
+    def num_of_entries(self) -> int:
+        """It returns the number of entries."""
+        return self.connection.execute(
+            "SELECT count(*) FROM entry").fetchone()[0]
+
+    def import_entries(self, entries, title="", entrylang="", defilang="",
+                       collation=None):
+        """
+        It replaces the content of the database in a single transaction.
+
+        Parameters:
+            entries -- Iterable of Entry instances (it's consumed only once)
+            title -- Title
+            entrylang -- Language of entries
+            defilang -- Language of definitions
+            collation -- A dsch_collation.Collation instance for the sort keys.
+                         If None, the collation of the entry language is
+                         used.
+
+        Return:
+            Number of imported entries
+        """
+        if collation is None:
+            import dsch_collation
+            collation = dsch_collation.get_collation(entrylang)
+        meanings = []
+        fts = []
+        num = 0
+
+        def entry_rows():
+            nonlocal num
+            for e in entries:
+                num += 1
+                definitions = []
+                for pos, m in enumerate(e._meanings):
+                    meanings.append((num, pos, m.part_of_speech(),
+                                     m.class_(), m.case(), m._definition,
+                                     m.level()))
+                    definitions.append(m._definition)
+                if self.fts:
+                    fts.append((num, e.word(), e.description(), e.comment(),
+                                "\n".join(definitions)))
+                yield (num, e.word(),
+                       e.sort_key(collation).encode('utf-8'),
+                       e.pronunciation(), e.description(), e.origin(),
+                       e.comment(), e.see())
+                if len(meanings) >= 10000:
+                    flush()
+
+        def flush():
+            c.executemany("INSERT INTO meaning VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          meanings)
+            meanings.clear()
+            if fts:
+                c.executemany("INSERT INTO entry_fts(rowid, word, "
+                              "description, comment, definitions) "
+                              "VALUES (?, ?, ?, ?, ?)", fts)
+                fts.clear()
+
+        with self.connection:  # a single transaction
+            c = self.connection.cursor()
+            c.execute("DELETE FROM meaning")
+            c.execute("DELETE FROM entry")
+            if self.fts:
+                c.execute("DELETE FROM entry_fts")
+            c.execute("DELETE FROM info")
+            c.executemany("INSERT INTO info VALUES (?, ?)",
+                          (('title', title),
+                           ('entry_language', entrylang),
+                           ('definition_language', defilang)))
+            for row in entry_rows():
+                c.execute("INSERT INTO entry VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          row)
+            flush()
+        return num
+
+    def import_dschictionary(self, dschict) -> int:
+        """It imports a (read) Dschictionary instance."""
+        return self.import_entries(dschict.entries(), dschict.title(),
+                                   dschict.entry_language,
+                                   dschict.definition_language,
+                                   dschict.collation)
+
+    def import_file(self, filename: str) -> int:
+        """
+        It imports a dschictionary file without loading all of its entries.
+
+        The JSON Lines files are loaded (see Dschictionary.read_jsonl()).
+
+        Parameters:
+            filename -- The dschictionary file's name
+
+        Return:
+            Number of imported entries
+
+        Raises:
+            FileNotFoundError, LanguageError or RecordError
+        """
+        import dschictionary_class as dsch
+        import dsch_file
+
+        if dsch_file.strip_compression(filename).endswith(
+                dsch.JSONL_EXTENSION):
+            d = dsch.Dschictionary().read_jsonl(filename)
+            if d.error:
+                raise dsch.RecordError(filename, d.error)
+            return self.import_dschictionary(d)
+        with dsch_file.open_file(filename) as file:
+            entrylang, defilang = dsch.parse_languages(file.readline())
+            title = os.path.basename(dsch_file.root_filename(filename))
+            return self.import_entries(dsch.iter_entries(file), title,
+                                       entrylang, defilang)
+
+    def _entries(self, where="", params=()):
+        """
+        Yield Entry instances (with their meanings) in sorted order.
+
+        Parameters:
+            where -- SQL condition on the entry table (without WHERE)
+            params -- Parameters of the condition
+        """
+        where = (" WHERE " + where) if where else ""
+        # the meanings are joined in the same query (in the order of the
+        # entries), so the rows of an entry are consecutive
+        rows = self.connection.execute(
+            "SELECT e.id, e.word, e.pronunciation, e.description, e.origin, "
+            "e.comment, e.see, m.pos, m.class, m.\"case\", m.definition, "
+            "m.level FROM (SELECT * FROM entry" + where + ") AS e "
+            "LEFT JOIN meaning AS m ON m.entry_id = e.id "
+            "ORDER BY e.sort_key, e.id, m.position", params)
+        e = None
+        for row in rows:
+            if e is None or e._id != row[0]:
+                if e is not None:
+                    yield e
+                e = entry.Entry(row[0], row[1], row[2], row[3], [],
+                                row[4], row[5], row[6])
+            if row[7] is not None:  # None: the entry doesn't have meanings
+                e += entry.meaning.Meaning(*row[7:])
+        if e is not None:
+            yield e
+
+    def iter_entries(self):
+        """Yield all entries in sorted order."""
+        return self._entries()
+
+    def lookup(self, word: str) -> list:
+        """It returns the entries of a word."""
+        return list(self._entries("word = ?", (word,)))
+
+    def search(self, text: str) -> list:
+        """
+        Full-text search in the words, descriptions, comments and definitions.
+
+        Parameters:
+            text -- An FTS5 query (or a simple substring without FTS5)
+
+        Return:
+            The found entries (in sorted order)
+        """
+        if self.fts:
+            return list(self._entries(
+                "id IN (SELECT rowid FROM entry_fts WHERE entry_fts MATCH ?)",
+                (text,)))
+        like = "%" + text + "%"
+        return list(self._entries(
+            "description LIKE ? OR comment LIKE ? OR word LIKE ? OR id IN "
+            "(SELECT entry_id FROM meaning WHERE definition LIKE ?)",
+            (like, like, like, like)))
+
+    def query(self, sql: str, params=()) -> list:
+        """It runs an SQL query and returns its rows."""
+        return self.connection.execute(sql, params).fetchall()
+
+    def to_dschictionary(self):
+        """It returns the content as a Dschictionary instance."""
+        import dschictionary_class as dsch
+
+        d = dsch.Dschictionary(self.info('title'),
+                               self.info('entry_language'),
+                               self.info('definition_language'))
+        d.collation = self.collation()
+        for e in self._entries():
+            d += e
+        return d
+
+    def export_file(self, filename: str) -> int:
+        """
+        It writes the dschictionary in the input format (sorted).
+
+        Parameters:
+            filename -- The output file's name
+
+        Return:
+            Number of written entries
+        """
+        import dschictionary_class as dsch
+        import dsch_file
+
+        with dsch_file.atomic_open(filename) as out:
+            out.writelines(dsch.generate_source(
+                self._entries(), self.info('entry_language'),
+                self.info('definition_language')))
+        return self.num_of_entries()
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: dsch_sqlite.py <dschictionary file> <database>")
+    else:
+        with SQLiteDschictionary(sys.argv[2]) as db:
+            print(db.import_file(sys.argv[1]), "entries are imported.")
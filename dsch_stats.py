@@ -0,0 +1,145 @@
+"""
+Statistics of a dschictionary (maintained incrementally).
+
+The counters are updated when an entry is added to (or removed from) the
+dschictionary, so the statistics are never computed by scanning the entries
+and the queries only read the counters.
+"""
+
+
+import dsch_pos
+
+
+"""The optional fields of the entries (key -> Entry attribute)."""
+FIELDS = {
+    'pro': '_pronunciation',
+    'ori': '_origin',
+    'com': '_comment',
+    'see': '_see'
+}
+
+"""The name of the PoSs that are not in dsch_pos.DEFAULT."""
+UNKNOWN_POS = 'Unknown part of speech'
+
+
+def _count(counter: dict, key, num: int):
+    """It adds num to a counter (and drops it if it's zero)."""
+    value = counter.get(key, 0) + num
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+class Statistics:
+    """The counters of the entries and the meanings."""
+
+    def __init__(self, entries=()):
+        """
+        Initialize the counters.
+
+        Parameters:
+            entries -- Iterable of Entry instances that are already added
+        """
+        self._entries = 0
+        self._meanings = 0
+        self._distribution = {}  # number of meanings -> number of entries
+        self._pos = {}  # part of speech -> number of meanings
+        self._classes = {}  # class -> number of meanings
+        self._cases = {}  # case -> number of meanings
+        self._fields = dict.fromkeys(FIELDS, 0)  # key -> number of entries
+        for e in entries:
+            self.add_entry(e)
+
+    def _update(self, entry_, num: int):
+        """It adds (num=1) or removes (num=-1) an entry."""
+        self._entries += num
+        meanings = entry_._meanings
+        self._meanings += num * len(meanings)
+        _count(self._distribution, len(meanings), num)
+        for m in meanings:
+            if m._part_of_speech:
+                _count(self._pos, m._part_of_speech, num)
+            if m._class:
+                _count(self._classes, m._class, num)
+            if m._case:
+                _count(self._cases, m._case, num)
+        fields = self._fields
+        for key, attr in FIELDS.items():
+            if getattr(entry_, attr):
+                fields[key] += num
+
+    def add_entry(self, entry_):
+        """It counts a (complete) Entry instance."""
+        self._update(entry_, 1)
+
+    def remove_entry(self, entry_):
+        """It uncounts a counted Entry instance (before it's modified)."""
+        self._update(entry_, -1)
+
+    def num_of_entries(self) -> int:
+        """It returns the number of entries."""
+        return self._entries
+
+    def num_of_meanings(self) -> int:
+        """It returns the number of meanings."""
+        return self._meanings
+
+    def meanings_distribution(self) -> dict:
+        """It returns the number of entries by their number of meanings."""
+        return dict(sorted(self._distribution.items()))
+
+    def parts_of_speech(self) -> dict:
+        """It returns the number of meanings by part of speech."""
+        return dict(self._pos)
+
+    def classes(self) -> dict:
+        """It returns the number of meanings by class."""
+        return dict(self._classes)
+
+    def cases(self) -> dict:
+        """It returns the number of meanings by case."""
+        return dict(self._cases)
+
+    def unknown_parts_of_speech(self) -> list:
+        """It returns the used PoSs that are not in dsch_pos.DEFAULT."""
+        return sorted(p for p in self._pos if p not in dsch_pos.DEFAULT)
+
+    def pos_table(self) -> dict:
+        """
+        It returns the used PoSs with their names (for the PoS tables of the
+        outputs).
+
+        Return:
+            {PoS: name from dsch_pos.DEFAULT or UNKNOWN_POS}
+        """
+        return {p: dsch_pos.DEFAULT.get(p, UNKNOWN_POS) for p in self._pos}
+
+    def field_count(self, key: str) -> int:
+        """It returns the number of entries with a field (see FIELDS)."""
+        return self._fields[key]
+
+    def field_share(self, key: str) -> float:
+        """It returns the share of the entries with a field (0.0 - 1.0)."""
+        return self._fields[key] / self._entries if self._entries else 0.0
+
+    def get_statistics_as_dict(self) -> dict:
+        """
+        It returns the statistics as a dictionary (JSON serializable).
+
+        Keys:
+            entries -- number of entries
+            meanings -- number of meanings
+            distribution -- {number of meanings: number of entries}
+            pos, cls, cas -- {value: number of meanings}
+            unknown_pos -- PoSs that are not in dsch_pos.DEFAULT
+            share -- {pro, ori, com, see: share of entries with the field}
+        """
+        return {'entries': self._entries,
+                'meanings': self._meanings,
+                'distribution': self.meanings_distribution(),
+                'pos': self.parts_of_speech(),
+                'cls': self.classes(),
+                'cas': self.cases(),
+                'unknown_pos': self.unknown_parts_of_speech(),
+                'share': {key: self.field_share(key) for key in FIELDS}}
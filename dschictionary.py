@@ -1,5 +1,50 @@
-"""This will be the main script to use this program.
-Now, use dschout.py for tests."""
+"""
+This will be the main script to use this program.
+
+Commands:
+    lookup -- It prints the entries of words (or the result of a full-text
+              search), e.g.: python dschictionary.py lookup -d example.txt toki
+    convert -- It converts a dschictionary between the input format, JSON
+               Lines and SQLite, e.g.: python dschictionary.py convert
+               example.txt example.db
+    render -- It writes an output (txt, html, jsonl, csv) of a dschictionary
+              to the standard output or into a file
+    build -- It writes the outputs of many dschictionary files concurrently,
+             e.g.: python dschictionary.py build -f txt html -j 4 *.txt
+    reverse -- It generates the reverse of a dschictionary (definition
+               language -> entry language), e.g.: python dschictionary.py
+               reverse example.txt example.reverse.txt
+    pivot -- It generates a draft dschictionary A -> C from A -> B and
+             B -> C ones (see dsch_pivot.py), e.g.: python dschictionary.py
+             pivot tokipona.txt english.txt draft.txt
+    diff -- It compares two versions of a dschictionary entry by entry,
+            e.g.: python dschictionary.py diff -f summary old.txt new.txt
+    patch -- It applies a batch of changes (a JSON Lines file, see
+             dsch_patch.py) to a dschictionary file in a single rewrite,
+             e.g.: python dschictionary.py patch example.txt changes.jsonl
+             (with --journal, they're appended to the edit journal)
+    compact -- It folds the edit journal of a dschictionary file into the
+               file (see dsch_journal.py), e.g.: python dschictionary.py
+               compact example.txt
+    shard -- It splits a dschictionary file into shards (e.g. one per
+             initial letter) with a manifest (see dsch_shard.py), the
+             manifest can be given instead of a dschictionary file to the
+             other commands, e.g.: python dschictionary.py shard
+             example.txt example.shards.json
+    site -- It exports a dschictionary as a static site (pages by initial
+            letter with precompressed .gz siblings and an ETag manifest, see
+            dsch_site.py), e.g.: python dschictionary.py site example.txt site
+    duplicates -- It reports the words that have more entries in a
+                  dschictionary file (with line numbers), e.g.: python
+                  dschictionary.py duplicates example.txt
+    stats -- It prints the statistics of a dschictionary as JSON (see
+             dsch_stats.py), e.g.: python dschictionary.py stats example.txt
+
+The modules are imported only by the commands that need them, so a lookup
+in a compiled (SQLite) dschictionary doesn't load the parser and the
+writers. A lookup in a dschictionary file compiles it into a cache next to
+it (see CACHE_EXTENSION) that is rebuilt only when the file changes.
+"""
 
 __version__ = "v0.0.4"
 __copyright__ = "Copyright (C) 2016-2017, B. Zolt'n Gorza"
@@ -17,6 +62,872 @@ GNU General Public License for more details.
 """
 
 
+import os
+import re
+import sys
+
+
+"""The default formats of the build command."""
+DEFAULT_FORMATS = ('txt', 'html')
+
+"""The names of the generated (output and backup) files."""
+GENERATED = re.compile(r"\.(dict|backup)\.[^/\\]*$")
+
+"""The extensions of the compiled (SQLite) dschictionaries."""
+DATABASE_EXTENSIONS = ('.db', '.sqlite')
+
+"""The extension of the compiled caches of the dschictionary files."""
+CACHE_EXTENSION = '.cache.db'
+
+"""The units of the memory sizes (e.g. 512M, see parse_size())."""
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def expand_inputs(patterns) -> list:
+    """
+    It returns the input files of file names and glob patterns.
+
+    The patterns don't match the generated files (*.dict.*, *.backup.*),
+    the patterns without any match are kept (so they're reported as missing
+    files), and every file is listed only once.
+    """
+    import glob
+
+    files = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            files.extend(sorted(f for f in glob.glob(pattern)
+                                if not GENERATED.search(f)) or [pattern])
+        else:
+            files.append(pattern)
+    return list(dict.fromkeys(files))
+
+
+def parse_size(size: str) -> int:
+    """
+    It returns a memory size in bytes.
+
+    Example:
+        parse_size("512M") -> 536870912
+
+    Raises:
+        ValueError if the size is not valid
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)i?B?\s*", size, re.I)
+    if not match:
+        raise ValueError("Invalid size: " + size)
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+
+
+def output_filename(filename: str, ex: str) -> str:
+    """
+    It returns the name of an output file (see
+    BaseDschictionary._filename()).
+    """
+    import dsch_file
+
+    return dsch_file.root_filename(filename) + '.dict.' + ex
+
+
+def is_up_to_date(filename: str, outputs) -> bool:
+    """It returns True if every output is newer than the input file."""
+    try:
+        mtime = os.stat(filename).st_mtime
+        return all(os.stat(out).st_mtime > mtime for out in outputs)
+    except FileNotFoundError:
+        return False
+
+
+def source_files(filename: str) -> list:
+    """
+    It returns the files that a dschictionary file is read from: the file
+    and its edit journal, or a manifest and its shards.
+    """
+    import dsch_file
+
+    if dsch_file.is_manifest(filename):
+        import dsch_shard
+
+        return dsch_shard.ShardedDschictionary(filename).filenames()
+    if dsch_file.has_journal(filename):
+        return [filename, filename + dsch_file.JOURNAL_EXTENSION]
+    return [filename]
+
+
+def is_database(filename: str) -> bool:
+    """It returns True if the file is a compiled (SQLite) dschictionary."""
+    return filename.endswith(DATABASE_EXTENSIONS)
+
+
+def write_database(filename: str, importer):
+    """
+    It writes a compiled dschictionary atomically.
+
+    Parameters:
+        filename -- The database file's name
+        importer -- Function that fills an (empty) SQLiteDschictionary
+    """
+    import tempfile
+    import dsch_sqlite
+
+    fd, tmpname = tempfile.mkstemp(prefix='.' + os.path.basename(filename),
+                                   suffix='.tmp',
+                                   dir=os.path.dirname(os.path.abspath(
+                                       filename)))
+    os.close(fd)
+    try:
+        with dsch_sqlite.SQLiteDschictionary(tmpname) as db:
+            importer(db)
+        os.replace(tmpname, filename)
+    except BaseException:
+        os.remove(tmpname)
+        raise
+
+
+def open_compiled(filename: str):
+    """
+    It opens the compiled version of a dschictionary.
+
+    A database is opened directly, a dschictionary file is compiled into its
+    cache (filename + CACHE_EXTENSION) if the cache is missing or older.
+
+    Return:
+        A dsch_sqlite.SQLiteDschictionary instance
+    """
+    import dsch_sqlite
+
+    if is_database(filename):
+        if not os.path.exists(filename):
+            raise FileNotFoundError(2, "No such file or directory", filename)
+        return dsch_sqlite.SQLiteDschictionary(filename)
+    cache = filename + CACHE_EXTENSION
+    sources = source_files(filename)
+    if not all(is_up_to_date(s, (cache,)) for s in sources):
+        if len(sources) > 1:  # a journal or shards
+            write_database(cache, lambda db: db.import_dschictionary(
+                read_dschictionary(filename)))
+        else:
+            write_database(cache, lambda db: db.import_file(filename))
+    return dsch_sqlite.SQLiteDschictionary(cache)
+
+
+def read_dschictionary(filename: str, duplicates='report'):
+    """
+    It reads a dschictionary (input format, JSON Lines or database).
+
+    The edit journal of a file is applied (see dsch_journal.py).
+
+    Parameters:
+        filename -- The dschictionary (file or database)
+        duplicates -- The policy for the duplicate entries of a file (see
+                      dschictionary_class.DUPLICATE_POLICIES), it's not used
+                      with a journal
+
+    Raises:
+        RuntimeError if the dschictionary can't be read
+        dsch_journal.JournalError if the journal can't be applied
+    """
+    import dsch_file
+
+    if is_database(filename):
+        with open_compiled(filename) as db:
+            return db.to_dschictionary()
+    if dsch_file.has_journal(filename):
+        import dsch_journal
+
+        return dsch_journal.Journal(filename).load()
+    import dschictionary_class as dsch
+
+    d = dsch.Dschictionary.create_dschictionary(filename,
+                                                duplicates=duplicates)
+    if d.error:
+        raise RuntimeError(d.error)
+    return d
+
+
+def lookup(filename: str, words, search=False, out=sys.stdout) -> int:
+    """
+    It prints the entries of words in the input format.
+
+    Parameters:
+        filename -- The dschictionary (file or database)
+        words -- The words (or the words of the full-text search)
+        search -- If True, it's a full-text search
+        out -- The output stream
+
+    Return:
+        Number of words without entries
+    """
+    missing = 0
+    with open_compiled(filename) as db:
+        queries = [" ".join(words)] if search else words
+        for query in queries:
+            entries = db.search(query) if search else db.lookup(query)
+            if not entries:
+                missing += 1
+                print(query + ": not found", file=sys.stderr)
+            for e in entries:
+                out.write(e.get_entry_as_source() + "\n")
+    return missing
+
+
+def write_dschictionary(d, outfilename: str):
+    """
+    It writes a Dschictionary instance by the extension of the output file.
+
+    Formats: database (.db, .sqlite), JSON Lines (.jsonl) and the input
+    format (any other extension). The files can be compressed (e.g. .gz).
+    """
+    import dsch_file
+
+    if is_database(outfilename):
+        write_database(outfilename, lambda db: db.import_dschictionary(d))
+        return
+    if dsch_file.strip_compression(outfilename).endswith('.jsonl'):
+        import dsch_out
+
+        chunks = dsch_out.JsonlDschictionary(
+            outfilename, instrument=_quiet(),
+            dschict=d).generate_dschictionary(d.entries())
+    else:
+        import dschictionary_class as dsch
+
+        chunks = dsch.generate_source(d.entries(), d.entry_language,
+                                      d.definition_language)
+    with dsch_file.atomic_open(outfilename) as f:
+        f.writelines(chunks)
+
+
+def convert(filename: str, outfilename: str, duplicates='report') -> int:
+    """
+    It converts a dschictionary by the extension of the output file (see
+    write_dschictionary()).
+
+    Parameters:
+        filename -- The dschictionary (file or database)
+        outfilename -- The output file's name
+        duplicates -- The policy for the duplicate entries (see
+                      read_dschictionary())
+
+    Return:
+        Number of entries
+    """
+    d = read_dschictionary(filename, duplicates)
+    write_dschictionary(d, outfilename)
+    return d.num_of_entries()
+
+
+def render(filename: str, ex: str, outfilename=None, out=sys.stdout,
+           dschict=None, memory_budget=None, instrument=None,
+           duplicates='report'):
+    """
+    It writes an output of a dschictionary.
+
+    Parameters:
+        filename -- The dschictionary (file or database)
+        ex -- The output format (a key of dsch_out.OUTPUTS)
+        outfilename -- The output file's name (it can be compressed), if
+                       None, the output is written into out
+        out -- The output stream
+        dschict -- An already read Dschictionary instance (then the file is
+                   not read)
+        memory_budget -- If the loaded file would exceed it (in bytes), the
+                         entries are streamed (see dsch_out.BaseDschictionary)
+        instrument -- A dsch_instrument.Instrument instance to measure the
+                      phases (e.g. the memory)
+        duplicates -- The policy for the duplicate entries (see
+                      read_dschictionary()), with another policy than
+                      'report' the entries are always loaded
+    """
+    import contextlib
+    import dsch_file
+    import dsch_out
+
+    if ex not in dsch_out.OUTPUTS:
+        raise ValueError("Unknown format: " + ex)
+    ins = instrument or _quiet()
+    if dschict is None and not is_database(filename) and \
+            duplicates == 'report' and not dsch_file.has_journal(filename):
+        with contextlib.redirect_stdout(sys.stderr):  # the status messages
+            writer = dsch_out.OUTPUTS[ex](filename, instrument=ins,
+                                          memory_budget=memory_budget)
+        if writer.dschictionary().error:
+            raise RuntimeError(writer.dschictionary().error)
+    else:
+        if dschict is None:
+            with ins.phase('load'):
+                dschict = read_dschictionary(filename, duplicates)
+        writer = dsch_out.OUTPUTS[ex](filename, instrument=ins,
+                                      dschict=dschict)
+    chunks = writer.generate_output()
+    with ins.memory_phase('render'):
+        if outfilename is None:
+            out.writelines(chunks)
+            return
+        with dsch_file.atomic_open(outfilename) as f:
+            f.writelines(chunks)
+
+
+def reverse(filename: str, outfilename: str, ex=None) -> int:
+    """
+    It writes the reverse of a dschictionary (see dsch_reverse.py), the left
+    out source words are reported on the standard error.
+
+    Parameters:
+        filename -- The dschictionary (file or database)
+        outfilename -- The output file's name
+        ex -- An output format (see render()), if None, the output is a
+              dschictionary by the extension (see write_dschictionary())
+
+    Return:
+        Number of entries of the reverse dschictionary
+    """
+    import dsch_reverse
+
+    d = dsch_reverse.reverse_dschictionary(
+        read_dschictionary(filename),
+        lambda line: print("WARNING --", line, file=sys.stderr))
+    if ex:
+        render(outfilename, ex, outfilename, dschict=d)
+    else:
+        write_dschictionary(d, outfilename)
+    return d.num_of_entries()
+
+
+def pivot(filename: str, secondfilename: str, outfilename: str, ex=None,
+          provenance=True) -> int:
+    """
+    It writes a draft translated through a pivot language (see
+    dsch_pivot.py), the left out meanings are reported on the standard
+    error.
+
+    Parameters:
+        filename -- The A -> B dschictionary (file or database)
+        secondfilename -- The B -> C dschictionary (file or database)
+        outfilename -- The output file's name
+        ex -- An output format (see reverse())
+        provenance -- If True, the comments show the pivot glosses
+
+    Return:
+        Number of entries of the draft
+    """
+    import dsch_pivot
+
+    d = dsch_pivot.pivot_dschictionaries(
+        read_dschictionary(filename), read_dschictionary(secondfilename),
+        provenance, lambda line: print("WARNING --", line, file=sys.stderr))
+    if ex:
+        render(outfilename, ex, outfilename, dschict=d)
+    else:
+        write_dschictionary(d, outfilename)
+    return d.num_of_entries()
+
+
+def diff(old: str, new: str, format_='text', outfilename=None,
+         out=sys.stdout) -> bool:
+    """
+    It writes the differences of two versions of a dschictionary.
+
+    Parameters:
+        old -- The old dschictionary (file or database)
+        new -- The new dschictionary (file or database)
+        format_ -- text, json or summary (see dsch_diff.FORMATS)
+        outfilename -- The output file's name, if None, the report is
+                       written into out
+        out -- The output stream
+
+    Return:
+        True if there are any differences
+    """
+    import dsch_diff
+    import dsch_file
+
+    if format_ not in dsch_diff.FORMATS:
+        raise ValueError("Unknown format: " + format_)
+    result = dsch_diff.diff_dschictionaries(read_dschictionary(old),
+                                            read_dschictionary(new))
+    if outfilename is None:
+        out.writelines(result.generate_report(format_))
+    else:
+        with dsch_file.atomic_open(outfilename) as f:
+            f.writelines(result.generate_report(format_))
+    return bool(result)
+
+
+def stats(filename: str, out=sys.stdout) -> dict:
+    """
+    It prints the statistics of a dschictionary as JSON.
+
+    Return:
+        The statistics (see dsch_stats.Statistics.get_statistics_as_dict())
+    """
+    import json
+
+    result = read_dschictionary(filename).statistics().get_statistics_as_dict()
+    out.write(json.dumps(result, ensure_ascii=False, indent=1) + "\n")
+    return result
+
+
+def patch(filename: str, patchfilename: str, backup=True,
+          journal=False) -> int:
+    """
+    It applies a patch file to a dschictionary file (see dsch_patch.py).
+
+    Parameters:
+        filename -- The dschictionary file's name
+        patchfilename -- The patch file's name (JSON Lines)
+        backup -- If True, a backup is made before the file is rewritten
+        journal -- If True, the operations are appended to the journal of
+                   the file instead (see dsch_journal.py), if the file has
+                   a journal, they're appended and the journal is compacted
+
+    Return:
+        Number of the applied operations
+    """
+    import dsch_file
+    import dsch_patch
+
+    if dsch_file.is_manifest(filename):
+        import dsch_shard
+
+        if journal:
+            raise ValueError("The shards don't have journals.")
+        changes = dsch_patch.read_patch(patchfilename)
+        dsch_shard.ShardedDschictionary(filename).patch(changes, backup)
+        return len(changes)
+    if journal or dsch_file.has_journal(filename):
+        import dsch_journal
+
+        operations = dsch_patch.read_operations(patchfilename)
+        dsch_journal.Journal(filename).extend(operations)
+        if not journal:
+            compact(filename, backup)
+        return len(operations)
+    changes = dsch_patch.read_patch(patchfilename)
+    dsch_patch.patch_file(filename, changes, backup)
+    return len(changes)
+
+
+def compact(filename: str, backup=True) -> int:
+    """
+    It folds the journal of a dschictionary file into the file (see
+    dsch_journal.py).
+
+    Return:
+        Number of the folded operations
+    """
+    import dsch_file
+    import dsch_journal
+
+    if dsch_file.is_manifest(filename):
+        raise ValueError("The shards don't have journals.")
+    return dsch_journal.Journal(filename).compact(backup)
+
+
+def shard(filename: str, manifestname: str, starts=None) -> list:
+    """
+    It splits a dschictionary file into shards (see
+    dsch_shard.split_dschictionary()).
+
+    Return:
+        The file names of the shards
+    """
+    import dsch_shard
+
+    return dsch_shard.split_dschictionary(filename, manifestname, starts)
+
+
+def site(filename: str, directory: str, workers=None,
+         report=print) -> dict:
+    """
+    It exports a dschictionary as a static site (see
+    dsch_site.export_site()), only the changed pages are rewritten.
+
+    Parameters:
+        filename -- The dschictionary (file, manifest or database)
+        directory -- The site's directory
+        workers -- Number of threads of the writing and the compression
+        report -- Function of the report (it gets a line)
+
+    Return:
+        The written, unchanged and removed files (see export_site())
+    """
+    import dsch_site
+
+    result = dsch_site.export_site(read_dschictionary(filename), directory,
+                                   workers)
+    report("{0}: {1} written, {2} unchanged, {3} removed".format(
+        directory, len(result['written']), len(result['unchanged']),
+        len(result['removed'])))
+    return result
+
+
+def report_duplicates(filename: str, outfilename=None,
+                      out=sys.stdout) -> int:
+    """
+    It writes the report of the duplicate entries of a dschictionary file
+    (word: line numbers of its entries).
+
+    Parameters:
+        filename -- The dschictionary file's name
+        outfilename -- The report file's name, if None, the report is
+                       written into out
+        out -- The output stream
+
+    Return:
+        Number of the words with more entries
+    """
+    import dsch_file
+
+    duplicates = read_dschictionary(filename).duplicates()
+    report = "".join("{0}:{1}: {2}: lines {3}\n".format(
+                         filename, lines[1], word,
+                         ", ".join(str(n) for n in lines))
+                     for word, lines in duplicates.items())
+    if outfilename is None:
+        out.write(report)
+    else:
+        with dsch_file.atomic_open(outfilename) as f:
+            f.write(report)
+    return len(duplicates)
+
+
+def _quiet(memory=False):
+    """
+    It returns an Instrument without progress reports.
+
+    Parameters:
+        memory -- If True, the memory of the phases is measured too
+    """
+    import dsch_instrument
+
+    return dsch_instrument.Instrument(interval=None, memory=memory)
+
+
+def build_file(filename: str, formats, force=False,
+               memory_budget=None) -> tuple:
+    """
+    It reads a dschictionary file (only once) and writes its outputs.
+
+    Parameters:
+        filename -- The dschictionary file's name
+        formats -- The output formats (keys of dsch_out.OUTPUTS, optionally
+                   with a compression extension, e.g. 'html.gz')
+        force -- If False, the file is skipped if its outputs are newer
+        memory_budget -- If the loaded file would exceed it (in bytes), the
+                         entries are streamed (see dsch_out.BaseDschictionary)
+
+    Return:
+        (filename, list of written outputs, skipped or not)
+
+    Raises:
+        RuntimeError if the dschictionary can't be read or written
+    """
+    import contextlib
+    import io
+    import dsch_file
+    import dsch_out
+
+    outputs = [output_filename(filename, ex) for ex in formats]
+    if not force and all(is_up_to_date(s, outputs)
+                         for s in source_files(filename)):
+        return filename, outputs, True
+
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        instrument = _quiet()
+        # the journal is applied by read_dschictionary()
+        dschict = read_dschictionary(filename) if dsch_file.has_journal(
+            filename) else None
+        max_memory = None
+        for ex in formats:
+            writer = dsch_out.OUTPUTS[ex.split('.')[0]](
+                filename, max_memory, instrument, dschict, memory_budget)
+            dschict = writer.dschictionary()
+            max_memory = writer.max_memory()  # streamed by every writer
+            if dschict.error:
+                raise RuntimeError(dschict.error)
+            writer.write_dschictionary(ex)
+    if "ERROR --" in log.getvalue():
+        raise RuntimeError(log.getvalue().strip())
+    return filename, outputs, False
+
+
+def build(patterns, formats=DEFAULT_FORMATS, workers=None, force=False,
+          report=print, memory_budget=None) -> int:
+    """
+    It builds the outputs of many dschictionaries concurrently.
+
+    Every file is read and written in a separate process, a failure is
+    reported, but it doesn't stop the other files.
+
+    Parameters:
+        patterns -- File names or glob patterns
+        formats -- The output formats (see build_file())
+        workers -- Number of processes (default: number of CPUs), with 1
+                   the files are built in this process
+        force -- If False, the files with newer outputs are skipped
+        report -- Function of the reports (it gets a line)
+        memory_budget -- The memory budget of a file (in bytes, see
+                         build_file()), it's per process
+
+    Return:
+        Number of failed files
+
+    Raises:
+        ValueError if a format is unknown or two files have the same output
+    """
+    import concurrent.futures
+    import traceback
+    import dsch_out
+
+    for ex in formats:
+        if ex.split('.')[0] not in dsch_out.OUTPUTS:
+            raise ValueError("Unknown format: " + ex)
+    files = expand_inputs(patterns)
+    owners = {}  # they're checked before any file is written
+    for filename in files:
+        for ex in formats:
+            out = os.path.normpath(output_filename(filename, ex))
+            if owners.setdefault(out, filename) != filename:
+                raise ValueError("{0} and {1} have the same output: {2}"
+                                 .format(owners[out], filename, out))
+    failed = 0
+
+    def done(filename, result):
+        nonlocal failed
+        try:
+            _, outputs, skipped = result()
+        except Exception as exc:
+            failed += 1
+            message = str(exc) or traceback.format_exception_only(
+                type(exc), exc)[-1].strip()
+            report("FAIL {0}: {1}".format(filename, message))
+        else:
+            report("{0} {1} -> {2}".format("SKIP" if skipped else "OK  ",
+                                           filename, ", ".join(outputs)))
+
+    if workers == 1 or len(files) < 2:
+        for filename in files:
+            done(filename, lambda: build_file(filename, formats, force,
+                                              memory_budget))
+        return failed
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(build_file, filename, formats, force,
+                               memory_budget): filename
+                   for filename in files}
+        for future in concurrent.futures.as_completed(futures):
+            done(futures[future], future.result)
+    return failed
+
+
+def main(argv=None) -> int:
+    """Run a command from the command line."""
+    import argparse
+    import dsch_file
+
+    parser = argparse.ArgumentParser(
+        prog="dschictionary.py",
+        description="Dschictionary -- a simple dictionary program.")
+    parser.add_argument('--version', action='version', version=__version__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    lookup_parser = commands.add_parser(
+        'lookup', help="print the entries of words")
+    lookup_parser.add_argument('-d', '--dschictionary', required=True,
+                               help="dschictionary file or database")
+    lookup_parser.add_argument('-s', '--search', action='store_true',
+                               help="full-text search in the descriptions, "
+                                    "comments and definitions")
+    lookup_parser.add_argument('words', nargs='+')
+
+    convert_parser = commands.add_parser(
+        'convert', help="convert a dschictionary (input format, .jsonl, .db)")
+    convert_parser.add_argument('input')
+    convert_parser.add_argument('output')
+    convert_parser.add_argument('--duplicates', default='report',
+                                help="policy for the words with more "
+                                     "entries: report, merge, homograph or "
+                                     "fail")
+
+    render_parser = commands.add_parser(
+        'render', help="write an output of a dschictionary")
+    render_parser.add_argument('input',
+                               help="dschictionary file or database")
+    render_parser.add_argument('-f', '--format', default='txt',
+                               help="txt, html, jsonl or csv")
+    render_parser.add_argument('-o', '--output',
+                               help="output file (default: standard output)")
+    render_parser.add_argument('-m', '--memory-budget', type=parse_size,
+                               help="stream the entries if the loaded "
+                                    "dschictionary would exceed it "
+                                    "(e.g. 512M)")
+    render_parser.add_argument('--duplicates', default='report',
+                               help="policy for the words with more "
+                                    "entries: report, merge, homograph or "
+                                    "fail")
+    render_parser.add_argument('--memory-report', action='store_true',
+                               help="measure the memory of the phases (by "
+                                    "tracemalloc) and print it to the "
+                                    "standard error")
+
+    build_parser = commands.add_parser(
+        'build', help="write the outputs of many dschictionaries")
+    build_parser.add_argument('inputs', nargs='+',
+                              help="dschictionary files or glob patterns")
+    build_parser.add_argument('-f', '--formats', nargs='+',
+                              default=list(DEFAULT_FORMATS),
+                              help="output formats: txt, html, jsonl, csv "
+                                   "(e.g. html.gz for compressed output)")
+    build_parser.add_argument('-j', '--jobs', type=int, default=None,
+                              help="number of worker processes "
+                                   "(default: number of CPUs)")
+    build_parser.add_argument('--force', action='store_true',
+                              help="rebuild the up-to-date outputs too")
+    build_parser.add_argument('-m', '--memory-budget', type=parse_size,
+                              help="stream the entries of the files that "
+                                   "would exceed it when loaded (per "
+                                   "process, e.g. 512M)")
+
+    reverse_parser = commands.add_parser(
+        'reverse', help="generate the reverse of a dschictionary")
+    reverse_parser.add_argument('input')
+    reverse_parser.add_argument('output',
+                                help="dschictionary file (input format, "
+                                     ".jsonl, .db) or an output (see -f)")
+    reverse_parser.add_argument('-f', '--format',
+                                help="write an output: txt, html, jsonl or "
+                                     "csv")
+
+    pivot_parser = commands.add_parser(
+        'pivot', help="translate a dschictionary through a pivot language "
+                      "(A -> B and B -> C gives A -> C)")
+    pivot_parser.add_argument('input', help="the A -> B dschictionary")
+    pivot_parser.add_argument('second', help="the B -> C dschictionary")
+    pivot_parser.add_argument('output',
+                              help="dschictionary file (input format, "
+                                   ".jsonl, .db) or an output (see -f)")
+    pivot_parser.add_argument('-f', '--format',
+                              help="write an output: txt, html, jsonl or "
+                                   "csv")
+    pivot_parser.add_argument('--no-provenance', action='store_true',
+                              help="don't write the pivot glosses into "
+                                   "the comments")
+
+    diff_parser = commands.add_parser(
+        'diff', help="compare two versions of a dschictionary "
+                     "(exit status 1 if they differ)")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    diff_parser.add_argument('-f', '--format', default='text',
+                             help="text, json or summary")
+    diff_parser.add_argument('-o', '--output',
+                             help="output file (default: standard output)")
+
+    patch_parser = commands.add_parser(
+        'patch', help="apply a batch of changes to a dschictionary file")
+    patch_parser.add_argument('input', help="dschictionary file (input "
+                                            "format or .jsonl)")
+    patch_parser.add_argument('patch', help="JSON Lines file of the "
+                                            "operations")
+    patch_parser.add_argument('--no-backup', action='store_true',
+                              help="don't make a backup of the file")
+    patch_parser.add_argument('--journal', action='store_true',
+                              help="append the changes to the edit journal "
+                                   "of the file instead of rewriting it")
+
+    compact_parser = commands.add_parser(
+        'compact', help="fold the edit journal into a dschictionary file")
+    compact_parser.add_argument('input', help="dschictionary file (input "
+                                              "format or .jsonl)")
+    compact_parser.add_argument('--no-backup', action='store_true',
+                                help="don't make a backup of the file")
+
+    shard_parser = commands.add_parser(
+        'shard', help="split a dschictionary file into shards with a "
+                      "manifest")
+    shard_parser.add_argument('input', help="dschictionary file")
+    shard_parser.add_argument('manifest', help="manifest file ({0})".format(
+                                  dsch_file.MANIFEST_EXTENSION))
+    shard_parser.add_argument('-s', '--starts', nargs='+',
+                              help="first words of the shards (default: "
+                                   "a shard per initial letter)")
+
+    site_parser = commands.add_parser(
+        'site', help="export a dschictionary as a static site")
+    site_parser.add_argument('input',
+                             help="dschictionary file or database")
+    site_parser.add_argument('output', help="directory of the site")
+    site_parser.add_argument('-j', '--jobs', type=int,
+                             help="number of threads of the compression "
+                                  "(default: number of CPUs)")
+
+    duplicates_parser = commands.add_parser(
+        'duplicates', help="report the words with more entries "
+                           "(exit status 1 if there are any)")
+    duplicates_parser.add_argument('input')
+    duplicates_parser.add_argument('-o', '--output',
+                                   help="report file (default: standard "
+                                        "output)")
+
+    stats_parser = commands.add_parser(
+        'stats', help="print the statistics of a dschictionary")
+    stats_parser.add_argument('input',
+                              help="dschictionary file or database")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'lookup':
+            return 1 if lookup(args.dschictionary, args.words,
+                               args.search) else 0
+        if args.command == 'convert':
+            convert(args.input, args.output, args.duplicates)
+        elif args.command == 'render':
+            with _quiet(args.memory_report) as instrument:
+                render(args.input, args.format, args.output,
+                       memory_budget=args.memory_budget,
+                       instrument=instrument, duplicates=args.duplicates)
+            if args.memory_report:
+                print(instrument.get_summary_as_string(), file=sys.stderr)
+        elif args.command == 'reverse':
+            reverse(args.input, args.output, args.format)
+        elif args.command == 'pivot':
+            pivot(args.input, args.second, args.output, args.format,
+                  not args.no_provenance)
+        elif args.command == 'diff':
+            return 1 if diff(args.old, args.new, args.format,
+                             args.output) else 0
+        elif args.command == 'patch':
+            patch(args.input, args.patch, not args.no_backup, args.journal)
+        elif args.command == 'compact':
+            compact(args.input, not args.no_backup)
+        elif args.command == 'shard':
+            shard(args.input, args.manifest, args.starts)
+        elif args.command == 'site':
+            site(args.input, args.output, args.jobs)
+        elif args.command == 'duplicates':
+            return 1 if report_duplicates(args.input, args.output) else 0
+        elif args.command == 'stats':
+            stats(args.input)
+        elif args.command == 'build':
+            return 1 if build(args.inputs, args.formats, args.jobs,
+                              args.force,
+                              memory_budget=args.memory_budget) else 0
+    except ValueError as exc:
+        parser.error(str(exc))
+    except OSError as exc:
+        print("ERROR --", exc, file=sys.stderr)
+        return 1
+    except RuntimeError as exc:  # the error of the dschictionary
+        print(exc, file=sys.stderr)
+        return 1
+    except Exception as exc:  # LanguageError, PatchError, PivotError, ...
+        if not hasattr(exc, 'message'):
+            raise
+        print(exc.message, file=sys.stderr)
+        return 1
+    return 0
+
+
 if __name__ == '__main__':
-    print("hello")
-    # Till this file is empty, use "dschout.py" for tests.
+    sys.exit(main())
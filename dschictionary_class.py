@@ -5,7 +5,18 @@ __copyright__ = "Copyright (C) 2016, B. Zolt'n Gorza"
 
 
 import enum
+import gc
+import json
+import os
+import re
+import time
 import dsch_entry as entry
+import dsch_collation as collation
+import dsch_graph as graph
+import dsch_index
+import dsch_stats
+import dsch_instrument as instrument
+import dsch_file
 
 
 """The used language_separator within your dschictionary file (default: ->)."""
@@ -31,6 +42,34 @@ If you choose another character, it may cause an error that's not handled.
 DEFAULT_INDENT_CHAR = " "
 
 
+# the characters that are trimmed from both ends of the lines of the files
+_TRIMMED_CHARS = INDENT_CHARS.replace(DEFAULT_INDENT_CHAR, '')
+
+
+"""The extension of the JSON Lines dschictionary files."""
+JSONL_EXTENSION = ".jsonl"
+
+
+"""The string fields of a JSON Lines entry record (key -> Entry attribute)."""
+RECORD_FIELDS = {'wrd': '_word', 'pro': '_pronunciation',
+                 'dsc': '_description', 'ori': '_origin', 'com': '_comment',
+                 'see': '_see'}
+
+"""The fields of a JSON Lines meaning record (in Meaning()'s order)."""
+MEANING_FIELDS = ('pos', 'cls', 'cas', 'def', 'lvl')
+
+
+"""
+The possible policies for entries of the same word within a file (see
+Dschictionary.read_dschictionary()):
+    report -- keep every entry, only record the duplicates
+    merge -- merge the meanings and the fields into the first entry
+    homograph -- keep every entry as a numbered homograph (word 1, 2, ...)
+    fail -- stop reading at the first duplicate (with an error)
+"""
+DUPLICATE_POLICIES = ('report', 'merge', 'homograph', 'fail')
+
+
 class ReadStates(enum.IntEnum):
     """This enum is for file reading, defines the current state."""
 
@@ -66,13 +105,328 @@ class LanguageError(Exception):
         self.message = message if (message is not None) else self.message
 
 
+class RecordError(Exception):
+    """
+    Simple Error class for the invalid records of JSON Lines files.
+
+    It's raised when a record can't be an entry of the dschictionary (or it
+    couldn't be written back in the text format).
+    """
+
+    expression = ""
+    message = "Error -- Invalid record"
+
+    def __init__(self, expression, message=None):
+        """
+        Just initialize it.
+
+        :param expression: The expression that caused error
+        :param message: The message for the user
+        """
+        Exception.__init__(self)
+        self.expression = expression
+        self.message = message if (message is not None) else self.message
+
+
+class DuplicateError(Exception):
+    """
+    Simple Error class for duplicate entries.
+
+    It's raised when a word has more entries and the duplicate policy is
+    'fail' (see DUPLICATE_POLICIES).
+    """
+
+    expression = ""
+    message = "Error -- Duplicate entry"
+
+    def __init__(self, expression, message=None):
+        """
+        Just initialize it.
+
+        :param expression: The expression that caused error
+        :param message: The message for the user
+        """
+        Exception.__init__(self)
+        self.expression = expression
+        self.message = message if (message is not None) else self.message
+
+
+def parse_languages(line: str) -> tuple:
+    """
+    It parses the language definition line of a dschictionary file.
+
+    Parameters:
+        line -- The first line of the file
+
+    Return:
+        (entry language, definition language)
+
+    Raises:
+        LanguageError if the line is not a valid language definition.
+    """
+    if LANGUAGE_SEPARATOR in line:
+        tmp = line.split(LANGUAGE_SEPARATOR)
+        if len(tmp) == 2:  # if both of needed languages are defined
+            return tmp[0].strip(), tmp[1].strip()
+    raise LanguageError(line)
+
+
+def entry_sort_key(entry_: entry.Entry, collation_=None):
+    """
+    It returns the key that orders the entries of a dschictionary.
+
+    Parameters:
+        entry_ -- Entry instance
+        collation_ -- A dsch_collation.Collation instance or None (to sort by
+                      the code points)
+    """
+    return entry_.sort_key(collation_)
+
+
+def iter_entries(file, idx=1):
+    """
+    It reads the entries of an opened dschictionary file one by one.
+
+    The language definition line should be already read from the file, so
+    only the entry blocks are processed. Only one entry is held in memory at
+    a time.
+
+    Parameters:
+        file -- An opened (text mode) file or any iterable of lines (the
+                line numbers of the entries start at 2, after the language
+                definition)
+        idx -- The id of the first entry
+
+    Yield:
+        Entry instances in the order of the file
+    """
+    state = ReadStates.Dictionary
+    tmpe = None
+    for num, line in enumerate(file, 2):
+        # trim the unwanted characters (except the indent char)
+        line = line.strip(_TRIMMED_CHARS + '\n')
+        if line:  # if the line isn't empty (after the trim)
+            if state == ReadStates.Entry:  # if the entry is under reading
+                tmpe.add_entry_part(line, DEFAULT_INDENT_CHAR)
+            else:  # if it'll be a new entry
+                tmpe = entry.Entry(idx)  # add id and word
+                tmpe.add_word(line)
+                tmpe._line = num
+                idx += 1
+                state = ReadStates.Entry
+        else:  # if the line is empty (probably between two entries)
+            if tmpe:
+                yield tmpe
+            tmpe = None
+            state = ReadStates.EoE
+    if tmpe:
+        yield tmpe
+
+
+def generate_source(entries, entrylang: str, defilang: str):
+    """
+    It generates a dschictionary file (the input format) piece by piece.
+
+    Parameters:
+        entries -- Iterable of Entry instances
+        entrylang -- Language of entries
+        defilang -- Language of definitions
+
+    Yield:
+        The language definition line, then the entries (with the blank lines
+        between them)
+    """
+    yield "{0} {1} {2}\n".format(entrylang, LANGUAGE_SEPARATOR, defilang)
+    for e in entries:
+        yield "\n" + check_source(e).get_entry_as_source()
+
+
+_NAMES = re.compile(r"\w*:\w*\+\w*")  # (pos:class+case) of a meaning
+_DEFINITION = re.compile(entry.meaning.DEFINITION_PATTERN)
+_MEANING = re.compile(_NAMES.pattern + r"\)" +  # the joined meaning fields
+                      _DEFINITION.pattern)
+_MARKER_CHARS = (entry.Entry.PRONOUNCIATION_CHAR + entry.Entry.ORIGIN_CHAR +
+                 entry.Entry.COMMENT_CHAR + entry.Entry.SEE_CHAR)
+_MEANING_KEYS = frozenset(MEANING_FIELDS)
+_ENTRY_KEYS = frozenset(RECORD_FIELDS) | {'idx', 'mea'}
+
+
+def check_source(e: entry.Entry) -> entry.Entry:
+    """
+    It returns an entry if it's read back unchanged from the text format
+    (see Entry.get_entry_as_source() and iter_entries()).
+
+    E.g. a description can't look like a meaning or an origin, and the ends
+    of the lines are trimmed (see INDENT_CHARS). The entries of the text
+    files are always valid, but the ones of the JSON Lines files may not.
+
+    Raises:
+        RecordError if a field would be read back differently
+    """
+    word = e._word
+    fields = (('wrd', word), ('pro', e._pronunciation),
+              ('dsc', e._description), ('ori', e._origin),
+              ('com', e._comment), ('see', e._see))
+    for key, value in fields:
+        if not value:
+            continue
+        # the line of the word ends with the pronunciation (if any)
+        last = key != 'pro' and not (key == 'wrd' and e._pronunciation)
+        if "\n" in value or "\r" in value:
+            error = "should be a single line"
+        elif key in ('wrd', 'pro') and \
+                entry.Entry.PRONOUNCIATION_CHAR in value:
+            error = "can't contain '{0}'".format(
+                entry.Entry.PRONOUNCIATION_CHAR)
+        elif key in ('wrd', 'dsc') and value[0] in _TRIMMED_CHARS or \
+                last and value[-1] in _TRIMMED_CHARS:
+            error = "can't start or end with a tab, '_' or '-'"
+        elif key == 'dsc' and value[0] in _MARKER_CHARS:
+            error = "can't start with any of '{0}'".format(_MARKER_CHARS)
+        elif key == 'dsc' and entry.meaning.Meaning.is_meaning(
+                value, DEFAULT_INDENT_CHAR):
+            error = "can't start like a meaning"
+        else:
+            continue
+        raise RecordError(word, "Error -- '{0}' of '{1}' {2} in the text "
+                                "format".format(key, word, error))
+    for m in e._meanings:
+        definition = m._definition
+        if not _DEFINITION.fullmatch(definition):
+            raise RecordError(word, "Error -- A definition of '{0}' should "
+                                    "contain only letters, digits, spaces "
+                                    "and these: ' \" , .".format(word))
+        if definition and definition[-1] in _TRIMMED_CHARS:
+            raise RecordError(word, "Error -- A definition of '{0}' can't end "
+                                    "with '_' in the text format".format(word))
+    return e
+
+
+def meaning_from_record(record) -> entry.meaning.Meaning:
+    """
+    It creates a Meaning from a record (a dict, see get_meaning_as_dict()).
+
+    Raises:
+        RecordError if the record is not a valid meaning.
+    """
+    if type(record) is not dict or not record.keys() <= _MEANING_KEYS:
+        raise RecordError(record, "Error -- A meaning should be an object "
+                                  "with these keys: " +
+                          ", ".join(MEANING_FIELDS))
+    get = record.get
+    pos, cls, cas = get('pos', ""), get('cls', ""), get('cas', "")
+    definition, level = get('def', ""), get('lvl', 0)
+    try:  # the fields are checked at once (like a meaning line)
+        valid = _MEANING.fullmatch(pos + ":" + cls + "+" + cas + ")" +
+                                   definition)
+    except TypeError:  # not strings
+        valid = None
+    if not valid:
+        if not (type(pos) is str and type(cls) is str and
+                type(cas) is str and _NAMES.fullmatch(
+                    pos + ":" + cls + "+" + cas)):
+            raise RecordError(record, "Error -- 'pos', 'cls' and 'cas' "
+                                      "should contain only letters and "
+                                      "digits")
+        raise RecordError(record, "Error -- 'def' should contain only "
+                                  "letters, digits, spaces and these: "
+                                  "' \" , .")
+    if type(level) is not int or level < 0:
+        raise RecordError(record, "Error -- 'lvl' should be a non-negative "
+                                  "integer")
+    return entry.meaning.Meaning(pos, cls, cas, definition.strip(), level)
+
+
+def entry_from_record(record, idx: int) -> entry.Entry:
+    """
+    It creates an Entry from a record (a dict, see get_entry_as_dict()).
+
+    Only 'wrd' is required, the other keys (idx, pro, dsc, mea, ori, com,
+    see) are optional. Any string is a valid field (without its surrounding
+    spaces), only the definitions have to match DEFINITION_PATTERN of
+    dsch_meaning like in the text format. The entries that couldn't be
+    written in the text format are rejected by its writer (see
+    check_source()).
+
+    Parameters:
+        record -- The record (e.g. a decoded JSON object)
+        idx -- The id of the entry (if the record doesn't contain it)
+
+    Raises:
+        RecordError if the record is not a valid entry.
+    """
+    if type(record) is not dict:
+        raise RecordError(record, "Error -- An entry should be an object")
+    if not record.keys() <= _ENTRY_KEYS:
+        raise RecordError(record, "Error -- Unknown key: " + ", ".join(
+            sorted(record.keys() - _ENTRY_KEYS)))
+    tmpe = entry.Entry(record.get('idx', idx))
+    if type(tmpe._id) is not int:
+        raise RecordError(record, "Error -- 'idx' should be an integer")
+    for key, value in record.items():
+        attr = RECORD_FIELDS.get(key)
+        if attr is not None:
+            if type(value) is not str:
+                raise RecordError(record, "Error -- '{0}' should be a "
+                                          "string".format(key))
+            setattr(tmpe, attr, value.strip())
+        elif key == 'mea':
+            if type(value) is not list:
+                raise RecordError(record, "Error -- 'mea' should be an array")
+            tmpe._meanings = [meaning_from_record(m) for m in value]
+    if not tmpe._word:
+        raise RecordError(record, "Error -- 'wrd' should be a non-empty word")
+    return tmpe
+
+
+def iter_jsonl_entries(file, idx=1):
+    """
+    It reads the entries of an opened JSON Lines dschictionary one by one.
+
+    The header record (the first line) should be already read from the file.
+    The empty lines are skipped.
+
+    Parameters:
+        file -- An opened (text mode) file or any iterable of lines
+        idx -- The id of the first entry
+
+    Yield:
+        Entry instances in the order of the file
+
+    Raises:
+        RecordError if a line is not a valid entry record (its message
+        contains the line's number)
+    """
+    decode = json.JSONDecoder().decode
+    for num, line in enumerate(file, 2):
+        if line.isspace() or not line:
+            continue
+        try:
+            tmpe = entry_from_record(decode(line), idx)
+        except ValueError as exc:
+            raise RecordError(line, "Error -- Invalid JSON (line {0}): "
+                                    "{1}".format(num, exc))
+        except RecordError as recerror:
+            raise RecordError(line, "{0} (line {1})".format(
+                recerror.message, num))
+        tmpe._line = num
+        yield tmpe
+        idx += 1
+
+
 class Dschictionary:
     """This class is contains our whole dictionary."""
 
     _title = ""
     _entries = []
+    _index = {}  # word -> Entry
+    _see_graph = None  # see see_graph()
+    _pronunciation_index = None  # see pronunciation_index()
+    _statistics = None  # see statistics()
+    _duplicates = {}  # word -> line numbers of its entries (see duplicates())
     entry_language = ""
     definition_language = ""
+    collation = None  # see dsch_collation.py
     error = ""
 
     def __init__(self, title="", entrylang="", defilang=""):
@@ -100,6 +454,11 @@ class Dschictionary:
         self.definition_language = defilang
         self.error = ""
         self._entries = []
+        self._index = {}
+        self._see_graph = None
+        self._pronunciation_index = None
+        self._statistics = dsch_stats.Statistics()
+        self._duplicates = {}
 
     def title(self) -> str:
         """It returns the dschictionary's title."""
@@ -109,6 +468,61 @@ class Dschictionary:
         """It returns the entries as a list."""
         return self._entries or []
 
+    def index(self) -> dict:
+        """It returns the words with their entries (word -> Entry)."""
+        return self._index
+
+    def lookup(self, word: str):
+        """It returns the entry of a word (or None)."""
+        return self._index.get(word)
+
+    def see_graph(self) -> graph.SeeGraph:
+        """
+        It returns the resolved 'see also' references of the entries.
+
+        See:
+            dsch_graph.SeeGraph
+        """
+        if self._see_graph is None:
+            self._see_graph = graph.SeeGraph(self._entries, self._index)
+        return self._see_graph
+
+    def pronunciation_index(self) -> dsch_index.PronunciationIndex:
+        """
+        It returns the index of the pronunciations (rhyme, ending and
+        syllable search).
+
+        See:
+            dsch_index.PronunciationIndex
+        """
+        if self._pronunciation_index is None:
+            self._pronunciation_index = dsch_index.PronunciationIndex(
+                self._entries)
+        return self._pronunciation_index
+
+    def statistics(self) -> dsch_stats.Statistics:
+        """
+        It returns the statistics of the entries (they're updated when an
+        entry is added, so the entries should be complete by then).
+
+        See:
+            dsch_stats.Statistics
+        """
+        return self._statistics
+
+    def duplicates(self) -> dict:
+        """
+        It returns the words that have more entries in the read file.
+
+        Return:
+            {word: line numbers of its entries}
+        """
+        return self._duplicates
+
+    def get_broken_references(self) -> list:
+        """It returns the 'see also' references to missing words."""
+        return self.see_graph().broken()
+
     def get_entries_as_string(self) -> str:
         """It returns all entries as a single string."""
         return "\n \n".join([str(e) for e in self.entries()])
@@ -124,45 +538,110 @@ class Dschictionary:
     def __add__(self, entry_: entry.Entry):
         """It adds a single Entry instance."""
         self._entries.append(entry_)
+        self._index.setdefault(entry_.word(), entry_)
+        self._statistics.add_entry(entry_)
+        self._see_graph = None
+        self._pronunciation_index = None
         return self
 
+    def _add_read_entry(self, entry_: entry.Entry, policy: str):
+        """
+        It adds a read entry and handles the duplicates (through the word
+        index, so without an extra pass).
+
+        Parameters:
+            entry_ -- The read Entry instance
+            policy -- One of the DUPLICATE_POLICIES
+
+        Raises:
+            DuplicateError if the word has an entry and the policy is 'fail'
+        """
+        word = entry_.word()
+        first = self._index.get(word)
+        if first is None:
+            self += entry_
+            return
+        lines = self._duplicates.get(word)
+        if lines is None:
+            lines = self._duplicates[word] = [first.line()]
+        lines.append(entry_.line())
+        if policy == 'fail':
+            raise DuplicateError(word, "Error -- Duplicate entry: {0} (lines "
+                                       "{1})".format(word, ", ".join(
+                                           str(n) for n in lines)))
+        if policy == 'merge':
+            import dsch_merge  # only the merge policy needs it
+
+            self._statistics.remove_entry(first)
+            dsch_merge.union_entries([first, entry_])
+            self._statistics.add_entry(first)
+            self._see_graph = None
+            self._pronunciation_index = None
+            return
+        if policy == 'homograph':
+            first._homograph = 1
+            entry_._homograph = len(lines)
+        self += entry_
+
     def _sort_entries(self):
         """It sorts the entries by word."""
-        self._entries.sort(key=lambda e: e.word())
+        collation_ = self.collation
+        self._entries.sort(key=lambda e: e.sort_key(collation_))
 
-    def read_dschictionary(self, filename: str):
+    def read_dschictionary(self, filename: str, load_entries=True,
+                           instrument_=None, duplicates='report'):
         """
         It reads a dschictionary from a file and process its content.
 
+        The file can be compressed (gzip, bz2 or xz, see dsch_file.py).
+
         Parameters:
             filename -- The dschictionary file's name
+            load_entries -- If False, only the language definition is read
+                            (e.g. for the external sort of dsch_sort.py)
+            instrument_ -- A dsch_instrument.Instrument instance to measure
+                           the phases (open, languages, entries, sort,
+                           references, pronunciations) and to report the
+                           progress
+            duplicates -- The policy for the words with more entries (see
+                          DUPLICATE_POLICIES and duplicates())
+
+        A JSON Lines file (see read_jsonl()) or a manifest of shards (see
+        read_manifest()) can be given too.
         """
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError("Unknown duplicate policy: " + str(duplicates))
+        if dsch_file.strip_compression(filename).endswith(JSONL_EXTENSION):
+            return self.read_jsonl(filename, load_entries, instrument_,
+                                   duplicates)
+        if dsch_file.is_manifest(filename):
+            return self.read_manifest(filename, load_entries, instrument_,
+                                      duplicates)
         idx = 1  # don't start to count from 0! That would not work (don't ask)
+        ins = instrument_ or instrument.Instrument(interval=None)
 
         # Starting the process
         state = ReadStates.Title
-        self._title = ".".join(filename.split(".")[:len(self._title)-1])
+        self._title = ".".join(dsch_file.strip_compression(filename).split(
+                                                ".")[:len(self._title)-1])
 
         # Trying to open the file
         try:
-            file = open(filename, 'r')
+            with ins.phase('open'):
+                file = dsch_file.open_file(filename)
         except FileNotFoundError as fnfe:
             self.error = "{0} -- {1}".format(fnfe.filename, fnfe.strerror)
             return self
 
         # Reading the languages
         state = ReadStates.Languages
+        start = time.perf_counter()
         line = file.readline()
         try:
-            if LANGUAGE_SEPARATOR in line:
-                tmp = line.split(LANGUAGE_SEPARATOR)
-                if len(tmp) == 2:  # if both of needed languages are defined
-                    self.entry_language = tmp[0].strip()
-                    self.definition_language = tmp[1].strip()
-                else:
-                    raise LanguageError(line)
-            else:
-                raise LanguageError(line)
+            self.entry_language, self.definition_language = \
+                parse_languages(line)
+            if self.collation is None:
+                self.collation = collation.get_collation(self.entry_language)
         except LanguageError as langerror:
             self.error = "{0}\nYour file contains this: {1}".format(
                 langerror.message,
@@ -176,28 +655,24 @@ class Dschictionary:
                 "where it should to be.\n"
                 "Here is the Python's own thing about it: "
             ) + exc.args
+        ins.add_time('languages', time.perf_counter() - start)
+
+        if not load_entries:
+            file.close()
+            return self
 
         # Reading the dschictionary
         state = ReadStates.Dictionary
-        tmpe = file.readline()  # not needed, but better than 2 lines of this
-        for line in file:
-            # trim the unwanted characters (except the indent char)
-            line = line.strip(INDENT_CHARS.replace(DEFAULT_INDENT_CHAR,
-                                                   '') + '\n')
-            if line:  # if the line isn't empty (after the trim)
-                if state == ReadStates.Entry:  # if the entry is under reading
-                    tmpe.add_entry_part(line, DEFAULT_INDENT_CHAR)
-                else:  # if it'll be a new entry
-                    tmpe = entry.Entry(idx)  # add id and word
-                    tmpe.add_word(line)
-                    idx += 1
-                    state = ReadStates.Entry
-            else:  # if the line is empty (probably between two entries)
-                self += tmpe
-                tmpe = None
-                state = ReadStates.EoE
-        if tmpe:
-            self += tmpe
+        try:
+            with ins.phase('entries'):
+                for tmpe in iter_entries(file, idx):
+                    self._add_read_entry(tmpe, duplicates)
+                    state = ReadStates.EoE
+                    ins.progress("Entry #" + str(tmpe.id()), 'read')
+        except DuplicateError as duperror:
+            self.error = duperror.message
+        ins.count('entries', self.num_of_entries())
+        ins.count('meanings', self._statistics.num_of_meanings())
 
         # Closing the file and handle the possible errors
         file.close()
@@ -207,22 +682,190 @@ class Dschictionary:
                 "the language definitions."
             )
 
-        self._sort_entries()  # Sorting entries alphabetically
+        with ins.phase('sort'):
+            self._sort_entries()  # Sorting entries alphabetically
+        with ins.phase('references'):
+            self.see_graph()  # Resolving the references
+        with ins.phase('pronunciations'):
+            self.pronunciation_index()
+
+        return self
+
+    def read_jsonl(self, filename: str, load_entries=True, instrument_=None,
+                   duplicates='report'):
+        """
+        It reads a dschictionary from a JSON Lines file (bulk import).
+
+        The first line is a header record (title, entry_language,
+        definition_language), every other line is an entry record with the
+        keys of Entry.get_entry_as_dict(flat=True) (see entry_from_record()).
+        The entries are created directly, without parsing the text format.
+        The file can be compressed (gzip, bz2 or xz, see dsch_file.py).
+
+        Parameters:
+            filename -- The JSON Lines file's name
+            load_entries -- If False, only the header is read
+            instrument_ -- A dsch_instrument.Instrument instance to measure
+                           the phases (open, languages, entries, sort,
+                           references, pronunciations) and to report the
+                           progress
+            duplicates -- The policy for the words with more entries (see
+                          DUPLICATE_POLICIES and duplicates())
+        """
+        ins = instrument_ or instrument.Instrument(interval=None)
+        self._title = os.path.basename(dsch_file.strip_compression(
+            filename))[:-len(JSONL_EXTENSION)]
+
+        try:
+            with ins.phase('open'):
+                file = dsch_file.open_file(filename)
+        except FileNotFoundError as fnfe:
+            self.error = "{0} -- {1}".format(fnfe.filename, fnfe.strerror)
+            return self
+
+        # the entries don't have reference cycles, so the cyclic garbage
+        # collector would only slow down the creation of the objects
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with file:
+                with ins.phase('languages'):
+                    try:
+                        header = json.loads(file.readline() or "{}")
+                        if not isinstance(header, dict):
+                            raise ValueError("the header should be an object")
+                        self._title = header.get('title') or self._title
+                        self.entry_language = header.get('entry_language', "")
+                        self.definition_language = header.get(
+                            'definition_language', "")
+                    except ValueError as exc:
+                        self.error = "Error -- Invalid header: {0}".format(
+                            exc)
+                        return self
+                    if self.collation is None:
+                        self.collation = collation.get_collation(
+                            self.entry_language)
+
+                if not load_entries:
+                    return self
+
+                try:
+                    with ins.phase('entries'):
+                        for tmpe in iter_jsonl_entries(file):
+                            self._add_read_entry(tmpe, duplicates)
+                            ins.progress("Entry #" + str(tmpe.id()), 'read')
+                except RecordError as recerror:
+                    self.error = "{0}\nYour file contains this: {1}".format(
+                        recerror.message, recerror.expression)
+                except DuplicateError as duperror:
+                    self.error = duperror.message
+                ins.count('entries', self.num_of_entries())
+                ins.count('meanings', self._statistics.num_of_meanings())
+
+            if not self._entries and not self.error:
+                self.error = (
+                    "The dschictionary doesn't contain any data except "
+                    "the language definitions."
+                )
+
+            with ins.phase('sort'):
+                self._sort_entries()  # Sorting entries alphabetically
+            with ins.phase('references'):
+                self.see_graph()  # Resolving the references
+            with ins.phase('pronunciations'):
+                self.pronunciation_index()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        return self
+
+    def read_manifest(self, filename: str, load_entries=True,
+                      instrument_=None, duplicates='report', workers=None):
+        """
+        It reads a sharded dschictionary (a manifest and its shard files, see
+        dsch_shard.py).
+
+        The shards are read in parallel processes, and their entries are
+        added shard by shard (so they're already sorted).
+
+        Parameters:
+            filename -- The manifest's file name
+            load_entries -- If False, only the manifest is read
+            instrument_ -- A dsch_instrument.Instrument instance to measure
+                           the phases (open, entries, sort, references,
+                           pronunciations) and to report the progress
+            duplicates -- The policy for the words with more entries (see
+                          DUPLICATE_POLICIES and duplicates())
+            workers -- Number of processes (default: number of CPUs), with
+                       1 the shards are read in this process
+        """
+        import dsch_shard  # only the sharded dschictionaries need it
+
+        ins = instrument_ or instrument.Instrument(interval=None)
+        try:
+            with ins.phase('open'):
+                shards = dsch_shard.ShardedDschictionary(filename)
+        except FileNotFoundError as fnfe:
+            self.error = "{0} -- {1}".format(fnfe.filename, fnfe.strerror)
+            return self
+        except dsch_shard.ShardError as sherror:
+            self.error = sherror.message
+            return self
+        self._title = shards.title()
+        self.entry_language = shards.entry_language
+        self.definition_language = shards.definition_language
+        if self.collation is None:
+            self.collation = shards.collation
+
+        if not load_entries:
+            return self
+
+        try:
+            with ins.phase('entries'):
+                for tmpe in shards.iter_read_entries(workers):
+                    self._add_read_entry(tmpe, duplicates)
+                    ins.progress("Entry #" + str(tmpe.id()), 'read')
+        except dsch_shard.ShardError as sherror:
+            self.error = sherror.message
+        except DuplicateError as duperror:
+            self.error = duperror.message
+        ins.count('entries', self.num_of_entries())
+        ins.count('meanings', self._statistics.num_of_meanings())
+
+        if not self._entries and not self.error:
+            self.error = (
+                "The dschictionary doesn't contain any data except "
+                "the language definitions."
+            )
+
+        with ins.phase('sort'):
+            self._sort_entries()  # the shards are sorted, so it's fast
+        with ins.phase('references'):
+            self.see_graph()  # Resolving the references
+        with ins.phase('pronunciations'):
+            self.pronunciation_index()
 
         return self
 
     @staticmethod
-    def create_dschictionary(filename: str):
+    def create_dschictionary(filename: str, instrument_=None,
+                             duplicates='report'):
         """
         It is create and return a dschictionary and needs only a file name.
 
         Parameter:
             filename -- The dschictionary file's name
+            instrument_ -- A dsch_instrument.Instrument instance (optional)
+            duplicates -- The policy for the duplicate entries (see
+                          DUPLICATE_POLICIES)
 
         Return:
             A full, processed dschictionary
         """
-        return Dschictionary().read_dschictionary(filename)
+        return Dschictionary().read_dschictionary(filename,
+                                                  instrument_=instrument_,
+                                                  duplicates=duplicates)
 
     def __str__(self) -> str:
         """
@@ -249,3 +892,4 @@ if __name__ == '__main__':
     print(len(dsch.entries()))
     print(dsch.get_entries_as_string())
     print(dsch.get_errors())
+    print(dsch.get_broken_references())
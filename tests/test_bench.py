@@ -0,0 +1,41 @@
+"""Tests of the generator of the benchmarks (dsch_bench.py)."""
+
+
+import os
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_bench
+
+
+class GenerateTest(unittest.TestCase):
+    """The generated dschictionaries must be deterministic and valid."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def generate(self, name, size, seed=dsch_bench.DEFAULT_SEED):
+        filename = os.path.join(self.directory.name, name)
+        dsch_bench.generate_dschictionary(filename, size, seed)
+        return filename
+
+    def test_unique_words(self):
+        for size in (45, 46, 3000):
+            d = dsch.Dschictionary.create_dschictionary(
+                self.generate("gen.txt", size))
+            self.assertFalse(d.error)
+            words = [e.word() for e in d.entries()]
+            self.assertEqual(len(words), size)
+            self.assertEqual(len(set(words)), size)
+
+    def test_deterministic(self):
+        files = [self.generate(name, 500, 7) for name in ("a.txt", "b.txt")]
+        with open(files[0], 'rb') as a, open(files[1], 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
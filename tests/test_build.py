@@ -0,0 +1,65 @@
+"""Tests of the build command (dschictionary.build())."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import dschictionary
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class BuildTest(unittest.TestCase):
+    """The outputs are written next to their inputs."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        self.reports = []
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def build(self, patterns, workers=1):
+        return dschictionary.build(patterns, ('txt', 'html'), workers,
+                                   report=self.reports.append)
+
+    def test_relative_path(self):
+        os.mkdir("dir.v2")
+        shutil.copyfile(EXAMPLE, "example.txt")
+        shutil.copyfile(EXAMPLE, os.path.join("dir.v2", "example.txt"))
+        self.assertEqual(self.build(["./example.txt",
+                                     "../{0}/dir.v2/example.txt".format(
+                                         os.path.basename(os.getcwd()))],
+                                    workers=2), 0)
+        self.assertEqual(sorted(os.listdir()),
+                         ["dir.v2", "example.dict.html", "example.dict.txt",
+                          "example.txt"])
+        self.assertEqual(sorted(os.listdir("dir.v2")),
+                         ["example.dict.html", "example.dict.txt",
+                          "example.txt"])
+        self.assertEqual(len(self.reports), 2)
+
+    def test_same_outputs(self):
+        shutil.copyfile(EXAMPLE, "example.txt")
+        shutil.copyfile(EXAMPLE, "example.txt.gz")
+        with self.assertRaises(ValueError):
+            self.build(["example.txt", "example.txt.gz"])
+        self.assertEqual(sorted(os.listdir()),
+                         ["example.txt", "example.txt.gz"])
+        self.assertEqual(self.reports, [])
+
+    def test_skip(self):
+        shutil.copyfile(EXAMPLE, "example.txt")
+        self.assertEqual(self.build(["*.txt"]), 0)
+        self.assertEqual(self.build(["*.txt"]), 0)
+        self.assertEqual([r.split()[0] for r in self.reports],
+                         ["OK", "SKIP"])
+
+
+if __name__ == '__main__':
+    unittest.main()
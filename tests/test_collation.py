@@ -0,0 +1,52 @@
+"""Tests of the collations (dsch_collation.py)."""
+
+
+import unittest
+import dsch_collation
+
+
+ESPERANTO = ("a b c ĉ d e f g ĝ h ĥ i j ĵ k l m n o p r s ŝ t u ŭ v z")
+
+
+class CollationTest(unittest.TestCase):
+    """The words must be sorted by the alphabet and the levels."""
+
+    def sort(self, words, alphabet=ESPERANTO,
+             level=dsch_collation.TERTIARY):
+        collation = dsch_collation.Collation(alphabet, level)
+        return sorted(words, key=collation.sort_key)
+
+    def test_alphabet(self):
+        self.assertEqual(self.sort(["da", "ĉa", "ca", "cz", "ĉe"]),
+                         ["ca", "cz", "ĉa", "ĉe", "da"])
+        self.assertEqual(self.sort(["ĉa", "ĉb"]), ["ĉa", "ĉb"])
+
+    def test_digraphs(self):
+        self.assertEqual(self.sort(["cha", "cz", "da", "ca"], "a c ch d z"),
+                         ["ca", "cz", "cha", "da"])
+
+    def test_levels(self):
+        words = ["Ab", "ab", "áb", "ac"]
+        self.assertEqual(self.sort(words, "a b c", dsch_collation.TERTIARY),
+                         ["ab", "Ab", "áb", "ac"])
+        collation = dsch_collation.Collation("a b c", dsch_collation.PRIMARY)
+        self.assertEqual(len({collation.sort_key(w) for w in words[:3]}), 1)
+
+    def test_other_characters(self):
+        # ASCII before the letters, the others after them in code point
+        # order (across the surrogates too)
+        words = ["a\U0010fff0", "a\ue000", "a\ud7ff", "a\ud700",
+                 "a\u025b", "a\u014b", "a1", "ab"]
+        self.assertEqual(self.sort(words, "b a"),
+                         ["a1", "ab", "a\u014b", "a\u025b", "a\ud700",
+                          "a\ud7ff", "a\ue000", "a\U0010fff0"])
+
+    def test_encodable_keys(self):
+        collation = dsch_collation.Collation(ESPERANTO)
+        for code in range(0x80, 0x10000, 7):
+            if not 0xD800 <= code < 0xE000:
+                collation.sort_key("a" + chr(code)).encode('utf-8')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests of the structural diff (dsch_diff.py)."""
+
+
+import io
+import json
+import unittest
+import dschictionary_class as dsch
+import dsch_diff
+
+
+def entries(text: str) -> list:
+    """It reads the entries of a text (the input format)."""
+    file = io.StringIO(text)
+    dsch.parse_languages(file.readline())
+    return list(dsch.iter_entries(file))
+
+
+OLD = """toki pona -> English
+
+toki /ˈto.ki/
+ (n) language
+ (v) to talk
+> pona
+
+pona
+ (adj) good
+
+seli
+ (n) fire
+"""
+
+NEW = """toki pona -> English
+
+pona
+ (adj) good
+
+telo
+ (n) water
+
+toki /ˈto.ki/
+a description
+ (n) language
+ (v) to say
+ (n) speech
+> pona, sona
+"""
+
+
+class DiffTest(unittest.TestCase):
+    """The changes must be matched by word, per field and per meaning."""
+
+    def setUp(self):
+        self.diff = dsch_diff.DschictionaryDiff(entries(OLD), entries(NEW))
+
+    def test_entries(self):
+        self.assertTrue(self.diff)
+        self.assertEqual([e.word() for e in self.diff.added()], ["telo"])
+        self.assertEqual([e.word() for e in self.diff.removed()], ["seli"])
+        self.assertEqual([c.word() for c in self.diff.changed()], ["toki"])
+        self.assertEqual(self.diff.num_of_unchanged(), 1)
+        self.assertFalse(dsch_diff.DschictionaryDiff(entries(OLD),
+                                                     entries(OLD)))
+
+    def test_fields_and_meanings(self):
+        change = self.diff.changed()[0]
+        self.assertEqual(change.fields, {'dsc': ("", "a description"),
+                                         'see': ("pona", "pona, sona")})
+        self.assertEqual([(op, m and m.definition(), n and n.definition())
+                          for op, m, n in change.meanings],
+                         [('changed', "to talk", "to say"),
+                          ('added', None, "speech")])
+        self.assertEqual(change.changed_parts(),
+                         ["description", "see also", "meanings"])
+
+    def test_reports(self):
+        self.assertEqual(self.diff.get_diff_as_string().splitlines()[:3],
+                         ["+ telo", "- seli", "~ toki"])
+        report = json.loads("".join(self.diff.generate_report('json')))
+        self.assertEqual(report['unchanged'], 1)
+        self.assertEqual(report['changed'][0]['fields']['see'],
+                         {'old': "pona", 'new': "pona, sona"})
+        self.assertEqual(self.diff.get_summary_as_string(),
+                         "- Added (1): telo\n"
+                         "- Removed (1): seli\n"
+                         "- Changed (1): toki (description, see also, "
+                         "meanings)\n")
+        with self.assertRaises(ValueError):
+            self.diff.generate_report('html')
+
+    def test_homographs(self):
+        # the entries of a word are paired in their order
+        old = entries(OLD + "\ntoki\n (n) 2\n")
+        diff = dsch_diff.DschictionaryDiff(old, entries(NEW))
+        self.assertEqual([(e.word(), m.definition())
+                          for e in diff.removed() for m in e._meanings],
+                         [("toki", "2"), ("seli", "fire")])
+
+
+if __name__ == '__main__':
+    unittest.main()
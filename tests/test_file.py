@@ -0,0 +1,94 @@
+"""Tests of the compressed files (dsch_file.py)."""
+
+
+import os
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_file
+import dsch_out
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class CompressionTest(unittest.TestCase):
+    """The compressed files must be read and written transparently."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(EXAMPLE, encoding='utf-8') as f:
+            self.text = f.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write(self, name, compression='auto'):
+        filename = self.path(name)
+        with dsch_file.atomic_open(filename, compression=compression) as f:
+            f.write(self.text)
+        return filename
+
+    def sources(self, filename):
+        d = dsch.Dschictionary.create_dschictionary(filename)
+        self.assertFalse(d.error)
+        return [e.get_entry_as_source() for e in d.entries()]
+
+    def test_names(self):
+        self.assertEqual(dsch_file.strip_compression("a.txt.xz"), "a.txt")
+        self.assertEqual(dsch_file.strip_compression("a.txt"), "a.txt")
+        self.assertEqual(dsch_file.compression_extension("a.bz2"), ".bz2")
+        self.assertEqual(dsch_file.root_filename("d.1/a.txt.gz"), "d.1/a")
+
+    def test_round_trip(self):
+        for name, (ext, magic, _) in dsch_file.COMPRESSIONS.items():
+            filename = self.write("example.txt" + ext)
+            with open(filename, 'rb') as f:
+                self.assertTrue(f.read().startswith(magic), name)
+            self.assertEqual(dsch_file.detect_compression(filename), name)
+            with dsch_file.open_file(filename) as f:
+                self.assertEqual(f.read(), self.text, name)
+            self.assertEqual(self.sources(filename), self.sources(EXAMPLE))
+
+    def test_detected_by_content(self):
+        filename = self.write("example.txt", compression='bz2')
+        self.assertEqual(dsch_file.detect_compression(filename), 'bz2')
+        self.assertEqual(self.sources(filename), self.sources(EXAMPLE))
+        self.assertEqual(dsch_file.detect_compression(self.path("new.xz")),
+                         'xz')  # a missing file by its extension
+
+    def test_reproducible_gzip(self):
+        with open(self.write("a.txt.gz"), 'rb') as f:
+            first = f.read()
+        with open(self.write("b.txt.gz"), 'rb') as f:
+            self.assertEqual(f.read(), first)
+
+    def test_output(self):
+        filename = self.path("example.txt.xz")
+        self.write("example.txt.xz")
+        writer = dsch_out.HTMLDschictionary(filename)
+        writer.write_dschictionary('html.gz')
+        with dsch_file.open_file(self.path("example.dict.html.gz")) as f:
+            html = f.read()
+        self.assertIn("toki", html)
+        self.assertEqual(dsch_file.detect_compression(
+            self.path("example.dict.html.gz")), 'gzip')
+
+    def test_reorder(self):
+        filename = self.write("example.txt.gz")
+        with open(filename, 'rb') as f:
+            original = f.read()
+        dsch_out.BaseDschictionary(filename).write_dschictionary()
+        self.assertEqual(dsch_file.detect_compression(filename), 'gzip')
+        self.assertEqual(self.sources(filename), self.sources(EXAMPLE))
+        with open(self.path("example.backup.txt.gz"), 'rb') as f:
+            self.assertEqual(f.read(), original)  # the raw bytes
+        with dsch_file.open_file(filename, 'rb') as f:  # decompressed
+            self.assertTrue(f.read().startswith(b"toki pona"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests of the 'see also' graph (dsch_graph.py)."""
+
+
+import io
+import unittest
+import dschictionary_class as dsch
+
+
+SOURCE = """toki pona -> English
+
+toki
+ (n) language
+> pona, sona
+
+pona
+ (adj) good
+> toki
+
+sona
+ (n) knowledge
+> kama, ala
+
+kama
+ (v) to come
+
+telo
+ (n) water
+> moku
+
+moku
+ (v) to eat
+
+ala
+ (adj) no
+"""
+
+
+class SeeGraphTest(unittest.TestCase):
+    """The references must be resolved in both directions."""
+
+    def setUp(self):
+        file = io.StringIO(SOURCE)
+        self.dschict = dsch.Dschictionary(
+            "test", *dsch.parse_languages(file.readline()))
+        for e in dsch.iter_entries(file):
+            self.dschict += e
+        self.graph = self.dschict.see_graph()
+
+    def test_links(self):
+        self.assertEqual(self.graph.links("toki"), ["pona", "sona"])
+        self.assertEqual(self.graph.backlinks("toki"), ["pona"])
+        self.assertEqual(self.graph.links("kama"), [])
+        self.assertEqual(self.graph.links("nothing"), [])
+
+    def test_broken(self):
+        self.dschict += dsch.entry.Entry(100, "lon", see="ala, sin")
+        self.assertEqual(self.dschict.see_graph().broken(), [("lon", "sin")])
+
+    def test_related(self):
+        self.assertEqual(self.graph.related("toki"), {"pona": 1, "sona": 1})
+        self.assertEqual(self.graph.related("toki", depth=2),
+                         {"pona": 1, "sona": 1, "kama": 2, "ala": 2})
+        self.assertEqual(self.graph.related("kama", depth=2),
+                         {"sona": 1, "toki": 2, "ala": 2})
+        self.assertEqual(self.graph.related("kama", backlinks=False), {})
+
+    def test_components(self):
+        self.assertEqual(sorted(self.graph.component("kama")),
+                         ["ala", "kama", "pona", "sona", "toki"])
+        self.assertEqual(sorted(sorted(c) for c in self.graph.components()),
+                         [["ala", "kama", "pona", "sona", "toki"],
+                          ["moku", "telo"]])
+        self.assertEqual(self.graph.component("nothing"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Tests of the pronunciation index (dsch_index.py)."""
+
+
+import unittest
+import dsch_entry
+import dsch_index
+
+
+PRONUNCIATIONS = {
+    "pona": "'po-na",
+    "lona": "lo-na",
+    "sona": "ˈso-na",
+    "mama": "ma-ma",
+    "kalama": "ka-'la-ma",
+    "ana": "a-na",
+    "kana": "ka - na",
+    "sipona": "si-'po-na",
+    "toki": "",
+}
+
+
+class PronunciationIndexTest(unittest.TestCase):
+    """The words must be found by their endings, rhymes and syllables."""
+
+    def setUp(self):
+        entries = [dsch_entry.Entry(num, word, pro) for num, (word, pro)
+                   in enumerate(PRONUNCIATIONS.items(), 1)]
+        entries.append(dsch_entry.Entry(100, "pona", "pa"))  # a homograph
+        self.index = dsch_index.PronunciationIndex(entries)
+
+    def test_syllables(self):
+        self.assertEqual(dsch_index.syllables("ka-'la-ma"),
+                         ["ka", "la", "ma"])
+        self.assertEqual(dsch_index.normalize("ka - na"), "ka-na")
+        self.assertEqual(self.index.syllables("pona"), ["po", "na"])
+        self.assertEqual(self.index.syllables("toki"), [])
+        self.assertEqual(self.index.syllable_count("kalama"), 3)
+        self.assertEqual(self.index.syllable_count("nothing"), 0)
+        self.assertEqual(len(self.index), 8)
+
+    def test_ending(self):
+        self.assertEqual(sorted(self.index.ending("na")),
+                         ["ana", "kana", "lona", "pona", "sipona", "sona"])
+        self.assertEqual(sorted(self.index.ending("o-na")),
+                         ["lona", "pona", "sipona", "sona"])
+        self.assertEqual(sorted(self.index.ending("ma")), ["kalama", "mama"])
+        self.assertEqual(self.index.ending("xyz"), [])
+
+    def test_rhymes(self):
+        self.assertEqual(sorted(self.index.rhymes("pona")),
+                         ["ana", "kana", "lona", "sipona", "sona"])
+        self.assertEqual(self.index.rhymes("pona", 2), ["sipona"])
+        # 'ka-na' ends with 'ana', but not with the syllables 'a-na'
+        self.assertEqual(self.index.rhymes("ana", 2), [])
+        self.assertEqual(self.index.rhymes("toki"), [])
+
+    def test_syllable_search(self):
+        self.assertEqual(sorted(self.index.with_syllables(2)),
+                         ["ana", "kana", "lona", "mama", "pona", "sona"])
+        self.assertEqual(sorted(self.index.with_syllables(3)),
+                         ["kalama", "sipona"])
+        self.assertEqual(sorted(self.index.matching("?o-na")),
+                         ["lona", "pona", "sona"])
+        self.assertEqual(sorted(self.index.matching("*-ma")),
+                         ["kalama", "mama"])
+        self.assertEqual(sorted(self.index.matching("[kp]a-*")),
+                         ["kalama", "kana"])
+
+
+if __name__ == '__main__':
+    unittest.main()
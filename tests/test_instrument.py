@@ -0,0 +1,38 @@
+"""Tests of the instrumentation (dsch_instrument.py)."""
+
+
+import tracemalloc
+import unittest
+import dsch_instrument
+
+
+class MemoryPhaseTest(unittest.TestCase):
+    """The tracing must be stopped by the Instrument that started it."""
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_close(self):
+        with dsch_instrument.Instrument(interval=None, memory=True) as ins:
+            with ins.phase('first'):
+                data = [str(n) for n in range(10000)]
+            with ins.phase('second'):
+                data = None
+            self.assertTrue(tracemalloc.is_tracing())
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreater(ins.peak_memory(), 0)
+        self.assertLess(ins.memory_summary()['phases']['second']['retained'],
+                        0)
+        self.assertIsNone(data)
+
+    def test_started_by_others(self):
+        tracemalloc.start()
+        ins = dsch_instrument.Instrument(interval=None, memory=True)
+        with ins.phase('first'):
+            pass
+        ins.close()
+        self.assertTrue(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests of the edit journal (dsch_journal.py)."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import dsch_file
+import dsch_journal
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class JournalTest(unittest.TestCase):
+    """The journaled edits must never be dropped silently."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "example.txt")
+        shutil.copyfile(EXAMPLE, self.filename)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def comments(self, words):
+        index = dsch_journal.Journal(self.filename).load().index()
+        return [index[w].comment() for w in words]
+
+    def test_touched_file(self):
+        dsch_journal.Journal(self.filename).append(
+            {'op': 'set', 'wrd': "toki", 'com': "first"})
+        os.utime(self.filename, ns=(0, 0))  # only the stamp is changed
+        dsch_journal.Journal(self.filename).append(
+            {'op': 'set', 'wrd': "pona", 'com': "second"})
+        self.assertEqual(self.comments(["toki", "pona"]),
+                         ["first", "second"])
+
+    def test_changed_file(self):
+        journal = dsch_journal.Journal(self.filename)
+        journal.append({'op': 'set', 'wrd': "toki", 'com': "first"})
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write("\nsin\n (n) new\n")
+        size = os.path.getsize(journal.journalname)
+        for journal_ in (journal, dsch_journal.Journal(self.filename)):
+            with self.assertRaises(dsch_journal.JournalError):
+                journal_.append({'op': 'set', 'wrd': "pona", 'com': "x"})
+            with self.assertRaises(dsch_journal.JournalError):
+                journal_.load()
+            with self.assertRaises(dsch_journal.JournalError):
+                journal_.compact()
+        self.assertEqual(os.path.getsize(journal.journalname), size)
+
+        os.rename(journal.journalname,
+                  journal.journalname + dsch_journal.STALE_EXTENSION)
+        self.assertEqual(self.comments(["toki"]), [""])
+
+    def test_compact(self):
+        journal = dsch_journal.Journal(self.filename)
+        journal.append({'op': 'set', 'wrd': "toki", 'com': "first"})
+        self.assertEqual(journal.compact(backup=False), 1)
+        self.assertFalse(dsch_file.has_journal(self.filename))
+        journal.append({'op': 'set', 'wrd': "pona", 'com': "second"})
+        self.assertEqual(self.comments(["toki", "pona"]),
+                         ["first", "second"])
+
+    def test_truncated_record(self):
+        journal = dsch_journal.Journal(self.filename)
+        journal.append({'op': 'set', 'wrd': "toki", 'com': "first"})
+        journal.append({'op': 'set', 'wrd': "pona", 'com': "second"})
+        size = os.path.getsize(journal.journalname)
+        journal.append({'op': 'set', 'wrd': "seli", 'com': "lost"})
+        with open(journal.journalname, 'rb+') as f:  # a crash in a write
+            f.truncate(os.path.getsize(journal.journalname) - 5)
+
+        journal = dsch_journal.Journal(self.filename)
+        index = journal.load().index()
+        self.assertEqual([index[w].comment() for w in ("toki", "pona")],
+                         ["first", "second"])
+        self.assertNotEqual(index["seli"].comment(), "lost")
+        self.assertTrue(journal.recovered)
+        self.assertEqual(os.path.getsize(journal.journalname), size)
+
+        journal.append({'op': 'set', 'wrd': "seli", 'com': "third"})
+        self.assertEqual(self.comments(["toki", "pona", "seli"]),
+                         ["first", "second", "third"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+"""Tests of the JSON Lines entry records (see entry_from_record())."""
+
+
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+import dschictionary_class as dsch
+import dsch_bench
+
+
+def parse_source(text: str) -> list:
+    """It parses entries of the text format (without the languages)."""
+    return list(dsch.iter_entries(io.StringIO(text)))
+
+
+def round_trip(record: dict) -> dict:
+    """It returns a record after a JSONL -> text -> parse round trip."""
+    source = dsch.check_source(dsch.entry_from_record(
+        record, 1)).get_entry_as_source()
+    entries = parse_source(source)
+    if len(entries) != 1:
+        raise AssertionError("{0} entries from {1!r}".format(len(entries),
+                                                               source))
+    return entries[0].get_entry_as_dict(flat=True)
+
+
+class EntryFromRecordTest(unittest.TestCase):
+    """The accepted records must be read back unchanged from the text."""
+
+    RECORD = {'idx': 1, 'wrd': "toki", 'pro': "ˈto.ki",
+              'dsc': "A common word",
+              'mea': [{'pos': "n", 'cls': "", 'cas': "", 'def': "speech",
+                       'lvl': 0},
+                      {'pos': "v", 'cls': "tr", 'cas': "acc",
+                       'def': "to say, to \"talk\"", 'lvl': 1}],
+              'ori': "<Tok Pisin", 'com': "(see below)", 'see': "toki pona"}
+
+    def assertRejected(self, **fields):
+        record = dict(self.RECORD, **fields)
+        with self.assertRaises(dsch.RecordError, msg=repr(fields)):
+            dsch.entry_from_record(record, 1)
+
+    def assertRejectedMeaning(self, **fields):
+        self.assertRejected(mea=[dict(self.RECORD['mea'][0], **fields)])
+
+    def test_round_trip(self):
+        record = dict(self.RECORD, ori="Tok Pisin")
+        self.assertEqual(round_trip(record), record)
+
+    def assertNotSource(self, **fields):
+        tmpe = dsch.entry_from_record(dict(self.RECORD, **fields), 1)
+        with self.assertRaises(dsch.RecordError, msg=repr(fields)):
+            dsch.check_source(tmpe)
+
+    def test_text_fields(self):
+        # they're read back from the text format too
+        record = dict(self.RECORD, ori="/ˈbona/", com="> x", see="<|>",
+                      dsc="A (n) x")
+        self.assertEqual(round_trip(record), record)
+
+    def test_ambiguous_fields(self):
+        # they're valid records, but the text format can't contain them
+        self.assertNotSource(wrd="-na")
+        self.assertNotSource(wrd="na_", pro="")
+        self.assertNotSource(wrd="to/ki")
+        self.assertNotSource(pro="to/ki")
+        self.assertNotSource(dsc="(n) x")
+        self.assertNotSource(dsc="(n:cls+cas)")
+        for char in "/<|>":
+            self.assertNotSource(dsc=char + "x")
+        self.assertNotSource(com="x -")
+        self.assertNotSource(dsc="_x")
+        self.assertNotSource(ori="a\nb")
+        self.assertNotSource(wrd="a\rb")
+        self.assertNotSource(mea=[dict(self.RECORD['mea'][0],
+                                       **{'def': "a_"})])
+
+    def test_invalid_definitions(self):
+        self.assertRejectedMeaning(**{'def': "a; b"})
+        self.assertRejectedMeaning(**{'def': "a (b)"})
+        self.assertRejectedMeaning(**{'def': "a\nb"})
+
+    def test_invalid_ids(self):
+        self.assertRejected(idx="1")
+        self.assertRejected(idx=1.0)
+        self.assertRejected(idx=True)
+
+    def test_random_fields(self):
+        # every record of the text format is read back unchanged
+        rnd = random.Random(7)
+        chars = "ab -_\t/<|>(:+);,.'\"é"
+        keys = ('wrd', 'pro', 'dsc', 'ori', 'com', 'see', 'def')
+        accepted = 0
+        for _ in range(3000):
+            fields = {key: "".join(rnd.choice(chars) for _ in
+                                   range(rnd.randint(0, 6)))
+                      for key in keys if rnd.random() < 0.5}
+            meaning = dict(self.RECORD['mea'][1])
+            if 'def' in fields:
+                meaning['def'] = fields.pop('def')
+            record = dict(self.RECORD, mea=[meaning], **fields)
+            try:
+                expected = dsch.check_source(dsch.entry_from_record(
+                    record, 1)).get_entry_as_dict(flat=True)
+            except dsch.RecordError:
+                continue
+            self.assertEqual(round_trip(record), expected, repr(record))
+            accepted += 1
+        self.assertGreater(accepted, 100)
+
+    def test_random_source(self):
+        # every entry of the text format is a valid record
+        rnd = random.Random(7)
+        chars = "ab -_\t/<|>(:+);,.'\"é"
+        for _ in range(3000):
+            lines = ["".join(rnd.choice(chars) for _ in
+                             range(rnd.randint(1, 8)))
+                     for _ in range(rnd.randint(1, 4))]
+            for e in parse_source("\n".join(lines) + "\n"):
+                record = e.get_entry_as_dict(flat=True)
+                record['wrd'] = record['wrd'].strip()  # like the loader
+                if not record['wrd']:  # a line of spaces isn't a word
+                    continue
+                self.assertEqual(dsch.entry_from_record(
+                    record, 1).get_entry_as_dict(flat=True), record,
+                    repr(lines))
+
+
+class JsonlFileTest(unittest.TestCase):
+    """A text -> JSONL -> text conversion keeps the entries."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_generated(self):
+        filename = os.path.join(self.directory.name, "gen.txt")
+        dsch_bench.generate_dschictionary(filename, 300)
+        dschict = dsch.Dschictionary.create_dschictionary(filename)
+        jsonl = os.path.join(self.directory.name, "gen" + dsch.JSONL_EXTENSION)
+        with open(jsonl, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'title': dschict.title(),
+                                'entry_language': dschict.entry_language,
+                                'definition_language':
+                                    dschict.definition_language}) + "\n")
+            for e in dschict.entries():
+                f.write(json.dumps(e.get_entry_as_dict(flat=True)) + "\n")
+        loaded = dsch.Dschictionary()
+        loaded.read_jsonl(jsonl)
+        self.assertFalse(loaded.error)
+        self.assertEqual(
+            [e.get_entry_as_source() for e in loaded.entries()],
+            [e.get_entry_as_source() for e in dschict.entries()])
+
+
+class JsonlSpeedTest(unittest.TestCase):
+    """The JSON Lines loader is faster than the text parser."""
+
+    SIZE = 20000
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def best_time(func) -> float:
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def test_load(self):
+        # 1.2-1.6x with this size, the gain grows with the size (the cyclic
+        # GC is paused, see the parse_jsonl phase of dsch_bench.py)
+        filename = os.path.join(self.directory.name, "gen.txt")
+        dsch_bench.generate_dschictionary(filename, self.SIZE)
+        jsonl = os.path.join(self.directory.name, "gen" + dsch.JSONL_EXTENSION)
+        dschict = dsch.Dschictionary.create_dschictionary(filename)
+        with open(jsonl, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'title': dschict.title(),
+                                'entry_language': dschict.entry_language,
+                                'definition_language':
+                                    dschict.definition_language}) + "\n")
+            for e in dschict.entries():
+                f.write(json.dumps(e.get_entry_as_dict(flat=True),
+                                   ensure_ascii=False) + "\n")
+        del dschict
+        text_time = self.best_time(
+            lambda: dsch.Dschictionary().read_dschictionary(filename))
+        jsonl_time = self.best_time(
+            lambda: dsch.Dschictionary().read_jsonl(jsonl))
+        self.assertLess(jsonl_time, text_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Tests of the merged entries (dsch_merge.py)."""
+
+
+import os
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_merge
+
+SOURCE = """toki pona -> English
+
+telo /ˈte.lo/
+first description
+ (n) water
+< first origin
+| first comment
+> pona
+
+telo
+second description
+ (n) water
+ (v) to wash
+< second origin; from Finnish
+| first comment
+> toki, pona
+
+telo
+ (n) water
+< second origin
+| first comment; with a separator
+"""
+
+
+class UnionEntriesTest(unittest.TestCase):
+    """The merge policy must keep the fields of every entry."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "dup.txt")
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write(SOURCE)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_merge_policy(self):
+        d = dsch.Dschictionary.create_dschictionary(self.filename,
+                                                    duplicates='merge')
+        self.assertEqual(d.num_of_entries(), 1)
+        e = d.index()["telo"]
+        sep = dsch_merge.FIELD_SEPARATOR
+        self.assertEqual(e.pronunciation(), "ˈte.lo")
+        self.assertEqual(e.description(),
+                         "first description" + sep + "second description")
+        # the values are compared as a whole (not split on the separator)
+        self.assertEqual(e.origin(), sep.join([
+            "first origin", "second origin; from Finnish", "second origin"]))
+        self.assertEqual(e.comment(), sep.join([
+            "first comment", "first comment; with a separator"]))
+        self.assertEqual(e.see(), "pona, toki")
+        self.assertEqual([m.definition() for m in e._meanings],
+                         ["water", "to wash"])
+
+
+
+FIRST = """toki pona -> English
+
+pona
+good
+ (adj) good
+
+telo
+ (n) water
+< first origin
+"""
+
+SECOND = """toki pona -> English
+
+kala
+ (n) fish
+
+telo
+ (v) to wash
+< second origin
+> pona
+"""
+
+
+class MergeTest(unittest.TestCase):
+    """The sorted files must be merged by the policies."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.first = self.write("first.txt", FIRST)
+        self.second = self.write("second.txt", SECOND)
+        self.output = os.path.join(self.directory.name, "out.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        filename = os.path.join(self.directory.name, name)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return filename
+
+    def merge(self, policy, files=None):
+        num = dsch_merge.merge_dschictionaries(
+            files or [self.first, self.second], self.output, policy)
+        d = dsch.Dschictionary.create_dschictionary(self.output)
+        self.assertEqual(d.num_of_entries(), num)
+        return d
+
+    def test_union(self):
+        d = self.merge('union')
+        self.assertEqual([e.word() for e in d.entries()],
+                         ["kala", "pona", "telo"])
+        telo = d.index()["telo"]
+        self.assertEqual([m.definition() for m in telo._meanings],
+                         ["water", "to wash"])
+        self.assertEqual(telo.origin(), "first origin" +
+                         dsch_merge.FIELD_SEPARATOR + "second origin")
+        self.assertEqual(telo.see(), "pona")
+
+    def test_first_and_newest(self):
+        telo = self.merge('first').index()["telo"]
+        self.assertEqual(telo.origin(), "first origin")
+        os.utime(self.first, (0, 0))
+        telo = self.merge('newest').index()["telo"]
+        self.assertEqual(telo.origin(), "second origin")
+
+    def test_errors(self):
+        with self.assertRaises(dsch_merge.MergeError):
+            self.merge('last')
+        with self.assertRaises(dsch_merge.MergeError):
+            self.merge('union', [self.first, self.write(
+                "other.txt", "toki pona -> Esperanto\n")])
+        with self.assertRaises(dsch_merge.MergeError):
+            self.merge('union', [self.first, self.write(
+                "unsorted.txt", SECOND.replace("kala", "toki"))])
+        self.assertFalse(os.path.exists(self.output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests of the outputs (dsch_out.py)."""
+
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_out
+import dsch_patch
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class ReorderTest(unittest.TestCase):
+    """The reordered input file must keep the changes made meanwhile."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "example.txt")
+        shutil.copyfile(EXAMPLE, self.filename)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def words(self):
+        return [e.word() for e in dsch.Dschictionary.create_dschictionary(
+            self.filename).entries()]
+
+    def patch(self):
+        patch = dsch_patch.Patch()
+        patch.add({'wrd': "telo", 'mea': [{'pos': "n", 'def': "water"}]})
+        dsch_patch.patch_file(self.filename, patch, backup=False)
+
+    def test_patched_meanwhile(self):
+        writer = dsch_out.BaseDschictionary(self.filename)
+        self.patch()
+        writer.write_dschictionary()
+        self.assertIn("telo", self.words())
+
+    def test_patched_meanwhile_streamed(self):
+        writer = dsch_out.BaseDschictionary(self.filename, max_memory=64)
+        self.patch()
+        writer.write_dschictionary()
+        self.assertIn("telo", self.words())
+
+
+class DataOutputTest(unittest.TestCase):
+    """The JSON Lines and CSV outputs must keep every field."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "example.txt")
+        shutil.copyfile(EXAMPLE, self.filename)
+        self.dschict = dsch.Dschictionary.create_dschictionary(self.filename)
+        self.dschict += dsch.entry.Entry(100, "ala", see="toki")
+        self.dschict._sort_entries()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, ex):
+        dsch_out.OUTPUTS[ex](self.filename,
+                             dschict=self.dschict).write_dschictionary()
+        return os.path.join(self.directory.name, "example.dict." + ex)
+
+    def test_jsonl(self):
+        filename = self.write('jsonl')
+        with open(filename, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+        self.assertEqual(header, {'title': self.dschict.title(),
+                                  'entry_language': "toki pona",
+                                  'definition_language': "English"})
+        loaded = dsch.Dschictionary().read_jsonl(filename)
+        self.assertFalse(loaded.error)
+        self.assertEqual(
+            [e.get_entry_as_dict(flat=True) for e in loaded.entries()],
+            [e.get_entry_as_dict(flat=True) for e in self.dschict.entries()])
+
+    def test_csv(self):
+        with open(self.write('csv'), encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(tuple(rows[0]), dsch_out.CsvDschictionary.COLUMNS)
+        self.assertEqual(len(rows), sum(max(len(e._meanings), 1)
+                                        for e in self.dschict.entries()))
+        ala = [r for r in rows if r['wrd'] == "ala"]
+        self.assertEqual([(r['see'], r['pos'], r['def']) for r in ala],
+                         [("toki", "", "")])
+        pona = self.dschict.index()["pona"]
+        self.assertEqual([(r['pos'], r['def'], r['dsc']) for r in rows
+                          if r['wrd'] == "pona"],
+                         [(m.part_of_speech(), m.definition(),
+                           pona.description()) for m in pona._meanings])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Tests of the batch patches (dsch_patch.py)."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_patch
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class PatchFileTest(unittest.TestCase):
+    """Every field must be written and read back unchanged."""
+
+    MEANING = {'pos': "n", 'cls': "cls", 'cas': "acc",
+               'def': "water, \"liquid\"", 'lvl': 0}
+    VERB = {'pos': "v", 'cls': "", 'cas': "", 'def': "", 'lvl': 1}
+    RECORD = {'wrd': "telo", 'pro': "ˈte.lo", 'dsc': "(very common) word",
+              'mea': [MEANING, VERB],
+              'ori': "Tok Pisin", 'com': "a comment, 'quoted'",
+              'see': "toki, pona"}
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "example.txt")
+        shutil.copyfile(EXAMPLE, self.filename)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def patch(self, *operations):
+        dsch_patch.patch_file(self.filename, dsch_patch.Patch(operations),
+                              backup=False)
+
+    def record(self, word):
+        """It returns the record of a word of the rewritten file."""
+        d = dsch.Dschictionary.create_dschictionary(self.filename)
+        self.assertFalse(d.error)
+        record = d.index()[word].get_entry_as_dict(flat=True)
+        del record['idx']
+        return record
+
+    def test_add(self):
+        self.patch(dict(self.RECORD, op='add'))
+        self.assertEqual(self.record("telo"), self.RECORD)
+
+    def test_set(self):
+        fields = {k: v for k, v in self.RECORD.items() if k != 'mea'}
+        self.patch({'op': 'add', 'wrd': "telo", 'mea': self.RECORD['mea']},
+                   dict(fields, op='set'))
+        self.assertEqual(self.record("telo"), self.RECORD)
+
+    def test_meanings(self):
+        self.patch({'op': 'add', 'wrd': "telo"},
+                   dict(self.VERB, op='add_meaning', wrd="telo"),
+                   dict(self.MEANING, op='add_meaning', wrd="telo", num=1),
+                   {'op': 'add_meaning', 'wrd': "telo", 'pos': "x"},
+                   {'op': 'set_meaning', 'wrd': "telo", 'num': 3,
+                    'def': "gone"},
+                   {'op': 'delete_meaning', 'wrd': "telo", 'num': 3})
+        self.assertEqual(self.record("telo")['mea'], self.RECORD['mea'])
+
+    def test_delete(self):
+        self.patch(dict(self.RECORD, op='add'))
+        self.patch({'op': 'delete', 'wrd': "telo"})
+        self.assertNotIn("telo", dsch.Dschictionary.create_dschictionary(
+            self.filename).index())
+
+    def test_ambiguous_values(self):
+        with open(self.filename, 'rb') as f:
+            original = f.read()
+        for operation in ({'op': 'set', 'wrd': "toki", 'dsc': "(n) x"},
+                          {'op': 'set', 'wrd': "toki", 'com': "x -"},
+                          {'op': 'set', 'wrd': "toki", 'pro': "a/b"},
+                          {'op': 'set_meaning', 'wrd': "toki", 'num': 1,
+                           'def': "a; b"},
+                          {'op': 'add', 'wrd': "-na"}):
+            with self.assertRaises(dsch_patch.PatchError, msg=operation):
+                self.patch(operation)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), original)
+
+    def test_marker_values(self):
+        # only the description's first character is a marker in the text
+        self.patch({'op': 'set', 'wrd': "toki", 'ori': "/ˈto.ki/",
+                    'com': "> x", 'see': "< y"})
+        record = self.record("toki")
+        self.assertEqual((record['ori'], record['com'], record['see']),
+                         ("/ˈto.ki/", "> x", "< y"))
+
+
+if __name__ == '__main__':
+    unittest.main()
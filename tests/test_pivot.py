@@ -0,0 +1,92 @@
+"""Tests of the pivot translation (dsch_pivot.py)."""
+
+
+import io
+import unittest
+import dschictionary_class as dsch
+import dsch_pivot
+
+
+def dschictionary(text: str) -> dsch.Dschictionary:
+    """It reads a dschictionary from a text (the input format)."""
+    file = io.StringIO(text)
+    d = dsch.Dschictionary("test", *dsch.parse_languages(file.readline()))
+    for e in dsch.iter_entries(file):
+        d += e
+    d._sort_entries()
+    return d
+
+
+FIRST = """toki pona -> English
+
+pona
+ (adj) good
+> seli, ike
+
+seli
+ (n) fire
+ (adj) warm
+> pona, telo
+
+ike
+ (adj) bad
+> pona
+"""
+
+SECOND = """English -> Esperanto
+
+good
+ (adj) bona
+
+fire
+ (n) fajro
+
+warm
+ (adj) varma
+"""
+
+
+class PivotTest(unittest.TestCase):
+    """The draft must be translated through the glosses."""
+
+    def setUp(self):
+        self.draft = dsch_pivot.pivot_dschictionaries(dschictionary(FIRST),
+                                                      dschictionary(SECOND))
+
+    def test_meanings(self):
+        index = self.draft.index()
+        self.assertEqual(sorted(index), ["pona", "seli"])
+        self.assertEqual([m.definition() for m in index["seli"]._meanings],
+                         ["fajro", "varma"])
+        self.assertEqual(index["seli"].comment(),
+                         "Pivot (English): fire, warm")
+
+    def test_see_only_own_words(self):
+        index = self.draft.index()
+        self.assertEqual(index["pona"].see(), "seli")
+        self.assertEqual(index["seli"].see(), "pona")
+
+    def test_invalid_definitions(self):
+        # e.g. a dschictionary of a program, not of a file
+        second = dschictionary(SECOND)
+        second.index()["fire"]._meanings[0]._definition = "fajro (old)"
+        reports = []
+        draft = dsch_pivot.pivot_dschictionaries(dschictionary(FIRST), second,
+                                                 report=reports.append)
+        self.assertEqual([m.definition()
+                          for m in draft.index()["seli"]._meanings],
+                         ["varma"])
+        self.assertEqual(len(reports), 1)
+        self.assertTrue(reports[0].startswith("seli: 'fajro (old)'"))
+
+    def test_languages(self):
+        self.assertEqual((self.draft.entry_language,
+                          self.draft.definition_language),
+                         ("toki pona", "Esperanto"))
+        with self.assertRaises(dsch_pivot.PivotError):
+            dsch_pivot.pivot_dschictionaries(dschictionary(SECOND),
+                                             dschictionary(SECOND))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Tests of the reverse dschictionaries (dsch_reverse.py)."""
+
+
+import io
+import json
+import unittest
+import dschictionary_class as dsch
+import dsch_reverse
+
+
+def dschictionary(text: str) -> dsch.Dschictionary:
+    """It reads a dschictionary from a text (the input format)."""
+    file = io.StringIO(text)
+    d = dsch.Dschictionary("test", *dsch.parse_languages(file.readline()))
+    for e in dsch.iter_entries(file):
+        d += e
+    d._sort_entries()
+    return d
+
+
+SOURCE = """toki pona -> English
+
+kama-sona
+ (v) to learn
+
+sona
+ (v) to know, to learn
+ (n) knowledge
+
+pona
+ (adj) good
+"""
+
+
+class ReverseTest(unittest.TestCase):
+    """The reverse must be read back from both formats."""
+
+    def setUp(self):
+        self.reports = []
+        self.reverse = dsch_reverse.reverse_dschictionary(
+            dschictionary(SOURCE), self.reports.append)
+
+    def records(self, entries) -> list:
+        """It returns the records of the entries (without their ids)."""
+        records = [e.get_entry_as_dict(flat=True) for e in entries]
+        for record in records:
+            del record['idx']
+        return records
+
+    def test_meanings(self):
+        index = self.reverse.index()
+        self.assertEqual(sorted(index), ["good", "knowledge", "to know",
+                                         "to learn"])
+        self.assertEqual([(m.part_of_speech(), m.definition())
+                          for m in index["to learn"]._meanings],
+                         [("v", "sona")])
+        self.assertEqual((self.reverse.entry_language,
+                          self.reverse.definition_language),
+                         ("English", "toki pona"))
+
+    def test_left_out_words(self):
+        self.assertEqual(len(self.reports), 1)
+        self.assertIn("'kama-sona'", self.reports[0])
+
+    def test_round_trip(self):
+        source = "".join(dsch.generate_source(
+            self.reverse.entries(), self.reverse.entry_language,
+            self.reverse.definition_language))
+        self.assertEqual(self.records(dschictionary(source).entries()),
+                         self.records(self.reverse.entries()))
+
+        lines = [json.dumps(r) for r in self.records(self.reverse.entries())]
+        self.assertEqual(self.records(dsch.iter_jsonl_entries(lines)),
+                         self.records(self.reverse.entries()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Tests of the sharded dschictionaries (dsch_shard.py)."""
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_patch
+import dsch_shard
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class ShardTest(unittest.TestCase):
+    """The shards must hold the ranges of the words of the file."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "example.txt")
+        shutil.copyfile(EXAMPLE, self.filename)
+        self.manifest = os.path.join(self.directory.name,
+                                     "sharded.shards.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def split(self, starts=None):
+        return dsch_shard.split_dschictionary(self.filename, self.manifest,
+                                              starts)
+
+    def write_manifest(self, shards):
+        with open(self.manifest, 'w', encoding='utf-8') as f:
+            json.dump({'entry_language': "toki pona",
+                       'definition_language': "English",
+                       'shards': shards}, f)
+
+    def sources(self, entries):
+        return [e.get_entry_as_source() for e in entries]
+
+    def test_split(self):
+        shards = self.split()
+        self.assertEqual([os.path.basename(s) for s in shards],
+                         ["sharded.001.txt", "sharded.002.txt",
+                          "sharded.003.txt"])
+        with open(self.manifest, encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest['title'], "example")
+        self.assertEqual([s['start'] for s in manifest['shards']],
+                         ["", "s", "t"])
+        self.assertEqual(
+            self.sources(dsch.Dschictionary.create_dschictionary(
+                self.manifest).entries()),
+            self.sources(dsch.Dschictionary.create_dschictionary(
+                self.filename).entries()))
+
+        self.assertEqual(len(self.split(["q", "zzz"])), 2)  # no 'zzz' words
+
+    def test_lazy_lookup(self):
+        self.split()
+        sharded = dsch_shard.ShardedDschictionary(self.manifest)
+        self.assertEqual(sharded.title(), "example")
+        self.assertEqual(sharded.lookup("seli").word(), "seli")
+        self.assertEqual([s.is_loaded() for s in sharded.shards()],
+                         [False, True, False])
+        self.assertIsNone(sharded.lookup("sona"))
+        self.assertIsNone(sharded.lookup("a"))
+        self.assertEqual([s.is_loaded() for s in sharded.shards()],
+                         [True, True, False])
+
+    def test_range_checks(self):
+        shards = self.split()
+        self.write_manifest([{'file': os.path.basename(shards[0]),
+                              'start': ""},
+                             {'file': os.path.basename(shards[1]),
+                              'start': "t"}])
+        sharded = dsch_shard.ShardedDschictionary(self.manifest)
+        self.assertEqual(sharded.lookup("pona").word(), "pona")
+        with self.assertRaises(dsch_shard.ShardError):
+            sharded.lookup("toki")  # its shard has 'seli' (before 't')
+
+        for shards in ([{'file': "a.txt", 'start': "s"}],
+                       [{'file': "a.txt"}, {'file': "b.txt", 'start': "t"},
+                        {'file': "c.txt", 'start': "s"}],
+                       [], [{'start': ""}]):
+            self.write_manifest(shards)
+            with self.assertRaises(dsch_shard.ShardError, msg=shards):
+                dsch_shard.ShardedDschictionary(self.manifest)
+
+    def test_patch(self):
+        shards = self.split()
+        sharded = dsch_shard.ShardedDschictionary(self.manifest)
+        contents = []
+        for filename in shards:
+            with open(filename, 'rb') as f:
+                contents.append(f.read())
+        patched = sharded.patch(dsch_patch.Patch([
+            {'op': 'set', 'wrd': "seli", 'com': "patched"},
+            {'op': 'add', 'wrd': "sona", 'mea': [{'pos': "n",
+                                                  'def': "knowledge"}]}]),
+                                backup=False)
+        self.assertEqual(patched, [shards[1]])
+        for filename, content in zip(shards, contents):
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read() == content,
+                                 filename not in patched, filename)
+        self.assertEqual(sharded.lookup("seli").comment(), "patched")
+        self.assertEqual(sharded.lookup("sona").word(), "sona")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Tests of the static site export (dsch_site.py)."""
+
+
+import gzip
+import os
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_site
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class ExportSiteTest(unittest.TestCase):
+    """The manifest must describe both representations of every file."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dschict = dsch.Dschictionary.create_dschictionary(EXAMPLE)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.directory.name, name), 'rb') as f:
+            return f.read()
+
+    def test_etags(self):
+        result = dsch_site.export_site(self.dschict, self.directory.name, 2)
+        files = dsch_site.read_manifest(self.directory.name)
+        self.assertEqual(sorted(files), sorted(result['written']))
+        for name, record in files.items():
+            data = self.read(name)
+            compressed = self.read(name + dsch_site.GZIP_EXTENSION)
+            self.assertEqual(gzip.decompress(compressed), data)
+            self.assertEqual(record['etag'],
+                             dsch_site.etag(dsch_site.content_hash(data)))
+            self.assertEqual(record['gzip_etag'], dsch_site.etag(
+                dsch_site.content_hash(compressed)))
+            self.assertNotEqual(record['etag'], record['gzip_etag'])
+            self.assertEqual(record['size'], len(data))
+            self.assertEqual(record['gzip_size'], len(compressed))
+
+    def test_unchanged(self):
+        dsch_site.export_site(self.dschict, self.directory.name, 2)
+        result = dsch_site.export_site(self.dschict, self.directory.name, 2)
+        self.assertEqual(result['written'], [])
+        self.assertEqual(result['removed'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Tests of the hot reload (dsch_snapshot.py)."""
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import dschictionary_class as dsch
+import dsch_snapshot
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class LiveDschictionaryTest(unittest.TestCase):
+    """The readers must keep their snapshots while a new one is loaded."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "example.txt")
+        shutil.copyfile(EXAMPLE, self.filename)
+        self.live = dsch_snapshot.LiveDschictionary(self.filename)
+
+    def tearDown(self):
+        self.live.stop()
+        self.directory.cleanup()
+
+    def append(self, text, mtime=None):
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write(text)
+        if mtime is not None:  # a changed stamp even on coarse clocks
+            os.utime(self.filename, ns=(mtime, mtime))
+
+    def test_snapshot(self):
+        snap = self.live.snapshot()
+        self.assertEqual(snap.version, 1)
+        self.assertIsInstance(snap.entries(), tuple)
+        d = snap.dschictionary()
+        with self.assertRaises(AttributeError):  # the entries are a tuple
+            d += dsch.entry.Entry(100, "telo")
+        self.assertEqual(snap.lookup("toki").word(), "toki")
+        self.assertIsNone(snap.lookup("telo"))
+        self.assertIsNotNone(d._see_graph)  # built before the publication
+
+    def test_reload(self):
+        old = self.live.snapshot()
+        self.assertFalse(self.live.reload(force=False))
+        self.append("\ntelo\n (n) water\n", mtime=10 ** 9)
+        self.assertTrue(self.live.is_changed())
+        self.assertTrue(self.live.reload(force=False))
+        self.assertEqual(self.live.version(), 2)
+        self.assertEqual(self.live.lookup("telo").word(), "telo")
+        # the old snapshot is unchanged
+        self.assertIsNone(old.lookup("telo"))
+        self.assertEqual(old.version, 1)
+
+    def test_failed_reload(self):
+        snap = self.live.snapshot()
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write("no languages\n")
+        with self.assertRaises(dsch_snapshot.ReloadError):
+            self.live.reload()
+        self.assertTrue(self.live.error)
+        self.assertIs(self.live.snapshot(), snap)
+
+        shutil.copyfile(EXAMPLE, self.filename)
+        self.live.reload_in_background().join()
+        self.assertEqual(self.live.version(), 2)
+        self.assertEqual(self.live.error, "")
+
+    def test_watch(self):
+        self.live.watch(0.01)
+        self.append("\ntelo\n (n) water\n", mtime=10 ** 9)
+        deadline = time.monotonic() + 10
+        while self.live.version() < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.live.lookup("telo").word(), "telo")
+        self.live.stop()
+        self.assertIsNone(self.live._watcher)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Tests of the external-memory sort (dsch_sort.py)."""
+
+
+import os
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_bench
+import dsch_sort
+
+
+class IterSortedEntriesTest(unittest.TestCase):
+    """The external sort must give the same result as the in-memory one."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "gen.txt")
+        dsch_bench.generate_dschictionary(self.filename, 300)
+        self.expected = [e.get_entry_as_source() for e in
+                         dsch.Dschictionary.create_dschictionary(
+                             self.filename).entries()]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _sorted(self, max_memory, run_format):
+        return [e.get_entry_as_source() for e in dsch_sort.iter_sorted_entries(
+            self.filename, max_memory, run_format)]
+
+    def test_in_memory(self):
+        self.assertEqual(self._sorted(dsch_sort.DEFAULT_MAX_MEMORY, 'pickle'),
+                         self.expected)
+
+    def test_multi_run_pickle(self):
+        # a run per entry, more runs than MAX_FANIN (more merge passes)
+        self.assertEqual(self._sorted(1, 'pickle'), self.expected)
+
+    def test_multi_run_text(self):
+        self.assertEqual(self._sorted(1, 'text'), self.expected)
+
+    def test_pickle_keeps_ids(self):
+        ids = [e.id() for e in dsch.Dschictionary.create_dschictionary(
+            self.filename).entries()]
+        self.assertEqual([e.id() for e in dsch_sort.iter_sorted_entries(
+            self.filename, 1, 'pickle')], ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
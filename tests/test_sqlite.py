@@ -0,0 +1,63 @@
+"""Tests of the SQLite storage backend (dsch_sqlite.py)."""
+
+
+import gzip
+import os
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_sqlite
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+
+class SQLiteDschictionaryTest(unittest.TestCase):
+    """The stored entries must be read back with all of their meanings."""
+
+    def setUp(self):
+        self.dschict = dsch.Dschictionary.create_dschictionary(EXAMPLE)
+        # an entry without meanings
+        self.dschict += dsch.entry.Entry(100, "ala", see="toki")
+        self.dschict._sort_entries()
+        self.db = dsch_sqlite.SQLiteDschictionary(':memory:')
+        self.db.import_dschictionary(self.dschict)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_iter_entries(self):
+        self.assertEqual(
+            [e.get_entry_as_source() for e in self.db.iter_entries()],
+            [e.get_entry_as_source() for e in self.dschict.entries()])
+
+    def test_lookup(self):
+        for e in self.dschict.entries():
+            self.assertEqual(
+                [f.get_entry_as_source() for f in self.db.lookup(e.word())],
+                [e.get_entry_as_source()])
+        self.assertEqual(self.db.lookup("nothing"), [])
+
+
+class ImportFileTest(unittest.TestCase):
+    """The title of an imported file is its base name."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_title(self):
+        directory = os.path.join(self.directory.name, "v1.2")
+        os.mkdir(directory)
+        filename = os.path.join(directory, "example.txt.gz")
+        with open(EXAMPLE, 'rb') as src, gzip.open(filename, 'wb') as dst:
+            dst.write(src.read())
+        with dsch_sqlite.SQLiteDschictionary(':memory:') as db:
+            self.assertGreater(db.import_file(filename), 0)
+            self.assertEqual(db.info('title'), "example")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests of the incremental statistics (dsch_stats.py)."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import dschictionary_class as dsch
+import dsch_stats
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "example.txt")
+
+DUPLICATE = """
+toki
+ (n) language
+ (xyz:cls+acc) unknown
+| a comment
+"""
+
+
+class StatisticsTest(unittest.TestCase):
+    """The counters must match the counters of a full scan."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "example.txt")
+        shutil.copyfile(EXAMPLE, self.filename)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, duplicates='report'):
+        d = dsch.Dschictionary.create_dschictionary(self.filename,
+                                                    duplicates=duplicates)
+        self.assertFalse(d.error)
+        return d
+
+    def assertScanned(self, d):
+        self.assertEqual(d.statistics().get_statistics_as_dict(),
+                         dsch_stats.Statistics(
+                             d.entries()).get_statistics_as_dict())
+
+    def test_counters(self):
+        d = self.read()
+        self.assertScanned(d)
+        stats = d.statistics()
+        self.assertEqual(stats.num_of_entries(), 3)
+        self.assertEqual(stats.num_of_meanings(),
+                         sum(len(e._meanings) for e in d.entries()))
+        self.assertEqual(stats.field_count('pro'), 3)
+        self.assertEqual(stats.field_share('pro'), 1.0)
+
+    def test_merged_duplicates(self):
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write(DUPLICATE)
+        d = self.read('merge')
+        self.assertScanned(d)  # the merged entry is recounted
+        stats = d.statistics()
+        self.assertEqual(stats.num_of_entries(), 3)
+        self.assertEqual(stats.unknown_parts_of_speech(), ["xyz"])
+        self.assertEqual(stats.classes().get("cls"), 1)
+        self.assertEqual(stats.pos_table()["xyz"], dsch_stats.UNKNOWN_POS)
+
+    def test_remove_entry(self):
+        d = self.read()
+        stats = dsch_stats.Statistics(d.entries())
+        for e in d.entries():
+            stats.remove_entry(e)
+        self.assertEqual(stats.get_statistics_as_dict(),
+                         dsch_stats.Statistics().get_statistics_as_dict())
+        self.assertEqual((stats.meanings_distribution(), stats.cases()),
+                         ({}, {}))  # the zero counters are dropped
+
+
+if __name__ == '__main__':
+    unittest.main()